@@ -1,3 +1,17 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import AbandonedCartRollup, AbandonedCartVariantRollup
+
+
+@admin.register(AbandonedCartRollup)
+class AbandonedCartRollupAdmin(admin.ModelAdmin):
+    list_display = ["date", "cart_count", "item_count", "total_value", "updated_at"]
+    date_hierarchy = "date"
+
+
+@admin.register(AbandonedCartVariantRollup)
+class AbandonedCartVariantRollupAdmin(admin.ModelAdmin):
+    list_display = ["date", "sku", "quantity", "total_value"]
+    list_filter = ["date"]
+    search_fields = ["sku"]
+    ordering = ["-date", "-quantity"]
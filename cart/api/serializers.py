@@ -1,82 +1,50 @@
 from rest_framework import serializers
-from cart.models import Cart, CartItem
-
-from rest_framework import serializers
-from catalog.models import ProductVariant
 from decimal import Decimal
 
 
+class CartItemSerializer(serializers.Serializer):
+    """CartLine (CartPricer natijasi) uchun serializer."""
 
-class CartItemSerializer(serializers.ModelSerializer):
-    product_name = serializers.CharField(
-        source="variant.product.name",
-        read_only=True
-    )
-    variant_id = serializers.IntegerField(source="variant.id", read_only=True)
+    id = serializers.IntegerField(source="item_id", read_only=True)
+    variant_id = serializers.IntegerField(read_only=True)
+    product_name = serializers.CharField(read_only=True)
+    quantity = serializers.IntegerField(read_only=True)
     unit_price = serializers.SerializerMethodField()
     total_price = serializers.SerializerMethodField()
 
-    class Meta:
-        model = CartItem
-        fields = [
-            "id",
-            "variant_id",
-            "product_name",
-            "quantity",
-            "unit_price",
-            "total_price",
-        ]
-
     def get_unit_price(self, obj) -> Decimal:
-        return obj.get_unit_price()
+        return obj.unit_price
 
     def get_total_price(self, obj) -> Decimal:
         return obj.total_price
 
 
-class CartSerializer(serializers.ModelSerializer):
-    items = CartItemSerializer(many=True, read_only=True)
-    total_price = serializers.SerializerMethodField()
+class CartSerializer(serializers.Serializer):
+    """CartPricing (CartPricer natijasi) uchun serializer."""
 
-    class Meta:
-        model = Cart
-        fields = [
-            "id",
-            "items",
-            "total_price",
-            "created_at",
-            "updated_at",
-        ]
+    id = serializers.IntegerField(source="cart.id", read_only=True)
+    items = CartItemSerializer(source="lines", many=True, read_only=True)
+    total_price = serializers.SerializerMethodField()
+    version = serializers.IntegerField(source="cart.version", read_only=True)
+    created_at = serializers.DateTimeField(source="cart.created_at", read_only=True)
+    updated_at = serializers.DateTimeField(source="cart.updated_at", read_only=True)
 
     def get_total_price(self, obj) -> Decimal:
         return obj.total_price
 
 
 
+# Variant mavjudligi/aktivligi CartService ichida tekshiriladi (ValueError -> 400),
+# shu sabab bu yerda alohida query qilinmaydi.
 class AddToCartRequestSerializer(serializers.Serializer):
     variant_id = serializers.IntegerField()
     quantity = serializers.IntegerField(min_value=1, default=1)
 
-    def validate_variant_id(self, value: int):
-        if not ProductVariant.objects.filter(id=value, is_active=True).exists():
-            raise serializers.ValidationError("Variant not found or inactive.")
-        return value
-
 
 class ChangeQuantityRequestSerializer(serializers.Serializer):
     variant_id = serializers.IntegerField()
     quantity = serializers.IntegerField(min_value=0)  # 0 bo'lsa o'chiramiz
 
-    def validate_variant_id(self, value: int):
-        if not ProductVariant.objects.filter(id=value, is_active=True).exists():
-            raise serializers.ValidationError("Variant not found or inactive.")
-        return value
-
 
 class RemoveFromCartRequestSerializer(serializers.Serializer):
     variant_id = serializers.IntegerField()
-
-    def validate_variant_id(self, value: int):
-        if not ProductVariant.objects.filter(id=value, is_active=True).exists():
-            raise serializers.ValidationError("Variant not found or inactive.")
-        return value
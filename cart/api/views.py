@@ -1,7 +1,8 @@
+from django.utils.http import parse_etags, quote_etag
 from rest_framework import status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from drf_spectacular.utils import extend_schema, OpenApiResponse
+from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse, OpenApiTypes
 
 from cart.api.serializers import (
     CartSerializer,
@@ -9,28 +10,92 @@ from cart.api.serializers import (
     ChangeQuantityRequestSerializer,
     RemoveFromCartRequestSerializer,
 )
-from cart.services.cart_service import CartService
 from cart.models import Cart
+from idempotency.decorators import IDEMPOTENCY_KEY_PARAMETER, idempotent
+from cart.services.cart_service import CartService, CartVersionConflict
+from cart.services.cart_pricer import CartPricer
+
+
+IF_MATCH_PARAMETER = OpenApiParameter(
+    name="If-Match",
+    type=OpenApiTypes.STR,
+    location=OpenApiParameter.HEADER,
+    required=False,
+    description="Cart ETag; mos kelmasa 412 qaytadi (optimistic concurrency).",
+)
+
+
+def _cart_etag(version: int) -> str:
+    return quote_etag(f"v{version}")
+
+
+def _if_match_version(request) -> int | None:
+    """If-Match header'idan kutilgan cart versiyasini oladi (yo'q / "*" => None)."""
+    header = request.headers.get("If-Match")
+    if not header:
+        return None
+
+    etags = parse_etags(header)
+    if etags == ["*"]:
+        return None
+
+    for etag in etags:
+        value = etag.strip('"')
+        if value.startswith("v") and value[1:].isdigit():
+            return int(value[1:])
+
+    # Tanib bo'lmaydigan ETag hech qachon mos kelmaydi
+    return -1
+
+
+def _version_conflict_response(e: CartVersionConflict):
+    return Response({"detail": str(e)}, status=status.HTTP_412_PRECONDITION_FAILED)
 
 
 def _get_cart_response(user):
-    cart = CartService.get_or_create_cart(user)
-    cart = (
-        Cart.objects
-        .prefetch_related("items__variant__product", "items__variant__discount")
-        .get(pk=cart.pk)
-    )
-    return Response(CartSerializer(cart).data)
+    pricing = CartPricer.price_for_user(user)
+    response = Response(CartSerializer(pricing).data)
+    response["ETag"] = _cart_etag(pricing.cart.version)
+    return response
 
 
 @extend_schema(
     tags=["Cart"],
     summary="Get current user's cart",
-    responses={200: CartSerializer},
+    parameters=[
+        OpenApiParameter(
+            name="If-None-Match",
+            type=OpenApiTypes.STR,
+            location=OpenApiParameter.HEADER,
+            required=False,
+            description="Oldingi javobdagi ETag; cart o'zgarmagan bo'lsa 304.",
+        ),
+    ],
+    responses={
+        200: CartSerializer,
+        304: OpenApiResponse(description="Not modified"),
+    },
 )
 @api_view(["GET"])
 @permission_classes([permissions.IsAuthenticated])
 def cart_detail(request):
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match:
+        # Faqat versiya o'qiladi: prefetch va serialization yo'q
+        version = (
+            Cart.objects
+            .filter(user=request.user)
+            .values_list("version", flat=True)
+            .first()
+        )
+        if version is not None:
+            etag = _cart_etag(version)
+            etags = parse_etags(if_none_match)
+            if etag in etags or etags == ["*"]:
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+                response["ETag"] = etag
+                return response
+
     return _get_cart_response(request.user)
 
 
@@ -38,13 +103,16 @@ def cart_detail(request):
     tags=["Cart"],
     summary="Add variant to cart",
     request=AddToCartRequestSerializer,
+    parameters=[IF_MATCH_PARAMETER, IDEMPOTENCY_KEY_PARAMETER],
     responses={
         200: CartSerializer,
         400: OpenApiResponse(description="Bad request"),
+        412: OpenApiResponse(description="Cart version mismatch"),
     },
 )
 @api_view(["POST"])
 @permission_classes([permissions.IsAuthenticated])  # ✅ AllowAny emas
+@idempotent("cart.add")
 def cart_add(request):
     ser = AddToCartRequestSerializer(data=request.data)
     ser.is_valid(raise_exception=True)
@@ -54,7 +122,10 @@ def cart_add(request):
             request.user,
             variant_id=ser.validated_data["variant_id"],
             quantity=ser.validated_data["quantity"],
+            expected_version=_if_match_version(request),
         )
+    except CartVersionConflict as e:
+        return _version_conflict_response(e)
     except ValueError as e:
         return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -65,13 +136,16 @@ def cart_add(request):
     tags=["Cart"],
     summary="Change quantity of a variant in cart (0 => remove item)",
     request=ChangeQuantityRequestSerializer,
+    parameters=[IF_MATCH_PARAMETER, IDEMPOTENCY_KEY_PARAMETER],
     responses={
         200: CartSerializer,
         400: OpenApiResponse(description="Bad request"),
+        412: OpenApiResponse(description="Cart version mismatch"),
     },
 )
 @api_view(["PATCH"])
 @permission_classes([permissions.IsAuthenticated])
+@idempotent("cart.change_quantity")
 def cart_change_quantity(request):
     ser = ChangeQuantityRequestSerializer(data=request.data)
     ser.is_valid(raise_exception=True)
@@ -81,7 +155,10 @@ def cart_change_quantity(request):
             request.user,
             variant_id=ser.validated_data["variant_id"],
             quantity=ser.validated_data["quantity"],
+            expected_version=_if_match_version(request),
         )
+    except CartVersionConflict as e:
+        return _version_conflict_response(e)
     except ValueError as e:
         return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -92,21 +169,29 @@ def cart_change_quantity(request):
     tags=["Cart"],
     summary="Remove variant from cart",
     request=RemoveFromCartRequestSerializer,
+    parameters=[IF_MATCH_PARAMETER, IDEMPOTENCY_KEY_PARAMETER],
     responses={
         200: CartSerializer,
         400: OpenApiResponse(description="Bad request"),
+        412: OpenApiResponse(description="Cart version mismatch"),
     },
 )
 @api_view(["DELETE"])
 @permission_classes([permissions.IsAuthenticated])
+@idempotent("cart.remove")
 def cart_remove(request):
     ser = RemoveFromCartRequestSerializer(data=request.data)
     ser.is_valid(raise_exception=True)
 
-    CartService.remove_from_cart(
-        request.user,
-        variant_id=ser.validated_data["variant_id"],
-    )
+    try:
+        CartService.remove_from_cart(
+            request.user,
+            variant_id=ser.validated_data["variant_id"],
+            expected_version=_if_match_version(request),
+        )
+    except CartVersionConflict as e:
+        return _version_conflict_response(e)
+
     return _get_cart_response(request.user)
 
 
@@ -114,12 +199,21 @@ def cart_remove(request):
     tags=["Cart"],
     summary="Clear cart",
     request=None,
-    responses={200: CartSerializer},
+    parameters=[IF_MATCH_PARAMETER, IDEMPOTENCY_KEY_PARAMETER],
+    responses={
+        200: CartSerializer,
+        412: OpenApiResponse(description="Cart version mismatch"),
+    },
 )
 @api_view(["POST"])
 @permission_classes([permissions.IsAuthenticated])
+@idempotent("cart.clear")
 def cart_clear(request):
-    CartService.clear_cart(request.user)
+    try:
+        CartService.clear_cart(request.user, expected_version=_if_match_version(request))
+    except CartVersionConflict as e:
+        return _version_conflict_response(e)
+
     return _get_cart_response(request.user)
 
 
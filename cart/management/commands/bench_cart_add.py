@@ -0,0 +1,76 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from cart.services.cart_service import CartService
+from catalog.management.bench import cleanup_bench, create_bench_users, create_bench_variant, percentile_ms
+
+
+BENCH_PREFIX = "bench-cart"
+
+
+class Command(BaseCommand):
+    help = (
+        "Concurrency benchmark: N ta parallel foydalanuvchi bitta variantni "
+        "cart'ga qo'shadi (CartService.add_to_cart). Postgres'da ishga tushiring; "
+        "SQLite yozuvlarni bitta lock bilan ketma-ket bajaradi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--adders", type=int, default=200, help="Parallel thread'lar soni")
+        parser.add_argument("--rounds", type=int, default=5, help="Har bir thread nechta add qiladi")
+        parser.add_argument("--keep", action="store_true", help="Bench ma'lumotlarini o'chirmaslik")
+
+    def handle(self, *args, **opts):
+        adders = opts["adders"]
+        rounds = opts["rounds"]
+
+        variant = create_bench_variant(BENCH_PREFIX, stock=1_000_000)
+        users = create_bench_users(BENCH_PREFIX, adders)
+        barrier = threading.Barrier(len(users))
+        latencies: list[float] = []
+        errors: dict[str, int] = {}
+        lock = threading.Lock()
+
+        def worker(user):
+            try:
+                barrier.wait()
+                for _ in range(rounds):
+                    t0 = time.perf_counter()
+                    try:
+                        CartService.add_to_cart(user, variant_id=variant.id, quantity=1)
+                    except Exception as e:  # benchmark: xatolarni sanaymiz
+                        with lock:
+                            key = type(e).__name__
+                            errors[key] = errors.get(key, 0) + 1
+                        continue
+                    with lock:
+                        latencies.append(time.perf_counter() - t0)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(u,)) for u in users]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+
+        ok = len(latencies)
+        latencies.sort()
+
+        self.stdout.write(f"backend: {connection.vendor}")
+        self.stdout.write(f"adders: {adders}, rounds: {rounds}, ok: {ok}, errors: {errors or 0}")
+        self.stdout.write(f"elapsed: {elapsed:.3f}s, throughput: {ok / elapsed:.1f} adds/s")
+        self.stdout.write(
+            f"latency ms p50={percentile_ms(latencies, 0.50):.1f} "
+            f"p95={percentile_ms(latencies, 0.95):.1f} p99={percentile_ms(latencies, 0.99):.1f}"
+        )
+
+        if not opts["keep"]:
+            cleanup_bench(BENCH_PREFIX)
+
+        self.stdout.write(self.style.SUCCESS("Done"))
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from cart.models import AbandonedCartVariantRollup
+from cart.services.cart_sweeper import CartSweeper
+
+
+class Command(BaseCommand):
+    help = (
+        "Abandoned cart sweeper: idle cart'larni va nofaol variant item'larini "
+        "batch'larda o'chiradi, kunlik abandoned-cart rollup yozadi. "
+        "Cron/scheduler orqali muntazam ishga tushiriladi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--idle-days", type=int, default=None, help="Default: settings.CART_ABANDONED_AFTER_DAYS")
+        parser.add_argument("--batch-size", type=int, default=None, help="Default: settings.CART_SWEEP_BATCH_SIZE")
+        parser.add_argument("--max-batches", type=int, default=None, help="Bitta ishga tushirishda batch limiti")
+        parser.add_argument("--skip-stale-items", action="store_true", help="Nofaol variant item'larini tozalamaslik")
+
+    def handle(self, *args, **opts):
+        started = time.perf_counter()
+
+        swept = CartSweeper.sweep_abandoned(
+            idle_days=opts["idle_days"],
+            batch_size=opts["batch_size"],
+            max_batches=opts["max_batches"],
+        )
+        self.stdout.write(
+            f"abandoned: carts_removed={swept.carts_removed} "
+            f"with_items={swept.abandoned_carts} value={swept.abandoned_value} batches={swept.batches}"
+        )
+
+        if not opts["skip_stale_items"]:
+            stale = CartSweeper.purge_stale_items(
+                batch_size=opts["batch_size"],
+                max_batches=opts["max_batches"],
+            )
+            self.stdout.write(f"stale items removed={stale.stale_items_removed} batches={stale.batches}")
+
+        if swept.abandoned_carts:
+            top = (
+                AbandonedCartVariantRollup.objects
+                .order_by("-date", "-quantity")
+                .values_list("sku", "quantity")[:5]
+            )
+            self.stdout.write("top variants today: " + ", ".join(f"{sku} x{qty}" for sku, qty in top))
+
+        self.stdout.write(self.style.SUCCESS(f"Done in {time.perf_counter() - started:.2f}s"))
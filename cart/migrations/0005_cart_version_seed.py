@@ -0,0 +1,19 @@
+# Generated by Django 6.0.2 on 2026-10-20 10:40
+
+import cart.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0004_abandoned_cart_rollups'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='cart',
+            name='version',
+            field=models.PositiveBigIntegerField(default=cart.models.initial_cart_version),
+        ),
+    ]
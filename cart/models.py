@@ -1,11 +1,21 @@
+import time
 from decimal import Decimal
 
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from catalog.models import ProductVariant
 
 
 
+def initial_cart_version() -> int:
+    """
+    Yangi cart versiyasi — vaqt (mikrosekund): CartSweeper cart'ni o'chirib,
+    keyin qayta yaratilsa ham versiya eski ETag'larga mos kelmaydi.
+    """
+    return time.time_ns() // 1000
+
+
 class Cart(models.Model):
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL,
@@ -13,6 +23,9 @@ class Cart(models.Model):
         related_name='cart'
     )
 
+    # Har bir CartService mutatsiyasida atomik oshiriladi (ETag / If-Match)
+    version = models.PositiveBigIntegerField(default=initial_cart_version)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -23,10 +36,11 @@ class Cart(models.Model):
     def total_price(self) -> Decimal:
         """
         Cart ichidagi barcha item'lar summasi
-        (discount bilan birga)
+        (discount bilan birga). API va checkout CartPricer'dan foydalanadi.
         """
+        now = timezone.now()
         return sum(
-            (item.total_price for item in self.items.all()),
+            (item.get_unit_price(now) * item.quantity for item in self.items.all()),
             Decimal('0.00')
         )
 
@@ -58,20 +72,11 @@ class CartItem(models.Model):
 
 
 
-    def get_unit_price(self) -> Decimal:
+    def get_unit_price(self, now=None) -> Decimal:
         """
         Bitta mahsulot narxi (discount bo‘lsa — hisoblab)
         """
-        discount = getattr(self.variant, 'discount', None)
-
-        if discount and discount.is_valid:
-            return (
-                self.variant.price
-                * (Decimal('100') - discount.percent)
-                / Decimal('100')
-            )
-
-        return self.variant.price
+        return self.variant.price_at(now or timezone.now())
 
     @property
     def total_price(self) -> Decimal:
@@ -79,3 +84,54 @@ class CartItem(models.Model):
         Item umumiy narxi (unit_price * quantity)
         """
         return self.get_unit_price() * self.quantity
+
+
+
+class AbandonedCartRollup(models.Model):
+    """
+    Kunlik abandoned-cart yig'indisi (marketing uchun).
+    CartSweeper har bir batch'dan keyin inkremental yozadi.
+    """
+    date = models.DateField(unique=True)
+
+    cart_count = models.PositiveIntegerField(default=0)
+    item_count = models.PositiveIntegerField(default=0)
+    total_value = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-date']
+
+    def __str__(self):
+        return f"Abandoned carts {self.date}: {self.cart_count}"
+
+
+
+class AbandonedCartVariantRollup(models.Model):
+    """Kun bo'yicha tashlab ketilgan variantlar (top variants shu jadvaldan)."""
+    date = models.DateField()
+    variant = models.ForeignKey(
+        ProductVariant,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='+'
+    )
+    sku = models.CharField(max_length=50)
+
+    quantity = models.PositiveIntegerField(default=0)
+    total_value = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'sku'],
+                name='unique_abandoned_rollup_date_sku'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['date', '-quantity']),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.sku} x {self.quantity}"
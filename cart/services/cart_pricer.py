@@ -0,0 +1,109 @@
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+
+from django.utils import timezone
+
+from cart.models import Cart, CartItem
+from catalog.models import ProductVariant
+
+
+@dataclass(frozen=True)
+class CartLine:
+    item_id: int
+    variant: ProductVariant
+    quantity: int
+    unit_price: Decimal
+    total_price: Decimal
+
+    @property
+    def variant_id(self) -> int:
+        return self.variant.id
+
+    @property
+    def product_name(self) -> str:
+        return self.variant.product.name
+
+
+@dataclass(frozen=True)
+class CartPricing:
+    cart: Cart
+    lines: list[CartLine]
+    total_price: Decimal
+    priced_at: datetime
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.lines
+
+
+class CartPricer:
+    """
+    Cart narxlarini bitta joyda hisoblaydi.
+
+    Item, variant, product va discount bitta query bilan olinadi, barcha
+    qatorlar bitta `now` bilan bir marta o'tishda hisoblanadi. Natija
+    (CartPricing) CartSerializer va CheckoutService uchun umumiy.
+    """
+
+    @staticmethod
+    def _items_queryset():
+        return CartItem.objects.select_related(
+            "cart",
+            "variant",
+            "variant__product",
+            "variant__discount",
+        ).order_by("id")
+
+    @staticmethod
+    def _build(cart: Cart, items, now: datetime) -> CartPricing:
+        lines = []
+        total = Decimal("0.00")
+
+        for item in items:
+            unit_price = item.variant.price_at(now)
+            line_total = unit_price * item.quantity
+            total += line_total
+            lines.append(
+                CartLine(
+                    item_id=item.id,
+                    variant=item.variant,
+                    quantity=item.quantity,
+                    unit_price=unit_price,
+                    total_price=line_total,
+                )
+            )
+
+        return CartPricing(cart=cart, lines=lines, total_price=total, priced_at=now)
+
+    @staticmethod
+    def price(cart: Cart, *, now: datetime | None = None, for_update: bool = False) -> CartPricing:
+        """
+        Mavjud cart uchun narx hisoblash.
+
+        for_update=True bo'lsa faqat CartItem qatorlari lock qilinadi
+        (discount LEFT JOIN bo'lgani uchun `of=("self",)` shart).
+        """
+        now = now or timezone.now()
+        qs = CartPricer._items_queryset().filter(cart=cart)
+        if for_update:
+            qs = qs.select_for_update(of=("self",))
+        return CartPricer._build(cart, list(qs), now)
+
+    @staticmethod
+    def price_for_user(user, *, now: datetime | None = None) -> CartPricing:
+        """
+        User cart'i uchun narx hisoblash.
+
+        Bo'sh bo'lmagan cart uchun bitta query; cart bo'sh (yoki hali
+        yaratilmagan) bo'lsa qo'shimcha get_or_create.
+        """
+        now = now or timezone.now()
+        items = list(CartPricer._items_queryset().filter(cart__user=user))
+
+        if items:
+            cart = items[0].cart
+        else:
+            cart, _ = Cart.objects.get_or_create(user=user)
+
+        return CartPricer._build(cart, items, now)
@@ -1,6 +1,13 @@
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
 from cart.models import Cart, CartItem
-from catalog.models import ProductVariant
+from catalog.models import ProductVariant, StockStripe
+
+
+class CartVersionConflict(Exception):
+    """If-Match'dagi versiya cart'ning joriy versiyasiga mos kelmadi."""
 
 
 class CartService:
@@ -9,50 +16,95 @@ class CartService:
         cart, _ = Cart.objects.get_or_create(user=user)
         return cart
 
-
     @staticmethod
-    @transaction.atomic
-    def add_to_cart(user, variant_id: int, quantity: int = 1):
-        if quantity < 1:
-            raise ValueError("quantity must be greater than 0")
+    def bump_version(cart, expected_version: int | None = None) -> None:
+        """
+        Cart versiyasini atomik oshiradi (UPDATE ... SET version = version + 1).
 
-        cart = CartService.get_or_create_cart(user)
+        expected_version berilsa — shartli UPDATE (optimistic concurrency):
+        versiya mos kelmasa CartVersionConflict. UPDATE cart qatorini
+        tranzaksiya oxirigacha ushlab turadi, shuning uchun bitta cart
+        ustidagi parallel mutatsiyalar ketma-ket bajariladi.
+        """
+        qs = Cart.objects.filter(pk=cart.pk)
+        if expected_version is not None:
+            qs = qs.filter(version=expected_version)
+
+        updated = qs.update(version=F("version") + 1, updated_at=timezone.now())
+        if not updated:
+            raise CartVersionConflict("Cart was modified by another request.")
 
-        try:
-            variant = (
-                ProductVariant.objects
-                .select_for_update()
-                .get(id=variant_id, is_active=True)
-            )
-        except ProductVariant.DoesNotExist:
-            raise ValueError("Variant not found or inactive.")
 
-        item = (
-            CartItem.objects
-            .select_for_update()
-            .filter(cart=cart, variant=variant)
+    @staticmethod
+    def _available_stock(variant_id: int) -> int:
+        """
+        Read-committed stock o'qish (lock yo'q).
+
+        Cart stock'ni kamaytirmaydi, shuning uchun bu yerda faqat tekshiruv;
+        haqiqiy kafolat checkout'dagi shartli decrement'da.
+        """
+        stock = (
+            ProductVariant.objects
+            .filter(id=variant_id, is_active=True)
+            .annotate(total=F("stock_quantity") + StockStripe.total())
+            .values_list("total", flat=True)
             .first()
         )
+        if stock is None:
+            raise ValueError("Variant not found or inactive.")
+        return stock
+
+    @staticmethod
+    def _upsert_item(cart, variant_id: int, quantity: int, max_quantity: int):
+        """
+        Shartli UPDATE (quantity = quantity + q WHERE quantity + q <= max),
+        qator bo'lmasa — INSERT (savepoint ichida, unique_cart_variant).
+        Parallel INSERT yutsa, UPDATE yana bir marta uriniladi.
+
+        Hech qanday catalog qatori lock qilinmaydi.
+        Qaytaradi: (item_id, quantity) yoki None (stock yetarli emas).
+        """
+        items = CartItem.objects.filter(cart=cart, variant_id=variant_id)
+
+        def increment() -> int:
+            return items.filter(quantity__lte=max_quantity - quantity).update(quantity=F("quantity") + quantity)
+
+        if not increment():
+            try:
+                with transaction.atomic():
+                    item = CartItem.objects.create(cart=cart, variant_id=variant_id, quantity=quantity)
+                return item.id, item.quantity
+            except IntegrityError:
+                if not increment():
+                    return None
+        return items.values_list("id", "quantity").get()
 
-        current_qty = item.quantity if item else 0
-        new_qty = current_qty + quantity
+    @staticmethod
+    @transaction.atomic
+    def add_to_cart(user, variant_id: int, quantity: int = 1, *, expected_version: int | None = None):
+        if quantity < 1:
+            raise ValueError("quantity must be greater than 0")
+
+        cart = CartService.get_or_create_cart(user)
+        CartService.bump_version(cart, expected_version)
 
-        if variant.stock_quantity < new_qty:
+        stock = CartService._available_stock(variant_id)
+        if stock < quantity:
             raise ValueError("Not enough stock.")
 
-        if item:
-            item.quantity = new_qty
-            item.save(update_fields=["quantity"])
-        else:
-            item = CartItem.objects.create(cart=cart, variant=variant, quantity=quantity)
+        row = CartService._upsert_item(cart, variant_id, quantity, stock)
+        if row is None:
+            raise ValueError("Not enough stock.")
 
-        return item
+        item_id, new_qty = row
+        return CartItem(id=item_id, cart=cart, variant_id=variant_id, quantity=new_qty)
 
 
     @staticmethod
     @transaction.atomic
-    def remove_from_cart(user, variant_id: int):
+    def remove_from_cart(user, variant_id: int, *, expected_version: int | None = None):
         cart = CartService.get_or_create_cart(user)
+        CartService.bump_version(cart, expected_version)
 
         CartItem.objects.filter(
             cart=cart,
@@ -62,42 +114,27 @@ class CartService:
 
     @staticmethod
     @transaction.atomic
-    def change_quantity(user, variant_id: int, quantity: int):
+    def change_quantity(user, variant_id: int, quantity: int, *, expected_version: int | None = None):
         cart = CartService.get_or_create_cart(user)
+        CartService.bump_version(cart, expected_version)
 
         if quantity < 1:
             CartItem.objects.filter(cart=cart, variant_id=variant_id).delete()
             return None
 
-        try:
-            variant = (
-                ProductVariant.objects
-                .select_for_update()
-                .get(id=variant_id, is_active=True)
-            )
-        except ProductVariant.DoesNotExist:
-            raise ValueError("Variant not found or inactive.")
-
-        if variant.stock_quantity < quantity:
+        if CartService._available_stock(variant_id) < quantity:
             raise ValueError("Not enough stock.")
 
-        item = (
-            CartItem.objects
-            .select_for_update()
-            .filter(cart=cart, variant_id=variant_id)
-            .first()
-        )
-
-        if not item:
+        updated = CartItem.objects.filter(cart=cart, variant_id=variant_id).update(quantity=quantity)
+        if not updated:
             raise ValueError("Item not found in cart.")
 
-        item.quantity = quantity
-        item.save(update_fields=["quantity"])
-        return item
+        return CartItem(cart=cart, variant_id=variant_id, quantity=quantity)
 
 
     @staticmethod
     @transaction.atomic
-    def clear_cart(user):
+    def clear_cart(user, *, expected_version: int | None = None):
         cart = CartService.get_or_create_cart(user)
+        CartService.bump_version(cart, expected_version)
         cart.items.all().delete()
@@ -0,0 +1,149 @@
+from dataclasses import dataclass
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum
+from django.utils import timezone
+
+from cart.models import AbandonedCartRollup, AbandonedCartVariantRollup, Cart, CartItem
+
+
+@dataclass
+class SweepResult:
+    carts_removed: int = 0
+    abandoned_carts: int = 0
+    abandoned_value: Decimal = Decimal("0.00")
+    stale_items_removed: int = 0
+    batches: int = 0
+
+
+class CartSweeper:
+    """
+    Uzoq vaqt o'zgarmagan cart'larni va nofaol variantlarga qarashli
+    CartItem'larni kichik batch'larda o'chiradi.
+
+    Har bir batch alohida qisqa tranzaksiya: jadval uzoq lock qilinmaydi.
+    O'chirishdan oldin cart tarkibi AbandonedCartRollup jadvallariga
+    yig'iladi (qiymat — variantning joriy narxi, discount'siz).
+    """
+
+    @staticmethod
+    def _line_value():
+        return ExpressionWrapper(
+            F("quantity") * F("variant__price"),
+            output_field=DecimalField(max_digits=14, decimal_places=2),
+        )
+
+    @staticmethod
+    def _record_rollup(day, rows, cart_count: int) -> Decimal:
+        item_count = sum(r["qty"] for r in rows)
+        total_value = sum((r["value"] for r in rows), Decimal("0.00"))
+
+        rollup, _ = AbandonedCartRollup.objects.get_or_create(date=day)
+        AbandonedCartRollup.objects.filter(pk=rollup.pk).update(
+            cart_count=F("cart_count") + cart_count,
+            item_count=F("item_count") + item_count,
+            total_value=F("total_value") + total_value,
+        )
+
+        for r in rows:
+            vr, _ = AbandonedCartVariantRollup.objects.get_or_create(
+                date=day,
+                sku=r["variant__sku"],
+                defaults={"variant_id": r["variant_id"]},
+            )
+            AbandonedCartVariantRollup.objects.filter(pk=vr.pk).update(
+                quantity=F("quantity") + r["qty"],
+                total_value=F("total_value") + r["value"],
+            )
+
+        return total_value
+
+    @staticmethod
+    def sweep_abandoned(
+        *,
+        idle_days: int | None = None,
+        batch_size: int | None = None,
+        max_batches: int | None = None,
+        now=None,
+    ) -> SweepResult:
+        now = now or timezone.now()
+        idle_days = settings.CART_ABANDONED_AFTER_DAYS if idle_days is None else idle_days
+        batch_size = batch_size or settings.CART_SWEEP_BATCH_SIZE
+        cutoff = now - timedelta(days=idle_days)
+        day = timezone.localdate(now)
+
+        result = SweepResult()
+        last_id = 0
+
+        while max_batches is None or result.batches < max_batches:
+            ids = list(
+                Cart.objects
+                .filter(updated_at__lt=cutoff, id__gt=last_id)
+                .order_by("id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            last_id = ids[-1]
+
+            with transaction.atomic():
+                # Batch o'qilgandan keyin yangilangan cart'lar tegilmaydi
+                ids = list(
+                    Cart.objects
+                    .select_for_update(skip_locked=True)
+                    .filter(id__in=ids, updated_at__lt=cutoff)
+                    .values_list("id", flat=True)
+                )
+                if ids:
+                    items = CartItem.objects.filter(cart_id__in=ids, variant__is_active=True)
+                    rows = list(
+                        items
+                        .values("variant_id", "variant__sku")
+                        .annotate(qty=Sum("quantity"), value=Sum(CartSweeper._line_value()))
+                    )
+                    cart_count = items.values("cart_id").distinct().count()
+
+                    if rows:
+                        result.abandoned_value += CartSweeper._record_rollup(day, rows, cart_count)
+                        result.abandoned_carts += cart_count
+
+                    CartItem.objects.filter(cart_id__in=ids).delete()
+                    _, per_model = Cart.objects.filter(id__in=ids).delete()
+                    result.carts_removed += per_model.get(Cart._meta.label, 0)
+
+            result.batches += 1
+
+        return result
+
+    @staticmethod
+    def purge_stale_items(*, batch_size: int | None = None, max_batches: int | None = None) -> SweepResult:
+        """
+        Nofaol variantlarga qarashli CartItem'larni batch'larda o'chiradi.
+        Tegilgan cart'lar versiyasi shu tranzaksiyada oshadi: eski ETag
+        (304, If-Match, checkout quote) endi mos kelmaydi.
+        """
+        batch_size = batch_size or settings.CART_SWEEP_BATCH_SIZE
+        result = SweepResult()
+
+        while max_batches is None or result.batches < max_batches:
+            rows = list(
+                CartItem.objects
+                .filter(variant__is_active=False)
+                .order_by("id")
+                .values_list("id", "cart_id")[:batch_size]
+            )
+            if not rows:
+                break
+
+            with transaction.atomic():
+                deleted, _ = CartItem.objects.filter(id__in=[item_id for item_id, _ in rows]).delete()
+                # CartService.bump_version'dagi UPDATE; updated_at tegilmaydi —
+                # foydalanuvchi cart'ni o'zgartirmagan (abandoned hisobi saqlanadi)
+                Cart.objects.filter(id__in={cart_id for _, cart_id in rows}).update(version=F("version") + 1)
+            result.stale_items_removed += deleted
+            result.batches += 1
+
+        return result
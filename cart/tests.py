@@ -1,3 +1,209 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from cart.models import AbandonedCartRollup, AbandonedCartVariantRollup, Cart, CartItem
+from cart.services.cart_service import CartService
+from cart.services.cart_sweeper import CartSweeper
+from catalog.models import Brand, Category, Discount, Product, ProductVariant, SubCategory
+
+
+# GET /api/cart/ uchun query chegarasi (item soniga bog'liq emas).
+CART_RESPONSE_MAX_QUERIES = 1
+
+
+class CartPricingQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Food", slug="food")
+        subcategory = SubCategory.objects.create(category=category, name="Dairy", slug="dairy")
+        brand = Brand.objects.create(name="Brand", slug="brand")
+        cls.product = Product.objects.create(subcategory=subcategory, brand=brand, name="Milk", slug="milk")
+        cls.user = get_user_model().objects.create_user(username="buyer", password="pass")
+        cls.cart = Cart.objects.create(user=cls.user)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _add_variants(self, count: int, *, discounted: bool = False):
+        now = timezone.now()
+        start = ProductVariant.objects.count()
+        for i in range(start, start + count):
+            variant = ProductVariant.objects.create(
+                product=self.product,
+                name=f"{i}L",
+                unit="l",
+                value=Decimal("1"),
+                price=Decimal("10.00"),
+                stock_quantity=100,
+                sku=f"MILK-{i}",
+            )
+            if discounted:
+                Discount.objects.create(
+                    variant=variant,
+                    percent=50,
+                    start_date=now - timedelta(days=1),
+                    end_date=now + timedelta(days=1),
+                )
+            CartItem.objects.create(cart=self.cart, variant=variant, quantity=2)
+
+    def test_query_count_does_not_grow_with_items(self):
+        self._add_variants(1)
+        with self.assertNumQueries(CART_RESPONSE_MAX_QUERIES):
+            self.client.get("/api/cart/")
+
+        self._add_variants(10, discounted=True)
+        with self.assertNumQueries(CART_RESPONSE_MAX_QUERIES):
+            response = self.client.get("/api/cart/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["items"]), 11)
+
+    def test_totals_apply_discount_once_per_line(self):
+        self._add_variants(2, discounted=True)
+
+        response = self.client.get("/api/cart/")
+
+        self.assertEqual(response.status_code, 200)
+        for item in response.data["items"]:
+            self.assertEqual(item["unit_price"], Decimal("5.00"))
+            self.assertEqual(item["total_price"], Decimal("10.00"))
+        self.assertEqual(response.data["total_price"], Decimal("20.00"))
+
+
+class CartMutationTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Food", slug="food")
+        subcategory = SubCategory.objects.create(category=category, name="Dairy", slug="dairy")
+        brand = Brand.objects.create(name="Brand", slug="brand")
+        product = Product.objects.create(subcategory=subcategory, brand=brand, name="Milk", slug="milk")
+        self.variant = ProductVariant.objects.create(
+            product=product, name="1L", unit="l", value=Decimal("1"), price=Decimal("10.00"), stock_quantity=5,
+            sku="MILK",
+        )
+        self.user = get_user_model().objects.create_user(username="buyer", password="pass")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _add(self, etag: str | None = None, quantity: int = 1):
+        headers = {"HTTP_IF_MATCH": etag} if etag else {}
+        return self.client.post(
+            "/api/cart/add/", {"variant_id": self.variant.id, "quantity": quantity}, format="json", **headers
+        )
+
+    def test_etag_tracks_cart_version(self):
+        response = self._add()
+        version = Cart.objects.get(user=self.user).version
+        self.assertEqual(response["ETag"], f'"v{version}"')
+
+        response = self._add(response["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["ETag"], f'"v{version + 1}"')
+        self.assertEqual(self.client.get("/api/cart/")["ETag"], response["ETag"])
+
+    def test_stale_if_match_returns_412(self):
+        stale = self._add()["ETag"]
+        self._add()
+
+        response = self._add(stale)
+
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(CartItem.objects.get(cart__user=self.user).quantity, 2)
+
+    def test_version_does_not_repeat_after_sweep(self):
+        old = self._add()["ETag"]
+        old_version = Cart.objects.get(user=self.user).version
+        CartSweeper.sweep_abandoned(idle_days=0, now=timezone.now() + timedelta(minutes=1))
+        self.assertFalse(Cart.objects.filter(user=self.user).exists())
+
+        self.assertEqual(self._add(old).status_code, 412)
+        self.assertNotEqual(self._add()["ETag"], old)
+        self.assertGreater(Cart.objects.get(user=self.user).version, old_version)
+
+    def test_purge_of_inactive_variant_invalidates_cached_cart(self):
+        etag = self._add()["ETag"]
+        self.assertEqual(self.client.get("/api/cart/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        ProductVariant.objects.filter(pk=self.variant.pk).update(is_active=False)
+        CartSweeper.purge_stale_items()
+
+        response = self.client.get("/api/cart/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(self._add(etag).status_code, 412)
+
+    def test_add_never_exceeds_stock(self):
+        self.assertEqual(self._add(quantity=3).status_code, 200)
+        self.assertEqual(self._add(quantity=2).status_code, 200)
+
+        response = self._add(quantity=1)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["detail"], "Not enough stock.")
+        self.assertEqual(CartItem.objects.get(cart__user=self.user).quantity, 5)
+
+    def test_upsert_inserts_then_increments_within_limit(self):
+        cart = CartService.get_or_create_cart(self.user)
+
+        item_id, quantity = CartService._upsert_item(cart, self.variant.id, 2, 5)
+        self.assertEqual(quantity, 2)
+        self.assertEqual(CartService._upsert_item(cart, self.variant.id, 3, 5), (item_id, 5))
+        self.assertIsNone(CartService._upsert_item(cart, self.variant.id, 1, 5))
+        self.assertEqual(CartItem.objects.get(pk=item_id).quantity, 5)
+
+
+class CartSweeperTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Food", slug="food")
+        subcategory = SubCategory.objects.create(category=category, name="Dairy", slug="dairy")
+        brand = Brand.objects.create(name="Brand", slug="brand")
+        product = Product.objects.create(subcategory=subcategory, brand=brand, name="Milk", slug="milk")
+        self.active, self.inactive = (
+            ProductVariant.objects.create(
+                product=product, name=f"{i}L", unit="l", value=Decimal("1"), price=Decimal("10.00"),
+                stock_quantity=10, sku=f"MILK-{i}", is_active=i == 0,
+            )
+            for i in range(2)
+        )
+        users = get_user_model().objects
+        self.idle = Cart.objects.create(user=users.create_user(username="idle", password="pass"))
+        self.fresh = Cart.objects.create(user=users.create_user(username="fresh", password="pass"))
+        for cart in (self.idle, self.fresh):
+            CartItem.objects.create(cart=cart, variant=self.active, quantity=2)
+            CartItem.objects.create(cart=cart, variant=self.inactive, quantity=1)
+        Cart.objects.filter(pk=self.idle.pk).update(updated_at=timezone.now() - timedelta(days=31))
+
+    def test_sweep_rolls_up_then_deletes_idle_carts(self):
+        result = CartSweeper.sweep_abandoned(idle_days=30)
+
+        self.assertEqual((result.carts_removed, result.abandoned_carts), (1, 1))
+        self.assertEqual(result.abandoned_value, Decimal("20.00"))
+        self.assertEqual(list(Cart.objects.values_list("id", flat=True)), [self.fresh.id])
+        self.assertFalse(CartItem.objects.filter(cart_id=self.idle.id).exists())
+
+        rollup = AbandonedCartRollup.objects.get(date=timezone.localdate())
+        self.assertEqual((rollup.cart_count, rollup.item_count, rollup.total_value), (1, 2, Decimal("20.00")))
+        self.assertEqual(
+            list(AbandonedCartVariantRollup.objects.values_list("sku", "quantity", "total_value")),
+            [("MILK-0", 2, Decimal("20.00"))],
+        )
+
+        # Qayta ishga tushirish hech narsani ikki marta sanamaydi
+        self.assertEqual(CartSweeper.sweep_abandoned(idle_days=30).carts_removed, 0)
+        self.assertEqual(AbandonedCartRollup.objects.get().cart_count, 1)
+
+    def test_purge_removes_only_inactive_variant_items(self):
+        result = CartSweeper.purge_stale_items()
 
-# Create your tests here.
+        self.assertEqual(result.stale_items_removed, 2)
+        self.assertEqual(set(CartItem.objects.values_list("variant_id", flat=True)), {self.active.id})
+        # Versiya oshadi, lekin idle cart "yangilanmaydi" — sweep baribir oladi
+        self.assertEqual(
+            dict(Cart.objects.values_list("id", "version")),
+            {self.idle.id: self.idle.version + 1, self.fresh.id: self.fresh.version + 1},
+        )
+        self.assertEqual(CartSweeper.sweep_abandoned(idle_days=30).carts_removed, 1)
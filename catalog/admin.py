@@ -6,14 +6,81 @@ from .models import (
     Product,
     ProductVariant,
     ProductImage,
-    Discount
+    Discount,
+    StockDrift,
+    StockMovement,
+    StockSnapshot,
+    StockStripe,
 )
+from .services.stock_service import StockService
 
 admin.site.register(Category)
 admin.site.register(SubCategory)
 admin.site.register(Brand)
 admin.site.register(Product)
-admin.site.register(ProductVariant)
 admin.site.register(ProductImage)
 admin.site.register(Discount)
 
+
+@admin.register(ProductVariant)
+class ProductVariantAdmin(admin.ModelAdmin):
+    # stripe soni faqat manage.py stock_stripes orqali (stock ko'chiriladi)
+    readonly_fields = ["stock_stripes"]
+
+    def get_object(self, request, object_id, from_field=None):
+        obj = super().get_object(request, object_id, from_field)
+        if obj is not None and obj.stock_stripes:
+            # Striped variant: formada jami stock ko'rinadi va tahrirlanadi
+            obj.stock_quantity = obj.available_stock
+        return obj
+
+    def save_model(self, request, obj, form, change):
+        # stock_quantity faqat StockService.adjust orqali (ledger'ga 'adjustment');
+        # qolgan maydonlar update_fields bilan — parallel checkout'lar ezilmaydi
+        new_quantity = obj.stock_quantity
+        if change:
+            obj.save(update_fields=[
+                f.name for f in obj._meta.concrete_fields
+                if not f.primary_key and f.name not in ("stock_quantity", "stock_stripes")
+            ])
+        else:
+            obj.stock_quantity = 0
+            obj.save()
+        if not change or "stock_quantity" in form.changed_data:
+            StockService.adjust(obj.pk, new_quantity)
+
+
+@admin.register(StockMovement)
+class StockMovementAdmin(admin.ModelAdmin):
+    list_display = ["id", "variant", "delta", "reason", "order_id", "created_at"]
+    list_filter = ["reason"]
+    search_fields = ["variant__sku"]
+    raw_id_fields = ["variant"]
+
+    def has_change_permission(self, request, obj=None):
+        return False  # append-only
+
+
+@admin.register(StockSnapshot)
+class StockSnapshotAdmin(admin.ModelAdmin):
+    list_display = ["variant", "quantity", "through_movement_id", "as_of"]
+    search_fields = ["variant__sku"]
+    raw_id_fields = ["variant"]
+
+
+@admin.register(StockStripe)
+class StockStripeAdmin(admin.ModelAdmin):
+    list_display = ["variant", "index", "quantity"]
+    search_fields = ["variant__sku"]
+    raw_id_fields = ["variant"]
+
+    def has_change_permission(self, request, obj=None):
+        return False  # StockService / manage.py stock_stripes orqali
+
+
+@admin.register(StockDrift)
+class StockDriftAdmin(admin.ModelAdmin):
+    list_display = ["variant", "expected", "actual", "first_seen_at", "last_seen_at", "resolved_at"]
+    list_filter = ["resolved_at"]
+    search_fields = ["variant__sku"]
+    raw_id_fields = ["variant"]
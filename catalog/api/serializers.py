@@ -58,6 +58,8 @@ class DiscountSerializer(serializers.ModelSerializer):
 
 
 class ProductVariantSerializer(serializers.ModelSerializer):
+    # Striped variantlarda ham jami stock (stock_quantity + stripe'lar)
+    stock_quantity = serializers.IntegerField(source="available_stock", read_only=True)
     is_in_stock = serializers.BooleanField(read_only=True)
     discount = DiscountSerializer(read_only=True)
 
@@ -5,7 +5,9 @@ from rest_framework import filters
 from .filters import ProductFilter
 
 
-from catalog.models import Category, SubCategory, Brand, Product, ProductVariant
+from django.db.models import Prefetch
+
+from catalog.models import Category, SubCategory, Brand, Product, ProductVariant, StockStripe
 from .serializers import (
     CategoryListSerializer,
     CategoryDetailSerializer,
@@ -84,7 +86,15 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
         return (
             Product.objects.filter(is_active=True)
             .select_related("brand", "subcategory", "subcategory__category")
-            .prefetch_related("images", "variants", "variants__discount")
+            .prefetch_related(
+                "images",
+                Prefetch(
+                    "variants",
+                    queryset=ProductVariant.objects
+                    .select_related("discount")
+                    .annotate(stripe_stock=StockStripe.total()),
+                ),
+            )
             .distinct()
         )
 
@@ -107,5 +117,6 @@ class ProductVariantViewSet(viewsets.ReadOnlyModelViewSet):
             ProductVariant.objects.filter(is_active=True)
             .select_related("product", "product__brand", "product__subcategory", "product__subcategory__category")
             .select_related("discount")
+            .annotate(stripe_stock=StockStripe.total())
             .order_by("product__name", "name")
         )
\ No newline at end of file
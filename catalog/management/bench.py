@@ -0,0 +1,50 @@
+"""Benchmark management command'lari uchun umumiy fixture va o'lchov helper'lari."""
+
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+
+from catalog.models import Brand, Category, Product, ProductVariant, SubCategory
+
+
+def create_bench_variant(prefix: str, *, stock: int, price: Decimal = Decimal("1000.00")) -> ProductVariant:
+    category, _ = Category.objects.get_or_create(slug=prefix, defaults={"name": "Bench"})
+    subcategory, _ = SubCategory.objects.get_or_create(category=category, slug=prefix, defaults={"name": "Bench"})
+    brand, _ = Brand.objects.get_or_create(slug=prefix, defaults={"name": "Bench"})
+    product, _ = Product.objects.get_or_create(
+        subcategory=subcategory, slug=prefix, defaults={"brand": brand, "name": "Bench product"}
+    )
+    variant, _ = ProductVariant.objects.update_or_create(
+        sku=f"{prefix}-sku",
+        defaults={
+            "product": product,
+            "name": "hot",
+            "unit": "pcs",
+            "value": Decimal("1"),
+            "price": price,
+            "stock_quantity": stock,
+            "is_active": True,
+        },
+    )
+    return variant
+
+
+def create_bench_users(prefix: str, count: int) -> list:
+    User = get_user_model()
+    usernames = [f"{prefix}-{i}" for i in range(count)]
+    existing = set(User.objects.filter(username__in=usernames).values_list("username", flat=True))
+    User.objects.bulk_create([User(username=u) for u in usernames if u not in existing])
+    return list(User.objects.filter(username__in=usernames).order_by("id"))
+
+
+def cleanup_bench(prefix: str) -> None:
+    # Order'lar variantni PROTECT qiladi — avval user'lar (cascade) o'chiriladi
+    get_user_model().objects.filter(username__startswith=f"{prefix}-").delete()
+    Category.objects.filter(slug=prefix).delete()
+    Brand.objects.filter(slug=prefix).delete()
+
+
+def percentile_ms(sorted_latencies: list[float], p: float) -> float:
+    if not sorted_latencies:
+        return 0.0
+    return sorted_latencies[min(len(sorted_latencies) - 1, int(len(sorted_latencies) * p))] * 1000
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from catalog.services.stock_ledger import StockLedger
+
+
+class Command(BaseCommand):
+    help = (
+        "Stock ledger compaction: eski StockMovement'larni variant bo'yicha "
+        "StockSnapshot'ga yig'adi va o'chiradi (balans o'zgarmaydi)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than-days", type=int, default=None, help="Default: settings.STOCK_LEDGER_RETENTION_DAYS")
+        parser.add_argument("--batch-size", type=int, default=500, help="Bitta tranzaksiyadagi variantlar")
+        parser.add_argument("--max-batches", type=int, default=None, help="Bitta ishga tushirishda batch limiti")
+
+    def handle(self, *args, **opts):
+        started = time.perf_counter()
+        result = StockLedger.compact(
+            older_than_days=opts["older_than_days"],
+            batch_size=opts["batch_size"],
+            max_batches=opts["max_batches"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Compacted movements={result.movements_compacted} variants={result.variants} "
+                f"batches={result.batches} in {time.perf_counter() - started:.2f}s"
+            )
+        )
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from catalog.services.stock_stripes import StockStripes
+
+
+class Command(BaseCommand):
+    help = (
+        "Striped stock rebalancing: stripe'lari notekis (max - min >= --min-skew) "
+        "variantlarni qayta teng taqsimlaydi. Davriy (cron) ishga tushiriladi; "
+        "checkout ham stripe yetmaganda o'zi rebalance qiladi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--min-skew", type=int, default=2, help="Rebalance chegarasi (max - min)")
+
+    def handle(self, *args, **opts):
+        started = time.perf_counter()
+        result = StockStripes.rebalance_skewed(min_skew=opts["min_skew"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"checked={result.checked} rebalanced={result.rebalanced} "
+                f"in {time.perf_counter() - started:.2f}s"
+            )
+        )
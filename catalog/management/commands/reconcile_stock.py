@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from catalog.services.stock_ledger import StockLedger
+
+
+class Command(BaseCommand):
+    help = (
+        "Stock reconciliation: ledger balansi (snapshot + StockMovement) ni "
+        "ProductVariant.stock_quantity bilan solishtiradi, farqlarni StockDrift'ga "
+        "yozadi. Farq bo'lsa exit code 1 (monitoring uchun)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Bitta SELECT'dagi variantlar")
+
+    def handle(self, *args, **opts):
+        started = time.perf_counter()
+        result = StockLedger.reconcile(batch_size=opts["batch_size"])
+
+        for d in result.drifted:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"drift: variant={d['variant_id']} sku={d['sku']} "
+                    f"expected={d['expected']} actual={d['actual']} diff={d['actual'] - d['expected']:+d}"
+                )
+            )
+
+        self.stdout.write(
+            f"checked={result.checked} drifted={len(result.drifted)} resolved={result.resolved} "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+        if result.drifted:
+            raise SystemExit(1)
+        self.stdout.write(self.style.SUCCESS("Stock ledger is consistent"))
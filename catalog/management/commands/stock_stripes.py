@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog.models import ProductVariant
+from catalog.services.stock_stripes import MAX_STRIPES, StockStripes
+
+
+class Command(BaseCommand):
+    help = (
+        "Juda issiq variant uchun striped stock'ni yoqadi / o'zgartiradi / o'chiradi: "
+        "stock N ta StockStripe qatoriga teng bo'linadi (--stripes 0 — oddiy rejimga qaytarish). "
+        "Jami stock o'zgarmaydi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("sku", help="Variant SKU")
+        parser.add_argument("--stripes", type=int, required=True, help=f"0..{MAX_STRIPES}")
+
+    def handle(self, *args, **opts):
+        variant_id = ProductVariant.objects.filter(sku=opts["sku"]).values_list("id", flat=True).first()
+        if variant_id is None:
+            raise CommandError(f"Variant not found: {opts['sku']}")
+
+        try:
+            total = StockStripes.configure(variant_id, opts["stripes"])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{opts['sku']}: stripes={opts['stripes']} total={total}")
+        )
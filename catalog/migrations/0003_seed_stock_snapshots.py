@@ -0,0 +1,28 @@
+from django.db import migrations
+from django.utils import timezone
+
+
+def seed_snapshots(apps, schema_editor):
+    """Ledger boshlang'ich balansi = joriy stock_quantity."""
+    ProductVariant = apps.get_model("catalog", "ProductVariant")
+    StockSnapshot = apps.get_model("catalog", "StockSnapshot")
+
+    now = timezone.now()
+    batch = []
+    for variant_id, quantity in ProductVariant.objects.values_list("id", "stock_quantity").iterator(chunk_size=2000):
+        batch.append(StockSnapshot(variant_id=variant_id, quantity=quantity, as_of=now))
+        if len(batch) >= 2000:
+            StockSnapshot.objects.bulk_create(batch)
+            batch = []
+    StockSnapshot.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0002_stock_ledger'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_snapshots, migrations.RunPython.noop),
+    ]
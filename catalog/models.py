@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.core.validators import MinValueValidator, MaxValueValidator
 from decimal import Decimal
 from django.utils import timezone
@@ -120,6 +122,8 @@ class ProductVariant(models.Model):
         validators=[MinValueValidator(Decimal('0.01'))]
     )
     stock_quantity = models.PositiveIntegerField(default=0)
+    # >0: striped rejim — stock StockStripe qatorlarida, stock_quantity = 0
+    stock_stripes = models.PositiveSmallIntegerField(default=0)
     sku = models.CharField(max_length=50, unique=True)
 
     is_active = models.BooleanField(default=True)
@@ -128,14 +132,83 @@ class ProductVariant(models.Model):
     def __str__(self):
         return f"{self.product.name} - {self.name}"
 
+    @property
+    def available_stock(self) -> int:
+        """
+        Jami stock: stock_quantity + stripe'lar yig'indisi.
+        `stripe_stock` annotatsiyasi (StockStripe.total()) bo'lsa — qo'shimcha query yo'q.
+        """
+        if not self.stock_stripes:
+            return self.stock_quantity
+        striped = getattr(self, 'stripe_stock', None)
+        if striped is None:
+            striped = self.stock_stripe_rows.aggregate(s=models.Sum('quantity'))['s'] or 0
+        return self.stock_quantity + striped
+
     @property
     def is_in_stock(self):
-        return self.stock_quantity > 0
+        return self.available_stock > 0
+
+    def price_at(self, now) -> Decimal:
+        """
+        `now` paytidagi narx (discount amalda bo'lsa — hisoblab).
+        `discount` oldindan select_related qilingan bo'lishi kerak, aks holda
+        har chaqiruv alohida query.
+        """
+        discount = getattr(self, 'discount', None)
+
+        if discount and discount.is_valid_at(now):
+            return (
+                self.price
+                * (Decimal('100') - discount.percent)
+                / Decimal('100')
+            )
+
+        return self.price
 
     class Meta:
         unique_together = [('product', 'name'), ('product', 'sku')]
 
 
+class StockStripe(models.Model):
+    """
+    Juda issiq variantlar uchun stock sub-counter'i: decrement tasodifiy
+    stripe'ga tushadi, bitta variant qatori lock navbatiga aylanmaydi.
+    Jami = sum(quantity) (StockStripes).
+    """
+    variant = models.ForeignKey(
+        ProductVariant,
+        on_delete=models.CASCADE,
+        related_name='stock_stripe_rows'
+    )
+    index = models.PositiveSmallIntegerField()
+    quantity = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['variant', 'index'], name='unique_variant_stock_stripe')
+        ]
+
+    @staticmethod
+    def total(outer_ref='pk'):
+        """Variant stripe'lari yig'indisi (annotate uchun, stripe yo'q bo'lsa 0)."""
+        return Coalesce(
+            Subquery(
+                StockStripe.objects
+                .filter(variant=OuterRef(outer_ref))
+                .order_by()
+                .values('variant')
+                .annotate(s=models.Sum('quantity'))
+                .values('s')[:1],
+                output_field=models.IntegerField(),
+            ),
+            Value(0),
+        )
+
+    def __str__(self):
+        return f"{self.variant_id}#{self.index}: {self.quantity}"
+
+
 class Discount(models.Model):
     variant = models.OneToOneField(
         ProductVariant,
@@ -153,8 +226,94 @@ class Discount(models.Model):
 
     @property
     def is_valid(self):
-        now = timezone.now()
+        return self.is_valid_at(timezone.now())
+
+    def is_valid_at(self, now) -> bool:
         return self.is_active and self.start_date <= now <= self.end_date
 
     def __str__(self):
         return f"{self.percent}% for {self.variant}"
+
+
+class StockMovement(models.Model):
+    """
+    Append-only stock ledger: stock_quantity'ning har bir o'zgarishi
+    (StockService) shu tranzaksiyada bitta qator bo'lib yoziladi.
+    Balans = StockSnapshot.quantity + sum(delta).
+    """
+    REASON_CHECKOUT = 'checkout'
+    REASON_CANCEL = 'cancel'
+    REASON_ADJUSTMENT = 'adjustment'
+
+    REASON_CHOICES = [
+        (REASON_CHECKOUT, 'Checkout'),
+        (REASON_CANCEL, 'Order cancelled'),
+        (REASON_ADJUSTMENT, 'Manual adjustment'),
+    ]
+
+    variant = models.ForeignKey(
+        ProductVariant,
+        on_delete=models.CASCADE,
+        related_name='stock_movements'
+    )
+    delta = models.IntegerField()
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES)
+
+    # FK emas: order arxivlanishi mumkin, ledger esa o'zgarmaydi
+    order_id = models.BigIntegerField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['variant', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.variant_id}: {self.delta:+d} ({self.reason})"
+
+
+class StockSnapshot(models.Model):
+    """Compaction natijasi: through_movement_id gacha bo'lgan harakatlar yig'indisi."""
+    variant = models.OneToOneField(
+        ProductVariant,
+        on_delete=models.CASCADE,
+        related_name='stock_snapshot'
+    )
+    quantity = models.IntegerField(default=0)
+    through_movement_id = models.BigIntegerField(default=0)
+    as_of = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.variant_id}: {self.quantity} @ {self.as_of}"
+
+
+class StockDrift(models.Model):
+    """Reconciliation topgan farq: ledger balansi != stock_quantity."""
+    variant = models.ForeignKey(
+        ProductVariant,
+        on_delete=models.CASCADE,
+        related_name='stock_drifts'
+    )
+    expected = models.IntegerField()
+    actual = models.IntegerField()
+
+    first_seen_at = models.DateTimeField(auto_now_add=True)
+    last_seen_at = models.DateTimeField(default=timezone.now)
+    resolved_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['variant'],
+                condition=models.Q(resolved_at__isnull=True),
+                name='unique_open_stock_drift'
+            )
+        ]
+
+    @property
+    def difference(self):
+        return self.actual - self.expected
+
+    def __str__(self):
+        return f"{self.variant_id}: expected {self.expected}, actual {self.actual}"
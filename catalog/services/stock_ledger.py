@@ -0,0 +1,214 @@
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, F, IntegerField, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from catalog.models import ProductVariant, StockDrift, StockMovement, StockSnapshot, StockStripe
+
+
+@dataclass
+class ReconcileResult:
+    checked: int = 0
+    drifted: list[dict] = field(default_factory=list)
+    resolved: int = 0
+
+
+@dataclass
+class CompactResult:
+    variants: int = 0
+    movements_compacted: int = 0
+    batches: int = 0
+
+
+class StockLedger:
+    """
+    StockMovement ledger ustidagi davriy ishlar:
+
+    - reconcile: ledger balansi (snapshot + sum(delta)) ni jami stock
+      (stock_quantity + stripe'lar) bilan solishtiradi, farqlarni StockDrift'ga yozadi;
+    - compact: eski harakatlarni StockSnapshot'ga yig'ib, ledger'dan o'chiradi.
+    """
+
+    @staticmethod
+    def _ledger_sum():
+        return Coalesce(
+            Subquery(
+                StockMovement.objects
+                .filter(variant=OuterRef("pk"))
+                .order_by()
+                .values("variant")
+                .annotate(s=Sum("delta"))
+                .values("s")[:1],
+                output_field=IntegerField(),
+            ),
+            Value(0),
+        )
+
+    @staticmethod
+    def baseline(variant_ids, *, now=None) -> int:
+        """
+        Snapshot'i yo'q variantlar (0003 seed'dan keyin yaratilgan) uchun
+        boshlang'ich balans: snapshot = jami stock - ledger.
+        Birinchi reconcile/compact'da olinadi; keyingi farqlar drift bo'ladi.
+        """
+        now = now or timezone.now()
+        openings = (
+            ProductVariant.objects
+            .filter(id__in=variant_ids, stock_snapshot__isnull=True)
+            .annotate(opening=F("stock_quantity") + StockStripe.total() - StockLedger._ledger_sum())
+            .values_list("id", "opening")
+        )
+        return len(
+            StockSnapshot.objects.bulk_create(
+                [StockSnapshot(variant_id=vid, quantity=opening, as_of=now) for vid, opening in openings],
+                ignore_conflicts=True,
+            )
+        )
+
+    @staticmethod
+    def reconcile(*, batch_size: int = 1000) -> ReconcileResult:
+        """
+        Variantlar id bo'yicha batch'larda. Har bir batch — bitta SELECT
+        (jami stock va ledger yig'indisi bitta statement'da o'qiladi,
+        parallel checkout'lar noto'g'ri farq ko'rsatmaydi).
+        """
+        result = ReconcileResult()
+        now = timezone.now()
+        last_id = 0
+
+        while True:
+            rows = list(
+                ProductVariant.objects
+                .filter(id__gt=last_id)
+                .order_by("id")
+                .annotate(
+                    expected=Coalesce(F("stock_snapshot__quantity"), Value(0)) + StockLedger._ledger_sum(),
+                    actual=F("stock_quantity") + StockStripe.total(),
+                    baselined=Exists(StockSnapshot.objects.filter(variant=OuterRef("pk"))),
+                )
+                .values("id", "sku", "actual", "expected", "baselined")[:batch_size]
+            )
+            if not rows:
+                break
+            last_id = rows[-1]["id"]
+            result.checked += len(rows)
+
+            # Snapshot'siz variantlar: expected = 0 + ledger — birinchi marta baseline
+            unbaselined = [r["id"] for r in rows if not r["baselined"]]
+            if unbaselined:
+                StockLedger.baseline(unbaselined, now=now)
+                for r in rows:
+                    if not r["baselined"]:
+                        r["expected"] = r["actual"]
+
+            drifted = {r["id"]: r for r in rows if r["expected"] != r["actual"]}
+            ok_ids = [r["id"] for r in rows if r["id"] not in drifted]
+
+            with transaction.atomic():
+                if ok_ids:
+                    result.resolved += StockDrift.objects.filter(
+                        variant_id__in=ok_ids, resolved_at__isnull=True
+                    ).update(resolved_at=now)
+
+                open_drifts = {
+                    d.variant_id: d
+                    for d in StockDrift.objects.filter(variant_id__in=drifted.keys(), resolved_at__isnull=True)
+                }
+                to_create = []
+                to_update = []
+                for variant_id, r in drifted.items():
+                    drift = open_drifts.get(variant_id)
+                    if drift is None:
+                        to_create.append(
+                            StockDrift(
+                                variant_id=variant_id,
+                                expected=r["expected"],
+                                actual=r["actual"],
+                                last_seen_at=now,
+                            )
+                        )
+                    else:
+                        drift.expected = r["expected"]
+                        drift.actual = r["actual"]
+                        drift.last_seen_at = now
+                        to_update.append(drift)
+
+                StockDrift.objects.bulk_create(to_create)
+                StockDrift.objects.bulk_update(to_update, ["expected", "actual", "last_seen_at"])
+
+            result.drifted.extend(
+                {
+                    "variant_id": r["id"],
+                    "sku": r["sku"],
+                    "expected": r["expected"],
+                    "actual": r["actual"],
+                }
+                for r in drifted.values()
+            )
+
+        return result
+
+    @staticmethod
+    def compact(
+        *,
+        older_than_days: int | None = None,
+        batch_size: int = 500,
+        max_batches: int | None = None,
+        now=None,
+    ) -> CompactResult:
+        """
+        cutoff'dan eski harakatlarni variant bo'yicha StockSnapshot'ga qo'shadi
+        va o'chiradi. Har bir batch (batch_size ta variant) — bitta tranzaksiya;
+        balans (snapshot + ledger) o'zgarmaydi.
+        """
+        now = now or timezone.now()
+        older_than_days = settings.STOCK_LEDGER_RETENTION_DAYS if older_than_days is None else older_than_days
+        cutoff = now - timedelta(days=older_than_days)
+
+        result = CompactResult()
+        last_variant_id = 0
+
+        while max_batches is None or result.batches < max_batches:
+            variant_ids = list(
+                StockMovement.objects
+                .filter(created_at__lt=cutoff, variant_id__gt=last_variant_id)
+                .order_by("variant_id")
+                .values_list("variant_id", flat=True)
+                .distinct()[:batch_size]
+            )
+            if not variant_ids:
+                break
+            last_variant_id = variant_ids[-1]
+
+            with transaction.atomic():
+                # Compaction snapshot'ni 0 dan boshlamasin
+                StockLedger.baseline(variant_ids, now=now)
+                old = StockMovement.objects.filter(variant_id__in=variant_ids, created_at__lt=cutoff)
+                sums = list(
+                    old.values("variant_id").annotate(total=Sum("delta"), last=Max("id")).order_by()
+                )
+
+                for r in sums:
+                    snapshot, _ = StockSnapshot.objects.select_for_update().get_or_create(
+                        variant_id=r["variant_id"]
+                    )
+                    StockSnapshot.objects.filter(pk=snapshot.pk).update(
+                        quantity=F("quantity") + r["total"],
+                        through_movement_id=r["last"],
+                        as_of=now,
+                    )
+
+                # Faqat yig'ilgan qatorlar (id <= eng katta yig'ilgan id) o'chiriladi
+                if sums:
+                    result.movements_compacted += old.filter(
+                        id__lte=max(r["last"] for r in sums)
+                    ).delete()[0]
+
+            result.variants += len(sums)
+            result.batches += 1
+
+        return result
@@ -0,0 +1,192 @@
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+
+from catalog.models import ProductVariant, StockMovement, StockStripe
+from catalog.services.stock_stripes import StockStripes
+
+
+class InsufficientStock(ValueError):
+    """Bir yoki bir nechta variant uchun stock yetarli emas."""
+
+    def __init__(self, shortages: list[dict]):
+        self.shortages = shortages
+        details = ", ".join(
+            f"{s['product_name']} - {s['variant_name']} (requested {s['requested']}, available {s['available']})"
+            for s in shortages
+        )
+        super().__init__(f"Not enough stock: {details}" if details else "Not enough stock.")
+
+
+class StockService:
+    """
+    ProductVariant.stock_quantity ustidagi set-based o'zgarishlar.
+
+    Python'da o'qib-yozish (select_for_update + bulk_update) o'rniga bitta
+    shartli UPDATE: qatorlar faqat UPDATE davomida lock bo'ladi.
+
+    Har bir o'zgarish shu tranzaksiyada StockMovement ledger'iga
+    (bitta bulk INSERT) yoziladi.
+
+    Striped variantlar (stock_stripes > 0) StockStripes orqali o'tadi;
+    jami stock har doim stock_quantity + sum(stripe).
+    """
+
+    @staticmethod
+    def _record(rows) -> None:
+        """rows: (variant_id, delta, reason, order_id) — bitta bulk INSERT."""
+        StockMovement.objects.bulk_create(
+            [
+                StockMovement(variant_id=variant_id, delta=delta, reason=reason, order_id=order_id)
+                for variant_id, delta, reason, order_id in rows
+                if delta
+            ]
+        )
+
+    @staticmethod
+    def _delta(quantities: dict[int, int]) -> Case:
+        return Case(
+            *[When(id=variant_id, then=Value(qty)) for variant_id, qty in quantities.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+
+    @staticmethod
+    def shortages(quantities: dict[int, int]) -> list[dict]:
+        """Joriy stock bo'yicha yetishmayotgan qatorlar (requested / available)."""
+        rows = {
+            r["id"]: r
+            for r in ProductVariant.objects
+            .filter(id__in=quantities.keys())
+            .annotate(total=F("stock_quantity") + StockStripe.total())
+            .values("id", "sku", "name", "product__name", "total", "is_active")
+        }
+
+        result = []
+        for variant_id, requested in sorted(quantities.items()):
+            row = rows.get(variant_id)
+            available = row["total"] if row and row["is_active"] else 0
+            if available >= requested:
+                continue
+            result.append(
+                {
+                    "variant_id": variant_id,
+                    "sku": row["sku"] if row else None,
+                    "product_name": row["product__name"] if row else None,
+                    "variant_name": row["name"] if row else None,
+                    "requested": requested,
+                    "available": available,
+                }
+            )
+        return result
+
+    @staticmethod
+    def reserve(
+        quantities: dict[int, int],
+        *,
+        reason: str = StockMovement.REASON_CHECKOUT,
+        order_id: int | None = None,
+    ) -> None:
+        """
+        stock_quantity = stock_quantity - q WHERE stock_quantity >= q
+        (oddiy variantlar uchun bitta UPDATE); striped variantlar — stripe'dan
+        (StockStripes.take, variant id tartibida).
+
+        Birorta qator shartdan o'tmasa, UPDATE'lar savepoint bilan bekor qilinadi
+        va har bir yetishmayotgan qator bo'yicha InsufficientStock ko'tariladi.
+        """
+        quantities = {vid: qty for vid, qty in quantities.items() if qty > 0}
+        if not quantities:
+            return
+
+        striped = StockStripes.striped(quantities.keys())
+        plain = {vid: qty for vid, qty in quantities.items() if vid not in striped}
+
+        with transaction.atomic():
+            updated = 0
+            if plain:
+                delta = StockService._delta(plain)
+                updated = (
+                    ProductVariant.objects
+                    .filter(id__in=plain.keys(), is_active=True, stock_stripes=0, stock_quantity__gte=delta)
+                    .update(stock_quantity=F("stock_quantity") - delta)
+                )
+            if updated == len(plain) and all(
+                StockStripes.take(vid, striped[vid], quantities[vid]) for vid in sorted(striped)
+            ):
+                StockService._record(
+                    (variant_id, -qty, reason, order_id) for variant_id, qty in sorted(quantities.items())
+                )
+                return
+            transaction.set_rollback(True)
+
+        raise InsufficientStock(StockService.shortages(quantities))
+
+    @staticmethod
+    @transaction.atomic
+    def release(
+        quantities: dict[int, int],
+        *,
+        reason: str = StockMovement.REASON_CANCEL,
+        order_id: int | None = None,
+        per_order: dict[int, dict[int, int]] | None = None,
+    ) -> None:
+        """
+        Stock qaytarish: stock_quantity = stock_quantity + q (bitta UPDATE);
+        striped variantlar — tasodifiy stripe'ga.
+
+        per_order ({order_id: {variant_id: qty}}) berilsa, ledger qatorlari
+        order bo'yicha yoziladi (bulk cancel), UPDATE esa baribir bitta.
+        """
+        quantities = {vid: qty for vid, qty in quantities.items() if qty > 0}
+        if not quantities:
+            return
+
+        striped = dict(
+            ProductVariant.objects
+            .filter(id__in=quantities.keys(), stock_stripes__gt=0)
+            .values_list("id", "stock_stripes")
+        )
+        plain = {vid: qty for vid, qty in quantities.items() if vid not in striped}
+        if plain:
+            ProductVariant.objects.filter(id__in=plain.keys()).update(
+                stock_quantity=F("stock_quantity") + StockService._delta(plain)
+            )
+        for variant_id in sorted(striped):
+            StockStripes.put(variant_id, striped[variant_id], quantities[variant_id])
+
+        if per_order is None:
+            per_order = {order_id: quantities}
+        StockService._record(
+            (variant_id, qty, reason, oid)
+            for oid, rows in per_order.items()
+            for variant_id, qty in sorted(rows.items())
+        )
+
+    @staticmethod
+    @transaction.atomic
+    def adjust(variant_id: int, new_quantity: int) -> int:
+        """
+        Qo'lda stock o'rnatish (admin): farq ledger'ga 'adjustment' bo'lib yoziladi.
+        Qaytaradi: delta.
+        """
+        current, stripes = (
+            ProductVariant.objects
+            .select_for_update()
+            .values_list("stock_quantity", "stock_stripes")
+            .get(pk=variant_id)
+        )
+        if stripes:
+            current += sum(
+                StockStripe.objects
+                .select_for_update()
+                .filter(variant_id=variant_id)
+                .values_list("quantity", flat=True)
+            )
+        delta = new_quantity - current
+        if delta:
+            if stripes:
+                StockStripes.set_total(variant_id, new_quantity)
+            else:
+                ProductVariant.objects.filter(pk=variant_id).update(stock_quantity=new_quantity)
+            StockService._record([(variant_id, delta, StockMovement.REASON_ADJUSTMENT, None)])
+        return delta
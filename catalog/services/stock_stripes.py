@@ -0,0 +1,163 @@
+import random
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.db.models import F, Max, Min
+
+from catalog.models import ProductVariant, StockStripe
+
+
+MAX_STRIPES = 64
+
+
+@dataclass
+class RebalanceResult:
+    checked: int = 0
+    rebalanced: int = 0
+
+
+class StockStripes:
+    """
+    Striped stock: juda issiq variantning stock'i N ta StockStripe qatoriga
+    bo'linadi (opt-in, ProductVariant.stock_stripes > 0).
+
+    - take: tasodifiy stripe'dan shartli decrement, yetmasa — qolganlari;
+      hech biri alohida yetmasa, stripe'lar lock qilinib yig'iladi
+      (rebalance + decrement bitta qadamda);
+    - put: tasodifiy stripe'ga qaytarish;
+    - o'qish: stock_quantity + sum(stripe) (StockStripe.total()).
+
+    Ledger (StockMovement) variant darajasida qoladi — stripe'lar faqat
+    jismoniy taqsimot.
+    """
+
+    @staticmethod
+    def _split(total: int, count: int) -> list[int]:
+        base, extra = divmod(total, count)
+        return [base + (1 if i < extra else 0) for i in range(count)]
+
+    @staticmethod
+    def striped(variant_ids) -> dict[int, int]:
+        """{variant_id: stock_stripes} — faqat faol, striped variantlar."""
+        return dict(
+            ProductVariant.objects
+            .filter(id__in=variant_ids, is_active=True, stock_stripes__gt=0)
+            .values_list("id", "stock_stripes")
+        )
+
+    @staticmethod
+    def take(variant_id: int, stripes: int, quantity: int) -> bool:
+        """Chaqiruvchi tranzaksiyasi ichida. False — jami stock yetarli emas."""
+        order = list(range(stripes))
+        random.shuffle(order)
+        for index in order:
+            updated = StockStripe.objects.filter(
+                variant_id=variant_id, index=index, quantity__gte=quantity
+            ).update(quantity=F("quantity") - quantity)
+            if updated:
+                return True
+        return StockStripes.rebalance(variant_id, take=quantity)
+
+    @staticmethod
+    def put(variant_id: int, stripes: int, quantity: int) -> None:
+        StockStripe.objects.filter(variant_id=variant_id, index=random.randrange(stripes)).update(
+            quantity=F("quantity") + quantity
+        )
+
+    @staticmethod
+    @transaction.atomic
+    def rebalance(variant_id: int, *, take: int = 0) -> bool:
+        """
+        Stripe'larni (index tartibida) lock qiladi, `take` ni ayirib qolganini
+        teng taqsimlaydi. False — jami `take` dan kam (hech narsa o'zgarmaydi).
+        """
+        rows = list(
+            StockStripe.objects
+            .select_for_update()
+            .filter(variant_id=variant_id)
+            .order_by("index")
+        )
+        if not rows:
+            return False
+        total = sum(r.quantity for r in rows)
+        if total < take:
+            return False
+
+        for row, quantity in zip(rows, StockStripes._split(total - take, len(rows))):
+            row.quantity = quantity
+        StockStripe.objects.bulk_update(rows, ["quantity"])
+        return True
+
+    @staticmethod
+    @transaction.atomic
+    def set_total(variant_id: int, total: int) -> None:
+        """Striped variant jamisini o'rnatadi (admin adjustment), teng taqsimlab."""
+        rows = list(
+            StockStripe.objects
+            .select_for_update()
+            .filter(variant_id=variant_id)
+            .order_by("index")
+        )
+        for row, quantity in zip(rows, StockStripes._split(total, len(rows))):
+            row.quantity = quantity
+        StockStripe.objects.bulk_update(rows, ["quantity"])
+
+    @staticmethod
+    @transaction.atomic
+    def configure(variant_id: int, stripes: int) -> int:
+        """
+        Striped rejimni yoqish / o'chirish (stripes=0) yoki stripe sonini
+        o'zgartirish. Jami stock o'zgarmaydi (ledger'ga yozilmaydi).
+        Qaytaradi: jami stock.
+        """
+        if not 0 <= stripes <= MAX_STRIPES:
+            raise ValueError(f"stripes must be between 0 and {MAX_STRIPES}.")
+
+        current = (
+            ProductVariant.objects
+            .select_for_update()
+            .values_list("stock_quantity", flat=True)
+            .get(pk=variant_id)
+        )
+        locked = list(
+            StockStripe.objects
+            .select_for_update()
+            .filter(variant_id=variant_id)
+            .order_by("index")
+            .values_list("quantity", flat=True)
+        )
+        total = current + sum(locked)
+        StockStripe.objects.filter(variant_id=variant_id).delete()
+
+        if stripes:
+            StockStripe.objects.bulk_create(
+                [
+                    StockStripe(variant_id=variant_id, index=i, quantity=quantity)
+                    for i, quantity in enumerate(StockStripes._split(total, stripes))
+                ]
+            )
+            ProductVariant.objects.filter(pk=variant_id).update(stock_quantity=0, stock_stripes=stripes)
+        else:
+            ProductVariant.objects.filter(pk=variant_id).update(stock_quantity=total, stock_stripes=0)
+        return total
+
+    @staticmethod
+    def rebalance_skewed(*, min_skew: int = 2) -> RebalanceResult:
+        """
+        max - min >= min_skew bo'lgan striped variantlarni qayta taqsimlaydi
+        (davriy, manage.py rebalance_stock_stripes). Har bir variant — alohida
+        qisqa tranzaksiya.
+        """
+        result = RebalanceResult()
+        skewed = (
+            StockStripe.objects
+            .values("variant_id")
+            .annotate(hi=Max("quantity"), lo=Min("quantity"))
+            .order_by("variant_id")
+        )
+        for row in skewed:
+            result.checked += 1
+            if row["hi"] - row["lo"] >= min_skew:
+                StockStripes.rebalance(row["variant_id"])
+                result.rebalanced += 1
+        return result
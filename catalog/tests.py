@@ -1,3 +1,153 @@
-from django.test import TestCase
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.admin.sites import site
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from catalog.admin import ProductVariantAdmin
+from catalog.models import (
+    Brand,
+    Category,
+    Product,
+    ProductVariant,
+    StockMovement,
+    StockSnapshot,
+    StockStripe,
+    SubCategory,
+)
+from catalog.services.stock_ledger import StockLedger
+from catalog.services.stock_service import InsufficientStock, StockService
+from catalog.services.stock_stripes import StockStripes
+
+
+class ProductVariantAdminTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Food", slug="food")
+        subcategory = SubCategory.objects.create(category=category, name="Dairy", slug="dairy")
+        brand = Brand.objects.create(name="Brand", slug="brand")
+        self.product = Product.objects.create(subcategory=subcategory, brand=brand, name="Milk", slug="milk")
+        self.admin = ProductVariantAdmin(ProductVariant, site)
+        self.request = RequestFactory().post("/admin/")
+
+    def _variant(self, **kwargs) -> ProductVariant:
+        return ProductVariant(
+            product=self.product, name="1L", unit="l", value=Decimal("1"), price=Decimal("10.00"), sku="MILK", **kwargs
+        )
+
+    def _save(self, obj: ProductVariant, *, change: bool, changed: list[str]) -> None:
+        self.admin.save_model(self.request, obj, mock.Mock(changed_data=changed), change)
+
+    def test_add_records_opening_adjustment(self):
+        variant = self._variant(stock_quantity=5)
+        self._save(variant, change=False, changed=["name", "stock_quantity"])
+
+        variant.refresh_from_db()
+        self.assertEqual(variant.stock_quantity, 5)
+        self.assertEqual(
+            list(StockMovement.objects.filter(variant=variant).values_list("delta", "reason")),
+            [(5, StockMovement.REASON_ADJUSTMENT)],
+        )
+
+    def test_change_does_not_overwrite_concurrent_checkout(self):
+        variant = self._variant()
+        self._save(variant, change=False, changed=["stock_quantity"])
+        StockService.adjust(variant.pk, 10)
+
+        stale = ProductVariant.objects.get(pk=variant.pk)
+        StockService.reserve({variant.pk: 3})
+        stale.name = "1 litr"
+        self._save(stale, change=True, changed=["name"])
+
+        variant.refresh_from_db()
+        self.assertEqual((variant.name, variant.stock_quantity), ("1 litr", 7))
+
+        stale.stock_quantity = 20
+        self._save(stale, change=True, changed=["stock_quantity"])
+        variant.refresh_from_db()
+        self.assertEqual(variant.stock_quantity, 20)
+        self.assertEqual(StockMovement.objects.filter(variant=variant).latest("id").delta, 13)
+
+
+class StockLedgerBaselineTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Food", slug="food")
+        subcategory = SubCategory.objects.create(category=category, name="Dairy", slug="dairy")
+        brand = Brand.objects.create(name="Brand", slug="brand")
+        product = Product.objects.create(subcategory=subcategory, brand=brand, name="Milk", slug="milk")
+        # Admin'dan tashqari yaratilgan: snapshot ham, opening movement ham yo'q
+        self.variant = ProductVariant.objects.create(
+            product=product, name="1L", unit="l", value=Decimal("1"), price=Decimal("10.00"), sku="MILK",
+            stock_quantity=5,
+        )
+
+    def test_first_reconcile_baselines_new_variant(self):
+        self.assertEqual(StockLedger.reconcile().drifted, [])
+        self.assertEqual(StockSnapshot.objects.get(variant=self.variant).quantity, 5)
+
+        ProductVariant.objects.filter(pk=self.variant.pk).update(stock_quantity=4)
+        drifted = StockLedger.reconcile().drifted
+        self.assertEqual([(d["expected"], d["actual"]) for d in drifted], [(5, 4)])
+
+    def test_compact_baselines_before_folding_movements(self):
+        StockService.reserve({self.variant.pk: 2})
+        StockLedger.compact(older_than_days=0, now=timezone.now() + timedelta(minutes=1))
+
+        self.assertFalse(StockMovement.objects.filter(variant=self.variant).exists())
+        self.assertEqual(StockSnapshot.objects.get(variant=self.variant).quantity, 3)
+        self.assertEqual(StockLedger.reconcile().drifted, [])
+
+
+class StockStripesTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Food", slug="food")
+        subcategory = SubCategory.objects.create(category=category, name="Dairy", slug="dairy")
+        brand = Brand.objects.create(name="Brand", slug="brand")
+        product = Product.objects.create(subcategory=subcategory, brand=brand, name="Milk", slug="milk")
+        self.variant = ProductVariant.objects.create(
+            product=product, name="1L", unit="l", value=Decimal("1"), price=Decimal("10.00"), sku="MILK",
+            stock_quantity=9,
+        )
+        self.assertEqual(StockStripes.configure(self.variant.pk, 3), 9)
+
+    def _stripes(self) -> list[int]:
+        return list(
+            StockStripe.objects.filter(variant=self.variant).order_by("index").values_list("quantity", flat=True)
+        )
+
+    def _set(self, *quantities: int) -> None:
+        for index, quantity in enumerate(quantities):
+            StockStripe.objects.filter(variant=self.variant, index=index).update(quantity=quantity)
+
+    def test_configure_splits_total(self):
+        self.variant.refresh_from_db()
+        self.assertEqual((self.variant.stock_quantity, self.variant.stock_stripes), (0, 3))
+        self.assertEqual(self._stripes(), [3, 3, 3])
+
+    def test_take_falls_back_to_other_stripes(self):
+        self._set(0, 1, 5)
+        # Avval bo'sh stripe'lar tanlanadi — oxirgisidan olinishi kerak
+        with mock.patch("catalog.services.stock_stripes.random.shuffle", side_effect=lambda order: order.sort()):
+            self.assertTrue(StockStripes.take(self.variant.pk, 3, 4))
+        self.assertEqual(self._stripes(), [0, 1, 1])
+
+    def test_take_rebalances_when_no_single_stripe_is_enough(self):
+        self._set(2, 2, 2)
+        self.assertTrue(StockStripes.take(self.variant.pk, 3, 5))
+        self.assertEqual(sorted(self._stripes()), [0, 0, 1])
+
+        self.assertFalse(StockStripes.take(self.variant.pk, 3, 2))
+        self.assertEqual(sum(self._stripes()), 1)
+
+    def test_reserve_shortage_leaves_stripes_untouched(self):
+        StockService.reserve({self.variant.pk: 7})
+        self.assertEqual(sum(self._stripes()), 2)
+        self.assertEqual(StockMovement.objects.get(variant=self.variant).delta, -7)
+
+        with self.assertRaises(InsufficientStock):
+            StockService.reserve({self.variant.pk: 3})
+        self.assertEqual(sum(self._stripes()), 2)
+
+        StockService.release({self.variant.pk: 3})
+        self.assertEqual(sum(self._stripes()), 5)
@@ -2,6 +2,7 @@ from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
 from chat.models import Attachment, Conversation, ConversationMember, Message
+from orders.api.serializers import UserOrderStatsSerializer
 
 
 User = get_user_model()
@@ -120,6 +121,29 @@ class ConversationListSerializer(serializers.ModelSerializer):
         }
 
 
+class SupportConversationSerializer(ConversationListSerializer):
+    """Support queue: mijoz (created_by) va uning order yig'indilari (UserOrderStats)."""
+
+    customer = serializers.SerializerMethodField()
+
+    class Meta(ConversationListSerializer.Meta):
+        fields = ConversationListSerializer.Meta.fields + ["customer"]
+
+    def get_customer(self, obj):
+        user = obj.created_by
+        if user is None:
+            return None
+        # Expect created_by__order_stats select_related; qator bo'lmasa — null
+        stats = getattr(user, "order_stats", None)
+        return {
+            "id": user.id,
+            "username": user.username,
+            "first_name": user.first_name,
+            "last_name": user.last_name,
+            "order_stats": UserOrderStatsSerializer(stats).data if stats is not None else None,
+        }
+
+
 class ConversationCreateSerializer(serializers.Serializer):
     # direct chat
     user_id = serializers.IntegerField(required=False)
@@ -21,6 +21,7 @@ from chat.models import Attachment, Conversation, ConversationMember, Message, S
 from .serializers import (
     ConversationCreateSerializer,
     ConversationListSerializer,
+    SupportConversationSerializer,
     MessageSerializer,
     AttachmentSerializer,
     EmptySerializer,
@@ -388,7 +389,7 @@ class SupportQueueListApiView(APIView):
     def get(self, request):
         qs = (
             Conversation.objects.filter(type=Conversation.Type.SUPPORT)
-            .select_related("assigned_to")
+            .select_related("assigned_to", "created_by__order_stats")
             .order_by("status", "-created_at")
         )
 
@@ -407,7 +408,7 @@ class SupportQueueListApiView(APIView):
         last_msg = Message.objects.filter(conversation_id=OuterRef("pk")).order_by("-id")
         qs = qs.annotate(last_message_id=Subquery(last_msg.values("id")[:1]))
 
-        data = ConversationListSerializer(qs, many=True, context={"request": request}).data
+        data = SupportConversationSerializer(qs, many=True, context={"request": request}).data
         return Response(data)
 
 
@@ -8,6 +8,7 @@ from django.contrib.auth.models import AnonymousUser
 from django.core.cache import cache
 
 from chat.models import Conversation, ConversationMember, Message, Attachment
+from orders.services.order_events import OrderEvents
 MAX_MESSAGE_LEN = 2000
 MAX_MESSAGES_PER_10S = 25
 MAX_TYPING_EVENTS_PER_10S = 40
@@ -114,6 +115,11 @@ def mark_delivered(conversation_id: int, user_id: int, up_to_id: int) -> Optiona
     return msg.id
 
 
+@database_sync_to_async
+def order_events_since(user_id: int, since: int):
+    return OrderEvents.since(user_id, since)
+
+
 @database_sync_to_async
 def mark_read(conversation_id: int, user_id: int, up_to_id: int) -> Optional[int]:
     member = ConversationMember.objects.filter(conversation_id=conversation_id, user_id=user_id).first()
@@ -186,6 +192,17 @@ class ChatGatewayConsumer(AsyncWebsocketConsumer):
         msg_type = (payload.get("type") or "").strip().lower()
         conversation_id = payload.get("conversation_id")
 
+        if msg_type == "order_resume":
+            # orders: uzilishdan keyin o'tkazib yuborilgan order.status hodisalari
+            try:
+                since = max(0, int(payload.get("since") or 0))
+            except Exception:
+                await self.send(text_data=json.dumps({"type": "error", "code": "bad_since"}))
+                return
+            events, has_more = await order_events_since(self.user_id, since)
+            await self.send(text_data=json.dumps({"type": "order.replay", "events": events, "has_more": has_more}))
+            return
+
         if msg_type in {"join", "leave", "message", "typing", "read", "fetch"}:
             if not conversation_id:
                 await self.send(text_data=json.dumps({"type": "error", "code": "conversation_id_required"}))
@@ -389,3 +406,12 @@ class ChatGatewayConsumer(AsyncWebsocketConsumer):
                 }
             )
         )
+
+
+    async def order_status(self, event):
+        # orders: order holati o'zgardi (OrderEvents.push, commit'dan keyin)
+        await self.send(text_data=json.dumps({"type": "order.status", **(event.get("event") or {})}))
+
+    async def checkout_result(self, event):
+        # orders: async checkout job natijasi (run_checkout_worker)
+        await self.send(text_data=json.dumps({"type": "checkout.result", "job": event.get("job")}))
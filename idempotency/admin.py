@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from .models import IdempotencyRecord
+
+
+@admin.register(IdempotencyRecord)
+class IdempotencyRecordAdmin(admin.ModelAdmin):
+    list_display = ["id", "scope", "user", "key", "status_code", "created_at"]
+    list_filter = ["scope", "status_code"]
+    search_fields = ["key", "user__username"]
+    readonly_fields = ["created_at"]
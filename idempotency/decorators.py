@@ -0,0 +1,216 @@
+"""Idempotency-Key qo'llab-quvvatlashi (DRF function view'lar uchun).
+
+Ishlatish (api_view / permission_classes dan keyin, eng ichkarida):
+
+    @api_view(["POST"])
+    @permission_classes([permissions.IsAuthenticated])
+    @idempotent("orders.checkout")
+    def checkout(request): ...
+
+Kalit view'dan oldin DB'da egallanadi: (user, key) unique — pending
+IdempotencyRecord (status_code NULL). Parallel takroriy so'rov IntegrityError
+oladi va 409 qaytaradi; cache (Redis) ishlamasa ham view ikki marta
+bajarilmaydi. Birinchi javob (5xx bo'lmasa) shu qatorga yoziladi, cache —
+faqat read-through. Takroriy so'rov avval cache'dan, bo'lmasa DB'dan
+qaytariladi — view umuman chaqirilmaydi.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from drf_spectacular.utils import OpenApiParameter, OpenApiTypes
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from idempotency.models import IdempotencyRecord
+
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAY_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+# Javob bilan birga saqlanadigan header'lar
+STORED_HEADERS = ("ETag",)
+
+STORED_FIELDS = ("fingerprint", "status_code", "response_body", "response_headers")
+
+IDEMPOTENCY_KEY_PARAMETER = OpenApiParameter(
+    name=IDEMPOTENCY_HEADER,
+    type=OpenApiTypes.STR,
+    location=OpenApiParameter.HEADER,
+    required=False,
+    description="Retry uchun unikal kalit: takroriy so'rov birinchi javobni qaytaradi.",
+)
+
+
+def _ttl() -> int:
+    return int(getattr(settings, "IDEMPOTENCY_TTL_SECONDS", 24 * 60 * 60))
+
+
+def _pending_timeout() -> timedelta:
+    return timedelta(seconds=int(getattr(settings, "IDEMPOTENCY_PENDING_TIMEOUT_SECONDS", 60)))
+
+
+def _cache_key(user_id: int, key: str) -> str:
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+    return f"idem:u:{user_id}:{digest}"
+
+
+def _fingerprint(request, scope: str) -> str:
+    h = hashlib.sha256()
+    h.update(scope.encode("utf-8"))
+    h.update(request.method.encode("utf-8"))
+    h.update(request.get_full_path().encode("utf-8"))
+    h.update(request.body or b"")
+    return h.hexdigest()
+
+
+# Redis vaqtincha ishlamasa ham endpoint ishlashda davom etadi (DB fallback)
+def _cache_get(key: str):
+    try:
+        return cache.get(key)
+    except Exception:
+        return None
+
+
+def _cache_set(key: str, value, timeout: int) -> None:
+    try:
+        cache.set(key, value, timeout=timeout)
+    except Exception:
+        pass
+
+
+def _load_stored(user_id: int, key: str, cache_key: str) -> dict | None:
+    """Tugallangan javob (cache, bo'lmasa DB). Pending yozuv — None."""
+    stored = _cache_get(cache_key)
+    if stored is not None:
+        return stored
+
+    stored = (
+        IdempotencyRecord.objects
+        .filter(user_id=user_id, key=key, status_code__isnull=False)
+        .values(*STORED_FIELDS)
+        .first()
+    )
+    if stored is not None:
+        _cache_set(cache_key, stored, _ttl())
+    return stored
+
+
+def _claim(*, user_id: int, key: str, scope: str, fingerprint: str) -> IdempotencyRecord | dict | None:
+    """
+    Kalitni egallash: pending yozuv INSERT qilinadi. Qaytaradi:
+    IdempotencyRecord — egallandi (view bajariladi); dict — kalit band
+    (tugallangan javob yoki pending, status_code None); None — yozuv
+    shu orada o'chirildi (qayta urinish kerak).
+    """
+    try:
+        with transaction.atomic():
+            return IdempotencyRecord.objects.create(user_id=user_id, key=key, scope=scope, fingerprint=fingerprint)
+    except IntegrityError:
+        pass
+
+    # Yiqilgan so'rovning eskirgan pending yozuvi qayta egallanadi
+    now = timezone.now()
+    reclaimed = IdempotencyRecord.objects.filter(
+        user_id=user_id, key=key, status_code__isnull=True, created_at__lt=now - _pending_timeout()
+    ).update(scope=scope, fingerprint=fingerprint, created_at=now)
+    if reclaimed:
+        return IdempotencyRecord.objects.get(user_id=user_id, key=key)
+
+    return IdempotencyRecord.objects.filter(user_id=user_id, key=key).values(*STORED_FIELDS).first()
+
+
+def _replay(stored: dict) -> Response:
+    response = Response(stored["response_body"], status=stored["status_code"])
+    for name, value in (stored.get("response_headers") or {}).items():
+        response[name] = value
+    response[REPLAY_HEADER] = "true"
+    return response
+
+
+def _conflict(stored: dict, fingerprint: str) -> Response:
+    if stored["fingerprint"] != fingerprint:
+        return Response(
+            {"detail": f"{IDEMPOTENCY_HEADER} was already used for a different request."},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    if stored["status_code"] is None:
+        return Response(
+            {"detail": f"A request with this {IDEMPOTENCY_HEADER} is still in progress."},
+            status=status.HTTP_409_CONFLICT,
+        )
+    return _replay(stored)
+
+
+def _store(record: IdempotencyRecord, *, cache_key: str, response) -> None:
+    data = getattr(response, "data", None)
+    stored = {
+        "fingerprint": record.fingerprint,
+        "status_code": response.status_code,
+        # Birinchi javob qanday render bo'lsa, replay ham aynan shunday (Decimal va h.k.)
+        "response_body": json.loads(JSONRenderer().render(data)) if data is not None else None,
+        "response_headers": {h: response[h] for h in STORED_HEADERS if response.has_header(h)},
+    }
+    if _own(record).update(**stored):
+        _cache_set(cache_key, stored, _ttl())
+
+
+def _own(record: IdempotencyRecord):
+    # Eskirib, boshqa so'rov qayta egallagan bo'lsa — bu so'rovniki emas
+    return IdempotencyRecord.objects.filter(pk=record.pk, created_at=record.created_at, status_code__isnull=True)
+
+
+def idempotent(scope: str):
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            key = (request.headers.get(IDEMPOTENCY_HEADER) or "").strip()
+            user = getattr(request, "user", None)
+            if not key or not (user and user.is_authenticated):
+                return view(request, *args, **kwargs)
+
+            if len(key) > MAX_KEY_LENGTH:
+                return Response(
+                    {"detail": f"{IDEMPOTENCY_HEADER} is too long."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            fingerprint = _fingerprint(request, scope)
+            cache_key = _cache_key(user.id, key)
+
+            stored = _load_stored(user.id, key, cache_key)
+            if stored is not None:
+                return _conflict(stored, fingerprint)
+
+            claimed = None
+            while claimed is None:
+                claimed = _claim(user_id=user.id, key=key, scope=scope, fingerprint=fingerprint)
+            if not isinstance(claimed, IdempotencyRecord):
+                return _conflict(claimed, fingerprint)
+
+            try:
+                response = view(request, *args, **kwargs)
+            except BaseException:
+                _own(claimed).delete()
+                raise
+
+            if response.status_code < 500:
+                _store(claimed, cache_key=cache_key, response=response)
+            else:
+                # 5xx saqlanmaydi: keyingi retry view'ni qayta bajaradi
+                _own(claimed).delete()
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from idempotency.models import IdempotencyRecord
+
+
+class Command(BaseCommand):
+    help = "Muddati o'tgan Idempotency-Key yozuvlarini batch'larda o'chiradi."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-seconds",
+            type=int,
+            default=None,
+            help="Default: settings.IDEMPOTENCY_TTL_SECONDS",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **opts):
+        ttl = opts["older_than_seconds"] or settings.IDEMPOTENCY_TTL_SECONDS
+        cutoff = timezone.now() - timedelta(seconds=ttl)
+        total = 0
+
+        while True:
+            ids = list(
+                IdempotencyRecord.objects
+                .filter(created_at__lt=cutoff)
+                .order_by("id")
+                .values_list("id", flat=True)[:opts["batch_size"]]
+            )
+            if not ids:
+                break
+            deleted, _ = IdempotencyRecord.objects.filter(id__in=ids).delete()
+            total += deleted
+
+        self.stdout.write(self.style.SUCCESS(f"Purged {total} idempotency records"))
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.db import models
+
+
+class IdempotencyRecord(models.Model):
+    """
+    Idempotency-Key bilan kelgan birinchi so'rovning saqlangan javobi.
+    Takroriy so'rovlar (mobile retry) shu javob bilan qaytariladi. Qator
+    view'dan oldin (pending) yoziladi — (user, key) unique kalitni egallaydi.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    key = models.CharField(max_length=255)
+    scope = models.CharField(max_length=100)
+
+    # method + path + body hash: bitta key boshqa so'rov uchun ishlatilmasin
+    fingerprint = models.CharField(max_length=64)
+
+    # NULL — kalit egallangan, so'rov hali bajarilmoqda (pending)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True)
+    response_headers = models.JSONField(default=dict, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "key"], name="unique_idempotency_user_key"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.scope} user={self.user_id} key={self.key}"
@@ -0,0 +1,83 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from idempotency.decorators import REPLAY_HEADER, idempotent
+from idempotency.models import IdempotencyRecord
+
+
+calls = []
+hooks = []
+
+
+@api_view(["POST"])
+@idempotent("tests.create")
+def create_view(request):
+    calls.append(request.data)
+    for hook in hooks:
+        hook()
+    if request.data.get("fail"):
+        return Response({"detail": "boom"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    return Response({"id": len(calls)}, status=status.HTTP_201_CREATED, headers={"ETag": f'"{len(calls)}"'})
+
+
+class IdempotentDecoratorTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        calls.clear()
+        hooks.clear()
+        self.user = get_user_model().objects.create_user(username="buyer", password="p")
+        self.factory = APIRequestFactory()
+
+    def _post(self, data: dict, key: str = "k-1"):
+        request = self.factory.post("/orders/", data, format="json", **{"HTTP_IDEMPOTENCY_KEY": key})
+        force_authenticate(request, user=self.user)
+        return create_view(request)
+
+    def test_repeat_replays_first_response(self):
+        first = self._post({"q": 1})
+        cache.clear()  # DB'dan ham qaytadi
+        second = self._post({"q": 1})
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual((second.status_code, second.data), (first.status_code, first.data))
+        self.assertEqual(second["ETag"], first["ETag"])
+        self.assertEqual(second[REPLAY_HEADER], "true")
+
+    def test_same_key_different_body_is_rejected(self):
+        self._post({"q": 1})
+        response = self._post({"q": 2})
+
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(len(calls), 1)
+
+    def test_in_flight_duplicate_returns_409_without_cache(self):
+        # Birinchi so'rov view ichida turganda xuddi shu so'rov keladi; Redis ishlamaydi
+        duplicates = []
+        hooks.append(lambda: duplicates.append(self._post({"q": 1})))
+        with mock.patch("idempotency.decorators.cache") as broken:
+            broken.get.side_effect = broken.set.side_effect = ConnectionError
+            first = self._post({"q": 1})
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(duplicates[0].status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(IdempotencyRecord.objects.get(key="k-1").status_code, status.HTTP_201_CREATED)
+
+    def test_stale_pending_and_5xx_do_not_block_retry(self):
+        record = IdempotencyRecord.objects.create(user=self.user, key="k-1", scope="tests.create", fingerprint="x")
+        IdempotencyRecord.objects.filter(pk=record.pk).update(created_at=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(self._post({"q": 1}).status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(self._post({"fail": True}, key="k-2").status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertFalse(IdempotencyRecord.objects.filter(key="k-2").exists())
+        self.assertEqual(self._post({"fail": True}, key="k-2").status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(len(calls), 3)
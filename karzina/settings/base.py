@@ -46,6 +46,8 @@ INSTALLED_APPS = [
     "cart",
     "orders",
     "payments",
+    "idempotency",
+    "outbox",
 ]
 
 MIDDLEWARE = [
@@ -187,7 +189,67 @@ SPECTACULAR_SETTINGS = {
 
 
 
-PAYME_BASIC_AUTH = "Paycom:YOUR_KEY"
+# Payme Merchant API: "Paycom:<kalit>". Bo'sh yoki namuna qiymat bo'lsa — DEBUG'dan
+# tashqarida barcha so'rovlar rad etiladi (payme_merchant.basic_auth_credentials)
+PAYME_BASIC_AUTH = os.getenv("PAYME_BASIC_AUTH", "")
+# Payme: yaratilgan tranzaksiya shu muddatda perform bo'lmasa bekor qilinadi (reason=4)
+PAYME_TRANSACTION_TIMEOUT_MS = int(os.getenv("PAYME_TRANSACTION_TIMEOUT_MS", str(12 * 60 * 60 * 1000)))
+
+
+# Abandoned cart sweeper (manage.py sweep_carts)
+CART_ABANDONED_AFTER_DAYS = int(os.getenv("CART_ABANDONED_AFTER_DAYS", "30"))
+CART_SWEEP_BATCH_SIZE = int(os.getenv("CART_SWEEP_BATCH_SIZE", "500"))
+
+
+# Idempotency-Key javoblari (cache + DB) saqlanish muddati
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", str(24 * 60 * 60)))
+# Pending kalit (yiqilgan so'rov) shuncha vaqtdan keyin qayta egallanishi mumkin
+IDEMPOTENCY_PENDING_TIMEOUT_SECONDS = int(os.getenv("IDEMPOTENCY_PENDING_TIMEOUT_SECONDS", "60"))
+
+
+# Async (navbatli) checkout: worker shard'lari soni (manage.py run_checkout_worker)
+CHECKOUT_ASYNC_SHARDS = int(os.getenv("CHECKOUT_ASYNC_SHARDS", "4"))
+
+# POST /api/orders/quote/ imzolangan quote'ining amal qilish muddati
+CHECKOUT_QUOTE_TTL_SECONDS = int(os.getenv("CHECKOUT_QUOTE_TTL_SECONDS", "300"))
+
+
+# Order arxivi: yopilgan (delivered/cancelled) order'lar shu muddatdan keyin
+# archive jadvallariga ko'chiriladi (manage.py archive_orders)
+ORDER_ARCHIVE_AFTER_DAYS = int(os.getenv("ORDER_ARCHIVE_AFTER_DAYS", "365"))
+ORDER_ARCHIVE_BATCH_SIZE = int(os.getenv("ORDER_ARCHIVE_BATCH_SIZE", "500"))
+
+
+# Realtime order.status hodisalari (resume uchun) saqlanish muddati (manage.py purge_order_events)
+ORDER_STATUS_EVENT_RETENTION_DAYS = int(os.getenv("ORDER_STATUS_EVENT_RETENTION_DAYS", "30"))
+
+# Onlayn to'lov kutayotgan (pending, paid=False) order'lar shu muddatdan keyin
+# bekor qilinadi va stock qaytariladi (manage.py expire_pending_orders)
+ORDER_PAYMENT_TTL_MINUTES = int(os.getenv("ORDER_PAYMENT_TTL_MINUTES", "30"))
+ORDER_EXPIRY_BATCH_SIZE = int(os.getenv("ORDER_EXPIRY_BATCH_SIZE", "200"))
+
+
+# Stock ledger: shundan eski StockMovement'lar snapshot'ga yig'iladi (manage.py compact_stock_ledger)
+STOCK_LEDGER_RETENTION_DAYS = int(os.getenv("STOCK_LEDGER_RETENTION_DAYS", "90"))
+
+
+# Transactional outbox (manage.py dispatch_outbox / outbox_stats / purge_outbox)
+OUTBOX_SINKS = [
+    {"class": "outbox.sinks.ChannelLayerSink", "options": {"group": "outbox"}},
+    {"class": "outbox.sinks.LogFileSink", "options": {"path": os.getenv("OUTBOX_LOG_PATH", str(BASE_DIR / "logs" / "outbox.jsonl"))}},
+]
+if os.getenv("OUTBOX_WEBHOOK_URL"):
+    OUTBOX_SINKS.append(
+        {
+            "class": "outbox.sinks.WebhookSink",
+            "options": {"url": os.getenv("OUTBOX_WEBHOOK_URL"), "secret": os.getenv("OUTBOX_WEBHOOK_SECRET", "")},
+        }
+    )
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "10"))
+OUTBOX_RETRY_BASE_SECONDS = int(os.getenv("OUTBOX_RETRY_BASE_SECONDS", "5"))
+OUTBOX_RETRY_MAX_SECONDS = int(os.getenv("OUTBOX_RETRY_MAX_SECONDS", "600"))
+OUTBOX_LAG_WARNING_SECONDS = int(os.getenv("OUTBOX_LAG_WARNING_SECONDS", "60"))
+OUTBOX_RETENTION_DAYS = int(os.getenv("OUTBOX_RETENTION_DAYS", "7"))
 
 
 
@@ -198,6 +260,20 @@ CLICK_SECRET_KEY = os.getenv("CLICK_SECRET_KEY", "")
 
 CLICK_REQUIRE_SIGNATURE = _env_bool("CLICK_REQUIRE_SIGNATURE", default=not DEBUG)
 
+# Click callback javoblari (takroriy callback uchun): cache muddati va DB'da saqlanish
+# muddati (manage.py purge_click_callbacks)
+CLICK_CALLBACK_CACHE_SECONDS = int(os.getenv("CLICK_CALLBACK_CACHE_SECONDS", str(24 * 60 * 60)))
+CLICK_CALLBACK_RETENTION_DAYS = int(os.getenv("CLICK_CALLBACK_RETENTION_DAYS", "90"))
+
+# To'lov callback inbox'i: yoqilsa Click callback'lari faqat inbox'ga yoziladi va
+# worker qo'llaydi (manage.py run_payment_webhook_worker); o'chiq — sinxron
+PAYMENT_WEBHOOK_INBOX = _env_bool("PAYMENT_WEBHOOK_INBOX", default=False)
+PAYMENT_WEBHOOK_SHARDS = int(os.getenv("PAYMENT_WEBHOOK_SHARDS", "4"))
+PAYMENT_WEBHOOK_MAX_ATTEMPTS = int(os.getenv("PAYMENT_WEBHOOK_MAX_ATTEMPTS", "8"))
+PAYMENT_WEBHOOK_RETRY_BASE_SECONDS = int(os.getenv("PAYMENT_WEBHOOK_RETRY_BASE_SECONDS", "2"))
+PAYMENT_WEBHOOK_RETRY_MAX_SECONDS = int(os.getenv("PAYMENT_WEBHOOK_RETRY_MAX_SECONDS", "300"))
+PAYMENT_WEBHOOK_RETENTION_DAYS = int(os.getenv("PAYMENT_WEBHOOK_RETENTION_DAYS", "7"))
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
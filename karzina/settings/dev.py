@@ -7,6 +7,9 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # Parallel yozuvlar (checkout/cart) "database is locked" bilan yiqilmasin:
+        # write lock tranzaksiya boshida olinadi va navbat kutiladi.
+        "OPTIONS": {"transaction_mode": "IMMEDIATE", "timeout": 20},
     }
 }
 
@@ -1,3 +1,75 @@
 from django.contrib import admin
 
-# Register your models here.
+from orders.models import (
+    ArchivedOrder,
+    ArchivedOrderItem,
+    CheckoutJob,
+    OrderStatusEvent,
+    SalesCategoryRollup,
+    SalesDailyRollup,
+    SalesSkuRollup,
+    UserOrderStats,
+)
+
+
+@admin.register(CheckoutJob)
+class CheckoutJobAdmin(admin.ModelAdmin):
+    list_display = ("ticket", "user", "shard", "status", "order", "created_at", "finished_at")
+    list_filter = ("status", "shard")
+    search_fields = ("ticket", "user__username")
+    raw_id_fields = ("user", "order")
+    readonly_fields = ("ticket", "created_at", "started_at", "finished_at")
+
+
+@admin.register(SalesDailyRollup)
+class SalesDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ("date", "order_count", "paid_count", "cancelled_count", "gross_revenue", "paid_revenue", "updated_at")
+    date_hierarchy = "date"
+
+
+@admin.register(SalesCategoryRollup)
+class SalesCategoryRollupAdmin(admin.ModelAdmin):
+    list_display = ("date", "category_name", "order_count", "quantity", "revenue")
+    list_filter = ("date",)
+    search_fields = ("category_name",)
+    ordering = ("-date", "-revenue")
+
+
+@admin.register(SalesSkuRollup)
+class SalesSkuRollupAdmin(admin.ModelAdmin):
+    list_display = ("date", "sku", "product_name", "quantity", "revenue")
+    list_filter = ("date",)
+    search_fields = ("sku", "product_name")
+    ordering = ("-date", "-quantity")
+
+
+class ArchivedOrderItemInline(admin.TabularInline):
+    model = ArchivedOrderItem
+    extra = 0
+    can_delete = False
+    readonly_fields = ("variant", "sku", "product_name", "variant_name", "unit_price", "quantity")
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "status", "total_price", "paid", "created_at", "archived_at")
+    list_filter = ("status", "paid")
+    search_fields = ("id", "user__username", "phone")
+    raw_id_fields = ("user",)
+    inlines = [ArchivedOrderItemInline]
+
+
+@admin.register(OrderStatusEvent)
+class OrderStatusEventAdmin(admin.ModelAdmin):
+    list_display = ("user", "seq", "order_id", "status", "paid", "created_at")
+    list_filter = ("status",)
+    search_fields = ("user__username", "order_id")
+    raw_id_fields = ("user",)
+
+
+@admin.register(UserOrderStats)
+class UserOrderStatsAdmin(admin.ModelAdmin):
+    list_display = ("user", "order_count", "open_order_count", "paid_order_count", "total_spent", "last_order_at", "updated_at")
+    search_fields = ("user__username", "user__phone")
+    raw_id_fields = ("user",)
+    readonly_fields = ("order_count", "open_order_count", "paid_order_count", "total_spent", "last_order_at", "updated_at")
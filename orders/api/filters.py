@@ -0,0 +1,14 @@
+import django_filters
+from orders.models import Order
+
+class OrderFilter(django_filters.FilterSet):
+    status = django_filters.MultipleChoiceFilter(choices=Order.STATUS_CHOICES)
+    paid = django_filters.BooleanFilter()
+
+    # created_at__date emas — indeks ishlashi uchun to'g'ridan-to'g'ri oraliq
+    created_after = django_filters.IsoDateTimeFilter(field_name="created_at", lookup_expr="gte")
+    created_before = django_filters.IsoDateTimeFilter(field_name="created_at", lookup_expr="lt")
+
+    class Meta:
+        model = Order
+        fields = ["status", "paid", "created_after", "created_before"]
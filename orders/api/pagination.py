@@ -0,0 +1,84 @@
+import base64
+import binascii
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class OrderHistoryPagination(BasePagination):
+    """
+    Keyset pagination (OFFSET yo'q), (-created_at, -id) indekslari bo'yicha.
+
+    Hot (Order) va arxiv (ArchivedOrder) jadvallari bo'ylab bitta keyset:
+    har bir queryset'dan (created_at, id) < cursor bo'yicha page_size + 1
+    qator olinadi (indeks bo'yicha LIMIT), keyin Python'da birlashtiriladi.
+
+    Order va ArchivedOrder id'lari kesishmaydi (arxiv asl id'ni saqlaydi).
+    """
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_page_size(self, request) -> int:
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            created_at, pk = base64.urlsafe_b64decode(encoded.encode("ascii")).decode("ascii").split("|")
+            return datetime.fromisoformat(created_at), int(pk)
+        except (TypeError, ValueError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, obj) -> str:
+        raw = f"{obj.created_at.isoformat()}|{obj.pk}"
+        return base64.urlsafe_b64encode(raw.encode("ascii")).decode("ascii")
+
+    def paginate_querysets(self, querysets, request, view=None) -> list:
+        self.request = request
+        size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+
+        rows = []
+        for qs in querysets:
+            if cursor is not None:
+                created_at, pk = cursor
+                qs = qs.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+            rows.extend(qs.order_by("-created_at", "-id")[: size + 1])
+
+        rows.sort(key=lambda o: (o.created_at, o.pk), reverse=True)
+        page = rows[:size]
+        self.next_cursor = self.encode_cursor(page[-1]) if len(rows) > size else None
+        return page
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
@@ -1,6 +1,14 @@
 # orders/api/serializers.py
 from rest_framework import serializers
-from orders.models import Order, OrderItem
+from orders.models import (
+    ArchivedOrder,
+    ArchivedOrderItem,
+    CheckoutJob,
+    Order,
+    OrderItem,
+    SalesDailyRollup,
+    UserOrderStats,
+)
 
 
 class OrderItemSerializer(serializers.ModelSerializer):
@@ -26,6 +34,7 @@ class OrderItemSerializer(serializers.ModelSerializer):
 
 class OrderSerializer(serializers.ModelSerializer):
     items = OrderItemSerializer(many=True, read_only=True)
+    archived = serializers.BooleanField(default=False, read_only=True)
 
     class Meta:
         model = Order
@@ -42,6 +51,82 @@ class OrderSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
             "items",
+            "archived",
+        ]
+
+
+class OrderSummarySerializer(serializers.ModelSerializer):
+    """
+    Ro'yxat uchun: item'lar prefetch qilinmaydi, item_count annotatsiyadan.
+    ArchivedOrder instance'lari ham shu serializer bilan (archived=true).
+    """
+
+    item_count = serializers.IntegerField(read_only=True)
+    archived = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Order
+        fields = [
+            "id",
+            "status",
+            "total_price",
+            "item_count",
+            "paid",
+            "paid_at",
+            "cancelled_at",
+            "created_at",
+            "updated_at",
+            "archived",
+        ]
+
+    def get_archived(self, obj) -> bool:
+        return getattr(obj, "is_archived", False)
+
+
+class ArchivedOrderItemSerializer(serializers.ModelSerializer):
+    total_price = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ArchivedOrderItem
+        fields = [
+            "id",
+            "variant_id",
+            "sku",
+            "product_name",
+            "variant_name",
+            "unit_price",
+            "quantity",
+            "total_price",
+        ]
+
+    def get_total_price(self, obj):
+        return obj.total_price
+
+
+class ArchivedOrderSerializer(serializers.ModelSerializer):
+    """OrderSerializer bilan bir xil shakl + payment snapshot va archived_at."""
+
+    items = ArchivedOrderItemSerializer(many=True, read_only=True)
+    archived = serializers.BooleanField(source="is_archived", read_only=True)
+
+    class Meta:
+        model = ArchivedOrder
+        fields = [
+            "id",
+            "status",
+            "total_price",
+            "phone",
+            "address",
+            "comment",
+            "paid",
+            "paid_at",
+            "cancelled_at",
+            "created_at",
+            "updated_at",
+            "items",
+            "archived",
+            "archived_at",
+            "payment",
         ]
 
 
@@ -49,7 +134,188 @@ class CheckoutRequestSerializer(serializers.Serializer):
     phone = serializers.CharField(max_length=20)
     address = serializers.CharField()
     comment = serializers.CharField(required=False, allow_blank=True, default="")
+    # POST /api/orders/quote/ natijasi: yaroqli bo'lsa qayta narxlanmaydi
+    quote = serializers.CharField(required=False, allow_blank=True, default="")
+
+
+class QuoteLineSerializer(serializers.Serializer):
+    variant_id = serializers.IntegerField()
+    sku = serializers.CharField()
+    product_name = serializers.CharField()
+    variant_name = serializers.CharField()
+    quantity = serializers.IntegerField()
+    unit_price = serializers.DecimalField(max_digits=12, decimal_places=2)
+    total_price = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class QuoteShortageSerializer(serializers.Serializer):
+    variant_id = serializers.IntegerField()
+    sku = serializers.CharField(allow_null=True)
+    product_name = serializers.CharField(allow_null=True)
+    variant_name = serializers.CharField(allow_null=True)
+    requested = serializers.IntegerField()
+    available = serializers.IntegerField()
+
+
+class CheckoutQuoteSerializer(serializers.Serializer):
+    quote = serializers.CharField(allow_null=True)
+    expires_at = serializers.DateTimeField(allow_null=True)
+    cart_version = serializers.IntegerField()
+    total_price = serializers.DecimalField(max_digits=12, decimal_places=2)
+    can_checkout = serializers.BooleanField()
+    lines = QuoteLineSerializer(many=True)
+    shortages = QuoteShortageSerializer(many=True)
+
+
+class CheckoutJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CheckoutJob
+        fields = [
+            "ticket",
+            "status",
+            "order_id",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+
+
+class OrderExportQuerySerializer(serializers.Serializer):
+    file_format = serializers.ChoiceField(choices=["csv", "jsonl", "xlsx"], required=False, default="csv")
+    created_after = serializers.DateTimeField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+    status = serializers.ListField(child=serializers.ChoiceField(choices=Order.STATUS_CHOICES), required=False)
+    paid = serializers.BooleanField(required=False, allow_null=True, default=None)
+
+    def validate(self, attrs):
+        if (
+            attrs.get("created_after")
+            and attrs.get("created_before")
+            and attrs["created_after"] >= attrs["created_before"]
+        ):
+            raise serializers.ValidationError("created_after must be < created_before")
+        return attrs
+
+
+class OrderEventsQuerySerializer(serializers.Serializer):
+    since = serializers.IntegerField(required=False, min_value=0, default=0)
+    limit = serializers.IntegerField(required=False, min_value=1, max_value=500, default=200)
+
+
+class OrderStatusEventSerializer(serializers.Serializer):
+    seq = serializers.IntegerField()
+    order_id = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=Order.STATUS_CHOICES)
+    paid = serializers.BooleanField()
+    at = serializers.DateTimeField()
+
+
+class OrderEventsSerializer(serializers.Serializer):
+    events = OrderStatusEventSerializer(many=True)
+    has_more = serializers.BooleanField()
+    last_seq = serializers.IntegerField()
+
+
+class UserOrderStatsSerializer(serializers.ModelSerializer):
+    user_id = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = UserOrderStats
+        fields = [
+            "user_id",
+            "order_count",
+            "open_order_count",
+            "paid_order_count",
+            "total_spent",
+            "last_order_at",
+            "updated_at",
+        ]
+        read_only_fields = fields
 
 
 class UpdateStatusRequestSerializer(serializers.Serializer):
     status = serializers.ChoiceField(choices=Order.STATUS_CHOICES)
+
+
+class BulkStatusRequestSerializer(serializers.Serializer):
+    order_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        min_length=1,
+        max_length=1000,
+    )
+    status = serializers.ChoiceField(choices=Order.STATUS_CHOICES)
+
+
+class BulkStatusResultSerializer(serializers.Serializer):
+    order_id = serializers.IntegerField()
+    ok = serializers.BooleanField()
+    changed = serializers.BooleanField()
+    status = serializers.CharField(allow_null=True)
+    detail = serializers.CharField(allow_blank=True)
+
+
+class BulkStatusResponseSerializer(serializers.Serializer):
+    status = serializers.CharField()
+    updated = serializers.IntegerField()
+    unchanged = serializers.IntegerField()
+    failed = serializers.IntegerField()
+    results = BulkStatusResultSerializer(many=True)
+
+
+class SalesAnalyticsQuerySerializer(serializers.Serializer):
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    top = serializers.IntegerField(required=False, min_value=1, max_value=100, default=10)
+
+    def validate(self, attrs):
+        if attrs.get("date_from") and attrs.get("date_to") and attrs["date_from"] > attrs["date_to"]:
+            raise serializers.ValidationError("date_from must be <= date_to")
+        return attrs
+
+
+class SalesDailySerializer(serializers.ModelSerializer):
+    net_order_count = serializers.IntegerField(read_only=True)
+    net_revenue = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+    average_basket = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = SalesDailyRollup
+        fields = [
+            "date",
+            "order_count",
+            "paid_count",
+            "cancelled_count",
+            "net_order_count",
+            "item_quantity",
+            "gross_revenue",
+            "paid_revenue",
+            "cancelled_revenue",
+            "net_revenue",
+            "average_basket",
+        ]
+
+
+class SalesCategorySerializer(serializers.Serializer):
+    category_id = serializers.IntegerField(allow_null=True)
+    category_name = serializers.CharField()
+    order_count = serializers.IntegerField()
+    quantity = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class SalesSkuSerializer(serializers.Serializer):
+    sku = serializers.CharField()
+    variant_id = serializers.IntegerField(allow_null=True)
+    product_name = serializers.CharField()
+    quantity = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class SalesAnalyticsSerializer(serializers.Serializer):
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+    totals = SalesDailySerializer()
+    days = SalesDailySerializer(many=True)
+    categories = SalesCategorySerializer(many=True)
+    top_skus = SalesSkuSerializer(many=True)
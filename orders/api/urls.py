@@ -2,12 +2,27 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from orders.api.views import OrderViewSet, checkout
+from orders.api.views import (
+    OrderViewSet,
+    checkout,
+    checkout_async,
+    checkout_job_detail,
+    checkout_quote,
+    order_events,
+    order_export,
+    sales_analytics,
+)
 
 router = DefaultRouter()
 router.register("", OrderViewSet, basename="orders")
 
 urlpatterns = [
     path("checkout/", checkout, name="orders-checkout"),
+    path("quote/", checkout_quote, name="orders-quote"),
+    path("checkout/async/", checkout_async, name="orders-checkout-async"),
+    path("checkout/jobs/<uuid:ticket>/", checkout_job_detail, name="orders-checkout-job"),
+    path("events/", order_events, name="orders-events"),
+    path("export/", order_export, name="orders-export"),
+    path("analytics/sales/", sales_analytics, name="orders-sales-analytics"),
     path("", include(router.urls)),
 ]
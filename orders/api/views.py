@@ -1,18 +1,51 @@
 # orders/api/views.py
+from datetime import timedelta
+
 from django.core.exceptions import ValidationError
-from drf_spectacular.utils import OpenApiResponse, extend_schema
+from django.db.models import Count, IntegerField, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from drf_spectacular.utils import OpenApiResponse, extend_schema, extend_schema_view
 
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import api_view, action, permission_classes
 from rest_framework.response import Response
 
+from catalog.services.stock_service import InsufficientStock
+from idempotency.decorators import IDEMPOTENCY_KEY_PARAMETER, idempotent
+from orders.api.filters import OrderFilter
+from orders.api.pagination import OrderHistoryPagination
 from orders.api.serializers import (
+    ArchivedOrderSerializer,
+    BulkStatusRequestSerializer,
+    BulkStatusResponseSerializer,
+    CheckoutJobSerializer,
+    CheckoutQuoteSerializer,
     CheckoutRequestSerializer,
+    OrderEventsQuerySerializer,
+    OrderEventsSerializer,
+    OrderExportQuerySerializer,
     OrderSerializer,
+    OrderSummarySerializer,
+    SalesAnalyticsQuerySerializer,
+    SalesAnalyticsSerializer,
     UpdateStatusRequestSerializer,
 )
-from orders.models import Order
+from orders.models import (
+    ArchivedOrder,
+    CheckoutJob,
+    Order,
+    OrderItem,
+    SalesCategoryRollup,
+    SalesDailyRollup,
+    SalesSkuRollup,
+)
+from orders.services.checkout_queue import CheckoutQueue
+from orders.services.checkout_quote import CheckoutQuote, QuoteInvalid
 from orders.services.checkout_service import CheckoutService
+from orders.services.order_events import OrderEvents
+from orders.services.order_export import FORMATS, OrderExport
 from orders.services.order_status_service import OrderStatusService
 
 
@@ -20,14 +53,17 @@ from orders.services.order_status_service import OrderStatusService
     tags=["Orders"],
     summary="Checkout: create order from current user's cart (COD)",
     request=CheckoutRequestSerializer,
+    parameters=[IDEMPOTENCY_KEY_PARAMETER],
     responses={
         200: OrderSerializer,
         400: OpenApiResponse(description="Bad request"),
         401: OpenApiResponse(description="Unauthorized"),
+        409: OpenApiResponse(description="Quote expired, invalid or cart changed since the quote"),
     },
 )
 @api_view(["POST"])
 @permission_classes([permissions.IsAuthenticated])
+@idempotent("orders.checkout")
 def checkout(request):
     ser = CheckoutRequestSerializer(data=request.data)
     ser.is_valid(raise_exception=True)
@@ -38,7 +74,12 @@ def checkout(request):
             phone=ser.validated_data["phone"],
             address=ser.validated_data["address"],
             comment=ser.validated_data.get("comment", ""),
+            quote=ser.validated_data.get("quote") or None,
         )
+    except InsufficientStock as e:
+        return Response({"detail": str(e), "shortages": e.shortages}, status=status.HTTP_400_BAD_REQUEST)
+    except QuoteInvalid as e:
+        return Response({"detail": str(e), "code": "quote_invalid"}, status=status.HTTP_409_CONFLICT)
     except ValueError as e:
         return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -46,21 +87,290 @@ def checkout(request):
     return Response(OrderSerializer(order).data, status=status.HTTP_200_OK)
 
 
+@extend_schema(
+    tags=["Orders"],
+    summary="Checkout quote: price the current cart without placing an order",
+    description=(
+        "CheckoutService bilan bir xil narx va stock tekshiruvi, lock va yozuvsiz. "
+        "Stock yetarli bo'lsa qisqa muddatli imzolangan `quote` qaytadi — uni "
+        "checkout'ga yuborilsa, cart o'zgarmagan ekan, qayta narxlanmaydi."
+    ),
+    request=None,
+    responses={
+        200: CheckoutQuoteSerializer,
+        400: OpenApiResponse(description="Cart is empty"),
+        401: OpenApiResponse(description="Unauthorized"),
+    },
+)
+@api_view(["POST"])
+@permission_classes([permissions.IsAuthenticated])
+def checkout_quote(request):
+    try:
+        quote = CheckoutQuote.build(request.user)
+    except ValueError as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(CheckoutQuoteSerializer(quote).data, status=status.HTTP_200_OK)
+
+
+@extend_schema(
+    tags=["Orders"],
+    summary="Async checkout: enqueue a checkout job and return a ticket",
+    description=(
+        "Checkout navbatga qo'yiladi va darhol ticket qaytadi. Natija WebSocket "
+        "(type=checkout.result) orqali yuboriladi va polling endpoint'da ko'rinadi."
+    ),
+    request=CheckoutRequestSerializer,
+    parameters=[IDEMPOTENCY_KEY_PARAMETER],
+    responses={
+        202: CheckoutJobSerializer,
+        400: OpenApiResponse(description="Bad request"),
+        401: OpenApiResponse(description="Unauthorized"),
+    },
+)
+@api_view(["POST"])
+@permission_classes([permissions.IsAuthenticated])
+@idempotent("orders.checkout_async")
+def checkout_async(request):
+    ser = CheckoutRequestSerializer(data=request.data)
+    ser.is_valid(raise_exception=True)
+
+    try:
+        job = CheckoutQueue.enqueue(
+            user=request.user,
+            phone=ser.validated_data["phone"],
+            address=ser.validated_data["address"],
+            comment=ser.validated_data.get("comment", ""),
+        )
+    except ValueError as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(CheckoutJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+@extend_schema(
+    tags=["Orders"],
+    summary="Async checkout: job status by ticket (polling)",
+    responses={
+        200: CheckoutJobSerializer,
+        401: OpenApiResponse(description="Unauthorized"),
+        404: OpenApiResponse(description="Not found"),
+    },
+)
+@api_view(["GET"])
+@permission_classes([permissions.IsAuthenticated])
+def checkout_job_detail(request, ticket):
+    job = CheckoutJob.objects.filter(ticket=ticket, user=request.user).first()
+    if job is None:
+        return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+    return Response(CheckoutJobSerializer(job).data, status=status.HTTP_200_OK)
+
+
+@extend_schema(
+    tags=["Orders"],
+    summary="Order status events since a sequence number (realtime resume)",
+    parameters=[OrderEventsQuerySerializer],
+    responses={
+        200: OrderEventsSerializer,
+        400: OpenApiResponse(description="Validation error"),
+        401: OpenApiResponse(description="Unauthorized"),
+    },
+)
+@api_view(["GET"])
+@permission_classes([permissions.IsAuthenticated])
+def order_events(request):
+    ser = OrderEventsQuerySerializer(data=request.query_params)
+    ser.is_valid(raise_exception=True)
+
+    # last_seq avval o'qiladi: undan keyingi hodisalar WS orqali keladi
+    last_seq = OrderEvents.last_seq(request.user.id)
+    events, has_more = OrderEvents.since(
+        request.user.id, ser.validated_data["since"], ser.validated_data["limit"]
+    )
+    return Response(
+        {"events": events, "has_more": has_more, "last_seq": last_seq},
+        status=status.HTTP_200_OK,
+    )
+
+
+@extend_schema(
+    tags=["Orders"],
+    summary="Admin: stream orders with items and payments (CSV / JSONL / XLSX)",
+    parameters=[OrderExportQuerySerializer],
+    responses={
+        (200, "text/csv"): OpenApiResponse(description="One row per order item"),
+        400: OpenApiResponse(description="Validation error"),
+        401: OpenApiResponse(description="Unauthorized"),
+        403: OpenApiResponse(description="Forbidden"),
+    },
+)
+@api_view(["GET"])
+@permission_classes([permissions.IsAdminUser])
+def order_export(request):
+    ser = OrderExportQuerySerializer(data=request.query_params)
+    ser.is_valid(raise_exception=True)
+    data = ser.validated_data
+    fmt = data["file_format"]
+
+    rows = OrderExport.rows(
+        created_after=data.get("created_after"),
+        created_before=data.get("created_before"),
+        statuses=data.get("status"),
+        paid=data["paid"],
+    )
+    response = StreamingHttpResponse(OrderExport.stream(fmt, rows), content_type=FORMATS[fmt])
+    response["Content-Disposition"] = f'attachment; filename="{OrderExport.filename(fmt)}"'
+    return response
+
+
+@extend_schema(
+    tags=["Orders"],
+    summary="Admin: sales analytics (daily, per category, top SKUs) from rollup tables",
+    parameters=[SalesAnalyticsQuerySerializer],
+    responses={
+        200: SalesAnalyticsSerializer,
+        400: OpenApiResponse(description="Validation error"),
+        401: OpenApiResponse(description="Unauthorized"),
+        403: OpenApiResponse(description="Forbidden"),
+    },
+)
+@api_view(["GET"])
+@permission_classes([permissions.IsAdminUser])
+def sales_analytics(request):
+    ser = SalesAnalyticsQuerySerializer(data=request.query_params)
+    ser.is_valid(raise_exception=True)
+
+    date_to = ser.validated_data.get("date_to") or timezone.localdate()
+    date_from = ser.validated_data.get("date_from") or date_to - timedelta(days=29)
+    top = ser.validated_data["top"]
+
+    days = list(SalesDailyRollup.objects.filter(date__range=(date_from, date_to)).order_by("date"))
+
+    totals = SalesDailyRollup(date=date_to)
+    for field in (
+        "order_count",
+        "paid_count",
+        "cancelled_count",
+        "item_quantity",
+        "gross_revenue",
+        "paid_revenue",
+        "cancelled_revenue",
+    ):
+        setattr(totals, field, sum(getattr(d, field) for d in days))
+
+    categories = (
+        SalesCategoryRollup.objects
+        .filter(date__range=(date_from, date_to))
+        .values("category_name")
+        .annotate(
+            category_id=Max("category_id"),
+            order_count=Sum("order_count"),
+            quantity=Sum("quantity"),
+            revenue=Sum("revenue"),
+        )
+        .order_by("-revenue")
+    )
+
+    top_skus = (
+        SalesSkuRollup.objects
+        .filter(date__range=(date_from, date_to))
+        .values("sku")
+        .annotate(
+            variant_id=Max("variant_id"),
+            product_name=Max("product_name"),
+            quantity=Sum("quantity"),
+            revenue=Sum("revenue"),
+        )
+        .order_by("-quantity", "-revenue")[:top]
+    )
+
+    data = SalesAnalyticsSerializer(
+        {
+            "date_from": date_from,
+            "date_to": date_to,
+            "totals": totals,
+            "days": days,
+            "categories": list(categories),
+            "top_skus": list(top_skus),
+        }
+    ).data
+    return Response(data, status=status.HTTP_200_OK)
+
+
+def _item_count_subquery():
+    # Korrelyatsiyalangan subquery: sahifadagi har bir order uchun (order, variant)
+    # indeksi bo'yicha sanaladi, butun jadval GROUP BY qilinmaydi.
+    return Coalesce(
+        Subquery(
+            OrderItem.objects
+            .filter(order=OuterRef("pk"))
+            .order_by()
+            .values("order")
+            .annotate(c=Count("id"))
+            .values("c")[:1],
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+@extend_schema_view(
+    list=extend_schema(tags=["Orders"], summary="List orders incl. archived (cursor pagination, summary only)"),
+    retrieve=extend_schema(tags=["Orders"], summary="Get order with items (falls back to the archive)"),
+)
 class OrderViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = OrderSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = OrderHistoryPagination
+    filterset_class = OrderFilter
+
+    def get_serializer_class(self):
+        if self.action == "list":
+            return OrderSummarySerializer
+        return OrderSerializer
 
     def get_queryset(self):
         if getattr(self, "swagger_fake_view", False):
-            return self.queryset.none() if hasattr(self, 'queryset') and self.queryset is not None else Order.objects.none()
-        qs = (
-            Order.objects
-            .prefetch_related("items", "items__variant")
-            .order_by("-created_at")
-        )
-        if self.request.user.is_staff:
-            return qs
-        return qs.filter(user=self.request.user)
+            return Order.objects.none()
+
+        qs = Order.objects.all()
+        if not self.request.user.is_staff:
+            qs = qs.filter(user=self.request.user)
+
+        if self.action == "list":
+            return qs.annotate(item_count=_item_count_subquery())
+        if self.action == "retrieve":
+            return qs.prefetch_related("items", "items__variant")
+        return qs
+
+    def get_archived_queryset(self):
+        qs = ArchivedOrder.objects.all()
+        if not self.request.user.is_staff:
+            qs = qs.filter(user=self.request.user)
+        return qs
+
+    def list(self, request, *args, **kwargs):
+        # Hot va arxiv jadvallariga bir xil filtrlar, keyin umumiy keyset
+        hot = self.filter_queryset(self.get_queryset())
+        archived = OrderFilter(request.query_params, queryset=self.get_archived_queryset(), request=request).qs
+
+        page = self.paginator.paginate_querysets([hot, archived], request, view=self)
+        return self.paginator.get_paginated_response(OrderSummarySerializer(page, many=True).data)
+
+    def retrieve(self, request, *args, **kwargs):
+        # get_object_or_404 kabi: raqam bo'lmagan id — 404 (500 emas)
+        try:
+            lookup = int(self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+        except (TypeError, ValueError):
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        order = self.get_queryset().filter(pk=lookup).first()
+        if order is not None:
+            return Response(OrderSerializer(order).data, status=status.HTTP_200_OK)
+
+        archived = self.get_archived_queryset().prefetch_related("items").filter(pk=lookup).first()
+        if archived is None:
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(ArchivedOrderSerializer(archived).data, status=status.HTTP_200_OK)
 
     @extend_schema(
         tags=["Orders"],
@@ -97,6 +407,47 @@ class OrderViewSet(viewsets.ReadOnlyModelViewSet):
         order = Order.objects.prefetch_related("items", "items__variant").get(pk=order.pk)
         return Response(OrderSerializer(order).data, status=status.HTTP_200_OK)
 
+    @extend_schema(
+        tags=["Orders"],
+        summary="Admin: transition many orders in one transaction (returns stock for cancellations)",
+        request=BulkStatusRequestSerializer,
+        responses={
+            200: BulkStatusResponseSerializer,
+            400: OpenApiResponse(description="Validation error"),
+            401: OpenApiResponse(description="Unauthorized"),
+            403: OpenApiResponse(description="Forbidden"),
+        },
+    )
+    @action(
+        detail=False,
+        methods=["post"],
+        permission_classes=[permissions.IsAdminUser],
+        url_path="bulk-status",
+    )
+    def bulk_status(self, request):
+        ser = BulkStatusRequestSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+
+        new_status = ser.validated_data["status"]
+        try:
+            results = OrderStatusService.bulk_update_status(
+                order_ids=ser.validated_data["order_ids"],
+                new_status=new_status,
+            )
+        except ValidationError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        updated = sum(1 for r in results if r["changed"])
+        failed = sum(1 for r in results if not r["ok"])
+        data = {
+            "status": new_status,
+            "updated": updated,
+            "unchanged": len(results) - updated - failed,
+            "failed": failed,
+            "results": results,
+        }
+        return Response(BulkStatusResponseSerializer(data).data, status=status.HTTP_200_OK)
+
     @extend_schema(
         tags=["Orders"],
         summary="User: cancel own order (only pending & unpaid; returns stock)",
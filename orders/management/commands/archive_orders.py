@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from orders.services.order_archiver import OrderArchiver
+
+
+class Command(BaseCommand):
+    help = (
+        "Yopilgan (delivered/cancelled) eski order'larni archive jadvallariga "
+        "batch'larda ko'chiradi. Cron/scheduler orqali muntazam ishga tushiriladi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than-days", type=int, default=None, help="Default: settings.ORDER_ARCHIVE_AFTER_DAYS")
+        parser.add_argument("--batch-size", type=int, default=None, help="Default: settings.ORDER_ARCHIVE_BATCH_SIZE")
+        parser.add_argument("--max-batches", type=int, default=None, help="Bitta ishga tushirishda batch limiti")
+
+    def handle(self, *args, **opts):
+        started = time.perf_counter()
+        result = OrderArchiver.archive(
+            older_than_days=opts["older_than_days"],
+            batch_size=opts["batch_size"],
+            max_batches=opts["max_batches"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Archived orders={result.orders_archived} items={result.items_archived} "
+                f"batches={result.batches} in {time.perf_counter() - started:.2f}s"
+            )
+        )
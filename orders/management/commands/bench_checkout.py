@@ -0,0 +1,101 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from cart.services.cart_service import CartService
+from catalog.management.bench import cleanup_bench, create_bench_users, create_bench_variant, percentile_ms
+from catalog.models import ProductVariant
+from catalog.services.stock_service import InsufficientStock
+from orders.services.checkout_service import CheckoutService
+
+
+BENCH_PREFIX = "bench-checkout"
+
+
+class Command(BaseCommand):
+    help = (
+        "Concurrent checkout benchmark: N ta foydalanuvchi bitta hot SKU'ni bir vaqtda "
+        "checkout qiladi (CheckoutService.checkout). Postgres va SQLite uchun "
+        "DATABASE_URL'ni almashtirib ishga tushiring. --stock < --buyers bo'lsa "
+        "sold-out holati ham o'lchanadi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--buyers", type=int, default=200, help="Parallel checkout'lar soni")
+        parser.add_argument("--quantity", type=int, default=1, help="Har bir cart'dagi miqdor")
+        parser.add_argument("--stock", type=int, default=None, help="Boshlang'ich stock (default: yetarli)")
+        parser.add_argument("--keep", action="store_true", help="Bench ma'lumotlarini o'chirmaslik")
+
+    def handle(self, *args, **opts):
+        buyers = opts["buyers"]
+        quantity = opts["quantity"]
+        stock = opts["stock"] if opts["stock"] is not None else buyers * quantity
+
+        cleanup_bench(BENCH_PREFIX)
+        variant = create_bench_variant(BENCH_PREFIX, stock=buyers * quantity)
+        users = create_bench_users(BENCH_PREFIX, buyers)
+        for user in users:
+            CartService.add_to_cart(user, variant_id=variant.id, quantity=quantity)
+        ProductVariant.objects.filter(pk=variant.pk).update(stock_quantity=stock)
+
+        barrier = threading.Barrier(len(users))
+        latencies: list[float] = []
+        sold_out = 0
+        errors: dict[str, int] = {}
+        lock = threading.Lock()
+
+        def worker(user):
+            nonlocal sold_out
+            try:
+                barrier.wait()
+                t0 = time.perf_counter()
+                try:
+                    CheckoutService.checkout(user=user, phone="+998900000000", address="bench")
+                except InsufficientStock:
+                    with lock:
+                        sold_out += 1
+                    return
+                except Exception as e:  # benchmark: xatolarni sanaymiz
+                    with lock:
+                        key = type(e).__name__
+                        errors[key] = errors.get(key, 0) + 1
+                    return
+                with lock:
+                    latencies.append(time.perf_counter() - t0)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(u,)) for u in users]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+
+        ok = len(latencies)
+        latencies.sort()
+        remaining = ProductVariant.objects.values_list("stock_quantity", flat=True).get(pk=variant.pk)
+
+        self.stdout.write(f"backend: {connection.vendor}")
+        self.stdout.write(
+            f"buyers: {buyers}, stock: {stock}, ok: {ok}, sold_out: {sold_out}, errors: {errors or 0}"
+        )
+        self.stdout.write(f"elapsed: {elapsed:.3f}s, throughput: {ok / elapsed:.1f} checkouts/s")
+        self.stdout.write(
+            f"latency ms p50={percentile_ms(latencies, 0.50):.1f} "
+            f"p95={percentile_ms(latencies, 0.95):.1f} p99={percentile_ms(latencies, 0.99):.1f}"
+        )
+
+        expected = stock - ok * quantity
+        if remaining != expected:
+            self.stdout.write(self.style.ERROR(f"stock drift: remaining={remaining}, expected={expected}"))
+        else:
+            self.stdout.write(f"remaining stock: {remaining} (consistent)")
+
+        if not opts["keep"]:
+            cleanup_bench(BENCH_PREFIX)
+
+        self.stdout.write(self.style.SUCCESS("Done"))
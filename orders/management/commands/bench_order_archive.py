@@ -0,0 +1,142 @@
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from catalog.management.bench import cleanup_bench, create_bench_users, create_bench_variant, percentile_ms
+from orders.models import ArchivedOrder, Order, OrderItem
+from orders.services.order_archiver import OrderArchiver
+
+
+BENCH_PREFIX = "bench-archive"
+
+
+class Command(BaseCommand):
+    help = (
+        "Order arxivlash benchmark: eski yopilgan order'lar bilan hot jadvalni "
+        "to'ldiradi, hot-table query latency'ni arxivlashdan oldin va keyin o'lchaydi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orders", type=int, default=20000, help="Jami bench order'lar")
+        parser.add_argument("--old-ratio", type=float, default=0.8, help="Arxivlanadigan (eski, yopilgan) ulush")
+        parser.add_argument("--users", type=int, default=50, help="Bench foydalanuvchilar soni")
+        parser.add_argument("--runs", type=int, default=200, help="Har bir query necha marta o'lchanadi")
+        parser.add_argument("--keep", action="store_true", help="Bench ma'lumotlarini o'chirmaslik")
+
+    def handle(self, *args, **opts):
+        cleanup_bench(BENCH_PREFIX)
+        variant = create_bench_variant(BENCH_PREFIX, stock=0)
+        users = create_bench_users(BENCH_PREFIX, opts["users"])
+
+        self._seed(users, variant, opts["orders"], opts["old_ratio"])
+        user = users[0]
+
+        queries = {
+            "staff list page": lambda: list(Order.objects.order_by("-created_at", "-id")[:20]),
+            "pending page": lambda: list(
+                Order.objects.filter(status=Order.STATUS_PENDING).order_by("-created_at", "-id")[:20]
+            ),
+            "user history page": lambda: list(
+                Order.objects.filter(user=user).order_by("-created_at", "-id")[:20]
+            ),
+            "pending count": lambda: Order.objects.filter(status=Order.STATUS_PENDING).count(),
+            "unpaid count": lambda: Order.objects.filter(paid=False).count(),
+        }
+
+        before = self._measure(queries, opts["runs"])
+        hot_before = Order.objects.count()
+
+        t0 = time.perf_counter()
+        result = OrderArchiver.archive()
+        archive_elapsed = time.perf_counter() - t0
+
+        after = self._measure(queries, opts["runs"])
+
+        self.stdout.write(f"backend: {connection.vendor}")
+        self.stdout.write(
+            f"hot rows: {hot_before} -> {Order.objects.count()}, archived: {result.orders_archived} orders / "
+            f"{result.items_archived} items in {result.batches} batches ({archive_elapsed:.2f}s), "
+            f"archive table: {ArchivedOrder.objects.count()}"
+        )
+        for name in queries:
+            b, a = before[name], after[name]
+            self.stdout.write(
+                f"{name:<18} p50 {percentile_ms(b, 0.50):7.2f} -> {percentile_ms(a, 0.50):7.2f} ms   "
+                f"p95 {percentile_ms(b, 0.95):7.2f} -> {percentile_ms(a, 0.95):7.2f} ms"
+            )
+
+        if not opts["keep"]:
+            cleanup_bench(BENCH_PREFIX)
+
+        self.stdout.write(self.style.SUCCESS("Done"))
+
+    def _seed(self, users, variant, total: int, old_ratio: float) -> None:
+        now = timezone.now()
+        old_total = int(total * old_ratio)
+        rng = random.Random(42)
+
+        orders = []
+        for i in range(total):
+            old = i < old_total
+            if old:
+                status = rng.choice([Order.STATUS_DELIVERED, Order.STATUS_CANCELLED])
+            else:
+                status = rng.choice([Order.STATUS_PENDING, Order.STATUS_CONFIRMED, Order.STATUS_SHIPPED])
+            orders.append(
+                Order(
+                    user=users[i % len(users)],
+                    status=status,
+                    total_price=variant.price,
+                    paid=status == Order.STATUS_DELIVERED,
+                    phone="+998900000000",
+                    address="bench",
+                )
+            )
+        Order.objects.bulk_create(orders, batch_size=1000)
+
+        ids = list(
+            Order.objects
+            .filter(user__username__startswith=f"{BENCH_PREFIX}-")
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+        OrderItem.objects.bulk_create(
+            [
+                OrderItem(
+                    order_id=order_id,
+                    variant=variant,
+                    sku=variant.sku,
+                    product_name="Bench product",
+                    variant_name=variant.name,
+                    unit_price=variant.price,
+                    quantity=1,
+                )
+                for order_id in ids
+            ],
+            batch_size=1000,
+        )
+
+        # auto_now_add bulk_create'da ham "hozir" — eski order'larni orqaga suramiz
+        old_ids = ids[:old_total]
+        chunk = 500
+        for n, start in enumerate(range(0, len(old_ids), chunk)):
+            Order.objects.filter(id__in=old_ids[start:start + chunk]).update(
+                created_at=now - timedelta(days=400 + n)
+            )
+
+    def _measure(self, queries, runs: int) -> dict[str, list[float]]:
+        result = {}
+        for name, query in queries.items():
+            query()  # warm-up
+            samples = []
+            for _ in range(runs):
+                t0 = time.perf_counter()
+                query()
+                samples.append(time.perf_counter() - t0)
+            samples.sort()
+            result[name] = samples
+        return result
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from orders.services.order_expiry import OrderExpiry
+
+
+class Command(BaseCommand):
+    help = (
+        "Onlayn to'lovi muddatida tugamagan pending order'larni bekor qiladi va "
+        "stock'ni qaytaradi. Cron/scheduler orqali muntazam ishga tushiriladi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ttl-minutes", type=int, default=None, help="Default: settings.ORDER_PAYMENT_TTL_MINUTES")
+        parser.add_argument("--batch-size", type=int, default=None, help="Default: settings.ORDER_EXPIRY_BATCH_SIZE")
+        parser.add_argument("--max-batches", type=int, default=None, help="Bitta ishga tushirishda batch limiti")
+
+    def handle(self, *args, **opts):
+        started = time.perf_counter()
+        result = OrderExpiry.expire(
+            ttl_minutes=opts["ttl_minutes"],
+            batch_size=opts["batch_size"],
+            max_batches=opts["max_batches"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Expired orders={result.orders_expired} payments={result.payments_cancelled} "
+                f"batches={result.batches} in {time.perf_counter() - started:.2f}s"
+            )
+        )
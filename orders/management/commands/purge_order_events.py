@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from orders.services.order_events import OrderEvents
+
+
+class Command(BaseCommand):
+    help = "Eski OrderStatusEvent (realtime resume) yozuvlarini batch'larda o'chiradi."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-days",
+            type=int,
+            default=None,
+            help="Default: settings.ORDER_STATUS_EVENT_RETENTION_DAYS",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **opts):
+        total = OrderEvents.purge(older_than_days=opts["older_than_days"], batch_size=opts["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Purged {total} order status events"))
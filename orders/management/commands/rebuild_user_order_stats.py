@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from orders.services.user_order_stats import UserOrderStatsService
+
+
+class Command(BaseCommand):
+    help = (
+        "UserOrderStats'ni Order + ArchivedOrder'dan qayta hisoblaydi "
+        "(foydalanuvchilar id bo'yicha batch'larda). Qayta ishga tushirish xavfsiz."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", dest="user_ids", type=int, action="append", default=None,
+                            help="Faqat shu foydalanuvchi(lar) (bir necha marta berish mumkin)")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **opts):
+        started = time.perf_counter()
+        total = UserOrderStatsService.rebuild(user_ids=opts["user_ids"], batch_size=opts["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {total} user order stats in {time.perf_counter() - started:.2f}s")
+        )
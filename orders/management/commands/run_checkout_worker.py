@@ -0,0 +1,91 @@
+import threading
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from orders.services.checkout_queue import CheckoutQueue
+
+
+class Command(BaseCommand):
+    help = (
+        "Async checkout worker pool: har bir shard uchun bitta thread, job'lar "
+        "shard ichida FIFO tartibda bajariladi. Bir nechta process ishga "
+        "tushirilsa, --shards bilan shard'larni bo'lib bering."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--shards",
+            type=str,
+            default="",
+            help="Vergul bilan shard raqamlari (default: barchasi, settings.CHECKOUT_ASYNC_SHARDS)",
+        )
+        parser.add_argument("--poll-interval", type=float, default=0.5, help="Navbat bo'sh bo'lsa kutish (s)")
+        parser.add_argument("--stale-after", type=int, default=300, help="'processing'da qolgan job'ni qaytarish (s)")
+        parser.add_argument("--once", action="store_true", help="Navbatni bo'shatib chiqib ketish")
+
+    def handle(self, *args, **opts):
+        if opts["shards"]:
+            shards = sorted({int(s) for s in opts["shards"].split(",") if s.strip()})
+        else:
+            shards = list(range(CheckoutQueue.shards()))
+
+        stale_after = timedelta(seconds=opts["stale_after"])
+
+        def requeue(shard):
+            requeued = CheckoutQueue.requeue_stale(shard, stale_after)
+            if requeued:
+                self.stdout.write(f"shard {shard}: requeued {requeued} stale job(s)")
+
+        stop = threading.Event()
+        counts = {shard: 0 for shard in shards}
+
+        def run(shard):
+            next_requeue = 0.0
+            try:
+                while not stop.is_set():
+                    try:
+                        # Ishlash davomida ham: xatodan keyin 'processing'da qolgan job'lar qaytadi
+                        if time.monotonic() >= next_requeue:
+                            requeue(shard)
+                            next_requeue = time.monotonic() + stale_after.total_seconds() / 2
+                        job = CheckoutQueue.claim_next(shard)
+                        if job is None:
+                            if opts["once"]:
+                                return
+                            stop.wait(opts["poll_interval"])
+                            continue
+                        CheckoutQueue.process(job)
+                        counts[shard] += 1
+                    except Exception as e:
+                        # process() xatolarni o'zi yopadi; bu yerga faqat DB/ulanish xatolari keladi —
+                        # job 'processing'da qolsa, --stale-after'dan keyin requeue() qaytaradi
+                        self.stderr.write(f"shard {shard}: {e!r}")
+                        connection.close()
+                        stop.wait(opts["poll_interval"])
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=run, args=(shard,), daemon=True) for shard in shards]
+        self.stdout.write(f"Checkout worker: shards={shards}")
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+
+        try:
+            for t in threads:
+                while t.is_alive():
+                    t.join(timeout=1)
+        except KeyboardInterrupt:
+            stop.set()
+            for t in threads:
+                t.join()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Done in {time.perf_counter() - started:.2f}s, processed: "
+                + ", ".join(f"shard {s}={n}" for s, n in counts.items())
+            )
+        )
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.2 on 2026-10-19 09:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0009_order_status_events'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('paid', False), ('status', 'pending')), fields=['created_at', 'id'], name='order_unpaid_pending_idx'),
+        ),
+    ]
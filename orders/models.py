@@ -1,11 +1,12 @@
 # orders/models.py
+import uuid
 from decimal import Decimal
 from django.db import models
 from django.conf import settings
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 
-from catalog.models import ProductVariant
+from catalog.models import Category, ProductVariant
 
 
 class Order(models.Model):
@@ -63,6 +64,22 @@ class Order(models.Model):
         STATUS_CANCELLED: set(),
     }
 
+    class Meta:
+        # Tarix ro'yxati: (-created_at, -id) keyset + filtrlar
+        indexes = [
+            models.Index(fields=["user", "-created_at", "-id"], name="order_user_created_idx"),
+            models.Index(fields=["status", "-created_at", "-id"], name="order_status_created_idx"),
+            models.Index(fields=["paid", "-created_at", "-id"], name="order_paid_created_idx"),
+            models.Index(fields=["-created_at", "-id"], name="order_created_idx"),
+            # To'lanmagan pending order'lar muddati (manage.py expire_pending_orders):
+            # faqat (status=pending, paid=False) qatorlar indekslanadi — kichik indeks
+            models.Index(
+                fields=["created_at", "id"],
+                name="order_unpaid_pending_idx",
+                condition=models.Q(status="pending", paid=False),
+            ),
+        ]
+
     def can_transition_to(self, new_status: str) -> bool:
         return new_status in self.STATUS_TRANSITIONS.get(self.status, set())
 
@@ -137,3 +154,308 @@ class OrderItem(models.Model):
 
     def __str__(self):
         return f"{self.product_name} - {self.variant_name} x {self.quantity}"
+
+
+class CheckoutJob(models.Model):
+    """
+    Navbatga qo'yilgan (async) checkout.
+
+    So'rov faqat job yaratadi va ticket qaytaradi; worker'lar job'larni
+    shard bo'yicha FIFO tartibda CheckoutService orqali bajaradi.
+    """
+
+    STATUS_QUEUED = "queued"
+    STATUS_PROCESSING = "processing"
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_PROCESSING, "Processing"),
+        (STATUS_SUCCEEDED, "Succeeded"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    ticket = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="checkout_jobs",
+    )
+
+    shard = models.PositiveSmallIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+
+    phone = models.CharField(max_length=20)
+    address = models.TextField()
+    comment = models.TextField(blank=True)
+
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    error = models.JSONField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["shard", "status", "id"]),
+            models.Index(fields=["user", "status"]),
+        ]
+
+    def __str__(self):
+        return f"CheckoutJob {self.ticket} ({self.status})"
+
+
+class ArchivedOrder(models.Model):
+    """
+    Arxivlangan (yopilgan, eski) order. id — asl Order.id (sequence qayta
+    ishlatilmaydi), shuning uchun tarix ro'yxatida (created_at, id) keyset
+    hot va arxiv jadvallari bo'ylab bir xil ishlaydi.
+    """
+    is_archived = True
+
+    id = models.BigIntegerField(primary_key=True)
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_orders",
+    )
+
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    total_price = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal("0.00"))
+    item_count = models.PositiveIntegerField(default=0)
+
+    phone = models.CharField(max_length=20)
+    address = models.TextField()
+    comment = models.TextField(blank=True)
+
+    paid = models.BooleanField(default=False)
+    paid_at = models.DateTimeField(null=True, blank=True)
+    cancelled_at = models.DateTimeField(null=True, blank=True)
+
+    # Payment qatori (o'chiriladi) snapshot'i: method/status/amount/provider_ref
+    payment = models.JSONField(null=True, blank=True)
+
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "-created_at", "-id"], name="archorder_user_created_idx"),
+            models.Index(fields=["-created_at", "-id"], name="archorder_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"Archived order #{self.id} - {self.user}"
+
+
+class ArchivedOrderItem(models.Model):
+    order = models.ForeignKey(
+        ArchivedOrder,
+        on_delete=models.CASCADE,
+        related_name="items",
+    )
+
+    # Arxiv variantni o'chirishga to'sqinlik qilmaydi
+    variant = models.ForeignKey(
+        ProductVariant,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="+",
+    )
+
+    sku = models.CharField(max_length=50, null=True, blank=True)
+    product_name = models.CharField(max_length=255, null=True, blank=True)
+    variant_name = models.CharField(max_length=100, null=True, blank=True)
+
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2)
+    quantity = models.PositiveIntegerField()
+
+    @property
+    def total_price(self):
+        return self.unit_price * self.quantity
+
+    def __str__(self):
+        return f"{self.product_name} - {self.variant_name} x {self.quantity}"
+
+
+class SalesDailyRollup(models.Model):
+    """
+    Kunlik savdo yig'indisi (analytics API faqat rollup jadvallaridan o'qiydi).
+
+    Kun = order yaratilgan kun: to'lov va bekor qilish ham o'sha kunning
+    qatoriga yoziladi, shuning uchun backfill natijasi inkremental bilan bir xil.
+    """
+    date = models.DateField(unique=True)
+
+    order_count = models.PositiveIntegerField(default=0)
+    paid_count = models.PositiveIntegerField(default=0)
+    cancelled_count = models.PositiveIntegerField(default=0)
+    item_quantity = models.IntegerField(default=0)
+
+    gross_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+    paid_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+    cancelled_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-date"]
+
+    @property
+    def net_order_count(self) -> int:
+        return self.order_count - self.cancelled_count
+
+    @property
+    def net_revenue(self) -> Decimal:
+        return self.gross_revenue - self.cancelled_revenue
+
+    @property
+    def average_basket(self) -> Decimal:
+        if self.net_order_count <= 0:
+            return Decimal("0.00")
+        return (self.net_revenue / self.net_order_count).quantize(Decimal("0.01"))
+
+    def __str__(self):
+        return f"Sales {self.date}: {self.order_count}"
+
+
+class SalesCategoryRollup(models.Model):
+    """Kun + kategoriya bo'yicha sotuv (bekor qilinganlar ayirib tashlangan)."""
+    date = models.DateField()
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="+",
+    )
+    category_name = models.CharField(max_length=100)
+
+    order_count = models.IntegerField(default=0)
+    quantity = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "category_name"],
+                name="unique_sales_rollup_date_category",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["date", "-revenue"]),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.category_name}: {self.revenue}"
+
+
+class SalesSkuRollup(models.Model):
+    """Kun + SKU bo'yicha sotuv (top SKU'lar shu jadvaldan)."""
+    date = models.DateField()
+    variant = models.ForeignKey(
+        ProductVariant,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="+",
+    )
+    sku = models.CharField(max_length=50)
+    product_name = models.CharField(max_length=255, blank=True)
+
+    quantity = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "sku"],
+                name="unique_sales_rollup_date_sku",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["date", "-quantity"]),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.sku}: {self.quantity}"
+
+
+class OrderEventSequence(models.Model):
+    """
+    Foydalanuvchi bo'yicha order hodisalari hisoblagichi. Qator UPDATE bilan
+    tranzaksiya oxirigacha lock bo'ladi: seq'lar bo'shliqsiz va commit
+    tartibida (resume `since` bo'yicha hech narsani o'tkazib yubormaydi).
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="+",
+    )
+    value = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.value}"
+
+
+class OrderStatusEvent(models.Model):
+    """
+    Realtime `order.status` hodisasi (WebSocket push + resume manbai).
+    order_id FK emas: order arxivlanganda ham hodisa qoladi.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    seq = models.PositiveBigIntegerField()
+    order_id = models.BigIntegerField()
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    paid = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "seq"], name="unique_order_event_user_seq"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}#{self.seq} order={self.order_id} {self.status}"
+
+
+class UserOrderStats(models.Model):
+    """
+    Foydalanuvchi bo'yicha order yig'indilari (profil, support operatori).
+    Checkout, to'lov va yopilish (cancel/deliver) bilan bir tranzaksiyada
+    yangilanadi; arxivlangan order'lar ham hisobda qoladi.
+    Farq bo'lsa — manage.py rebuild_user_order_stats.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="order_stats",
+    )
+    order_count = models.PositiveIntegerField(default=0)
+    open_order_count = models.IntegerField(default=0)
+    paid_order_count = models.PositiveIntegerField(default=0)
+    total_spent = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+    last_order_at = models.DateTimeField(null=True, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "user order stats"
+
+    def __str__(self):
+        return f"{self.user_id}: orders={self.order_count} spent={self.total_spent}"
@@ -0,0 +1,163 @@
+# orders/services/checkout_queue.py
+import logging
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from cart.models import CartItem
+from catalog.services.stock_service import InsufficientStock
+from orders.models import CheckoutJob
+from orders.services.checkout_service import CheckoutService
+
+
+logger = logging.getLogger(__name__)
+
+
+class CheckoutQueue:
+    """
+    Async checkout: so'rov faqat CheckoutJob yaratadi (tranzaksiya qisqa,
+    stock/cart lock'lari yo'q), checkout'ni esa worker bajaradi.
+
+    Shard = cart'dagi eng kichik variant_id % CHECKOUT_ASYNC_SHARDS: bir xil
+    variant(lar)ga talabgor job'lar bitta shard navbatiga tushadi va bitta
+    worker ularni FIFO (id bo'yicha) tartibda ketma-ket bajaradi — bir
+    variant qatori uchun parallel UPDATE raqobati bo'lmaydi.
+    """
+
+    ACTIVE_STATUSES = (CheckoutJob.STATUS_QUEUED, CheckoutJob.STATUS_PROCESSING)
+
+    @staticmethod
+    def shards() -> int:
+        return max(1, int(getattr(settings, "CHECKOUT_ASYNC_SHARDS", 1)))
+
+    @staticmethod
+    def shard_for(variant_ids) -> int:
+        return min(variant_ids) % CheckoutQueue.shards()
+
+    @staticmethod
+    def enqueue(user, phone: str, address: str, comment: str = "") -> CheckoutJob:
+        """
+        Job yaratadi. Foydalanuvchida tugallanmagan job bo'lsa — o'sha qaytariladi
+        (ikki marta bosilgan tugma ikkinchi checkout yaratmaydi).
+        """
+        active = (
+            CheckoutJob.objects
+            .filter(user=user, status__in=CheckoutQueue.ACTIVE_STATUSES)
+            .order_by("id")
+            .first()
+        )
+        if active is not None:
+            return active
+
+        variant_ids = list(CartItem.objects.filter(cart__user=user).values_list("variant_id", flat=True))
+        if not variant_ids:
+            raise ValueError("Cart is empty")
+
+        return CheckoutJob.objects.create(
+            user=user,
+            shard=CheckoutQueue.shard_for(variant_ids),
+            phone=phone,
+            address=address,
+            comment=comment,
+        )
+
+    @staticmethod
+    def claim_next(shard: int) -> CheckoutJob | None:
+        """Shard navbatidagi eng eski job'ni oladi (skip_locked: worker'lar bir-birini kutmaydi)."""
+        with transaction.atomic():
+            job = (
+                CheckoutJob.objects
+                .select_for_update(skip_locked=True)
+                .filter(shard=shard, status=CheckoutJob.STATUS_QUEUED)
+                .order_by("id")
+                .first()
+            )
+            if job is None:
+                return None
+
+            job.status = CheckoutJob.STATUS_PROCESSING
+            job.started_at = timezone.now()
+            job.save(update_fields=["status", "started_at"])
+        return job
+
+    @staticmethod
+    def requeue_stale(shard: int, older_than: timedelta) -> int:
+        """
+        Worker to'xtab qolganda 'processing'da qolgan job'larni navbatga qaytaradi.
+
+        Checkout va job natijasi bitta tranzaksiyada yoziladi, shuning uchun
+        'processing' job uchun order yaratilmagan — qayta bajarish xavfsiz.
+        """
+        return (
+            CheckoutJob.objects
+            .filter(
+                shard=shard,
+                status=CheckoutJob.STATUS_PROCESSING,
+                started_at__lt=timezone.now() - older_than,
+            )
+            .update(status=CheckoutJob.STATUS_QUEUED, started_at=None)
+        )
+
+    @staticmethod
+    def process(job: CheckoutJob) -> CheckoutJob:
+        error = None
+        try:
+            with transaction.atomic():
+                order = CheckoutService.checkout(
+                    user=job.user,
+                    phone=job.phone,
+                    address=job.address,
+                    comment=job.comment,
+                )
+                job.order = order
+                job.status = CheckoutJob.STATUS_SUCCEEDED
+                job.finished_at = timezone.now()
+                job.save(update_fields=["order", "status", "finished_at"])
+        except InsufficientStock as e:
+            error = {"detail": str(e), "shortages": e.shortages}
+        except ValueError as e:
+            error = {"detail": str(e)}
+        except Exception as e:
+            # Kutilmagan xato: job 'processing'da qolsa foydalanuvchining keyingi
+            # enqueue'si shu job'ni qaytaraverardi — failed bilan yopiladi
+            logger.exception("checkout job %s failed", job.ticket)
+            error = {"detail": "Checkout failed. Please try again.", "code": type(e).__name__}
+
+        if error is not None:
+            job.order = None
+            job.status = CheckoutJob.STATUS_FAILED
+            job.error = error
+            job.finished_at = timezone.now()
+            job.save(update_fields=["order", "status", "error", "finished_at"])
+
+        CheckoutQueue.push_result(job)
+        return job
+
+    @staticmethod
+    def payload(job: CheckoutJob) -> dict:
+        return {
+            "ticket": str(job.ticket),
+            "status": job.status,
+            "order_id": job.order_id,
+            "error": job.error,
+            "created_at": timezone.localtime(job.created_at).isoformat(),
+            "finished_at": timezone.localtime(job.finished_at).isoformat() if job.finished_at else None,
+        }
+
+    @staticmethod
+    def push_result(job: CheckoutJob) -> None:
+        """Natija user_<id> group'iga (ChatGatewayConsumer.checkout_result). Polling endpoint baribir bor."""
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            return
+        try:
+            async_to_sync(channel_layer.group_send)(
+                f"user_{job.user_id}",
+                {"type": "checkout.result", "job": CheckoutQueue.payload(job)},
+            )
+        except Exception:
+            logger.exception("checkout result push failed (job %s)", job.ticket)
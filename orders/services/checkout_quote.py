@@ -0,0 +1,126 @@
+# orders/services/checkout_quote.py
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core import signing
+from django.utils import timezone
+
+from cart.models import Cart
+from cart.services.cart_pricer import CartLine, CartPricer, CartPricing
+from catalog.models import ProductVariant
+from catalog.services.stock_service import StockService
+
+
+QUOTE_SALT = "orders.checkout_quote"
+
+
+class QuoteInvalid(ValueError):
+    """Quote imzosi noto'g'ri, muddati o'tgan yoki cart o'zgargan."""
+
+
+class CheckoutQuote:
+    """
+    Checkout oldidan narx (dry-run): CheckoutService bilan bir xil qoidalar
+    (CartPricer + StockService.shortages), faqat o'qish, lock yo'q, yozuv yo'q.
+
+    Natija — qisqa muddatli imzolangan quote (django.core.signing): cart
+    versiyasi, qatorlar va narxlar. Checkout yaroqli quote bilan kelsa,
+    cart versiyasi shartli UPDATE bilan tekshiriladi va qayta narxlash
+    (discount JOIN) o'rniga quote'dagi narxlar ishlatiladi.
+    """
+
+    @staticmethod
+    def ttl() -> int:
+        return settings.CHECKOUT_QUOTE_TTL_SECONDS
+
+    @staticmethod
+    def build(user) -> dict:
+        cart = Cart.objects.filter(user=user).first()
+        if cart is None:
+            raise ValueError("Cart is empty")
+
+        pricing = CartPricer.price(cart)
+        if pricing.is_empty:
+            raise ValueError("Cart is empty")
+
+        shortages = StockService.shortages({line.variant_id: line.quantity for line in pricing.lines})
+
+        token = None
+        if not shortages:
+            token = signing.dumps(
+                {
+                    "u": user.id,
+                    "v": cart.version,
+                    "t": str(pricing.total_price),
+                    "l": [
+                        [line.item_id, line.variant_id, line.quantity, str(line.unit_price)]
+                        for line in pricing.lines
+                    ],
+                },
+                salt=QUOTE_SALT,
+                compress=True,
+            )
+
+        return {
+            "quote": token,
+            "expires_at": pricing.priced_at + timedelta(seconds=CheckoutQuote.ttl()) if token else None,
+            "cart_version": cart.version,
+            "total_price": pricing.total_price,
+            "can_checkout": not shortages,
+            "lines": [
+                {
+                    "variant_id": line.variant_id,
+                    "sku": line.variant.sku,
+                    "product_name": line.product_name,
+                    "variant_name": line.variant.name,
+                    "quantity": line.quantity,
+                    "unit_price": line.unit_price,
+                    "total_price": line.total_price,
+                }
+                for line in pricing.lines
+            ],
+            "shortages": shortages,
+        }
+
+    @staticmethod
+    def load(token: str, *, user) -> dict:
+        try:
+            data = signing.loads(token, salt=QUOTE_SALT, max_age=CheckoutQuote.ttl())
+        except signing.SignatureExpired:
+            raise QuoteInvalid("Quote has expired.")
+        except signing.BadSignature:
+            raise QuoteInvalid("Quote is invalid.")
+
+        if data.get("u") != user.id:
+            raise QuoteInvalid("Quote is invalid.")
+        return data
+
+    @staticmethod
+    def pricing(cart: Cart, data: dict) -> CartPricing:
+        """
+        Quote'dan CartPricing (CheckoutService uchun). Cart versiyasi oldin
+        tekshirilgan bo'lishi kerak. Faqat variant + product (OrderItem
+        snapshot'i uchun) — discount va narx qayta hisoblanmaydi.
+        """
+        variants = ProductVariant.objects.select_related("product").in_bulk(
+            [variant_id for _, variant_id, _, _ in data["l"]]
+        )
+
+        lines = []
+        for item_id, variant_id, quantity, unit_price in data["l"]:
+            variant = variants.get(variant_id)
+            if variant is None:
+                raise QuoteInvalid("Quote is invalid.")
+            unit_price = Decimal(unit_price)
+            lines.append(
+                CartLine(
+                    item_id=item_id,
+                    variant=variant,
+                    quantity=quantity,
+                    unit_price=unit_price,
+                    total_price=unit_price * quantity,
+                )
+            )
+
+        return CartPricing(cart=cart, lines=lines, total_price=Decimal(data["t"]), priced_at=timezone.now())
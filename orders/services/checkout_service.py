@@ -1,11 +1,15 @@
 # orders/services/checkout_service.py
-from decimal import Decimal
 from django.db import transaction
 
-from cart.services.cart_service import CartService
-from cart.models import CartItem
-from catalog.models import ProductVariant
+from cart.services.cart_service import CartService, CartVersionConflict
+from cart.services.cart_pricer import CartPricer
+from catalog.services.stock_service import StockService
 from orders.models import Order, OrderItem
+from orders.services.checkout_quote import CheckoutQuote, QuoteInvalid
+from orders.services.sales_rollup_service import SalesRollupService
+from orders.services.user_order_stats import UserOrderStatsService
+from outbox.models import OutboxEvent
+from outbox.services.outbox import Outbox
 
 from payments.services.payment_service import PaymentService  # ✅ qo‘sh
 
@@ -13,75 +17,68 @@ from payments.services.payment_service import PaymentService  # ✅ qo‘sh
 class CheckoutService:
     @staticmethod
     @transaction.atomic
-    def checkout(user, phone: str, address: str, comment: str = "") -> Order:
+    def checkout(user, phone: str, address: str, comment: str = "", quote: str | None = None) -> Order:
         cart = CartService.get_or_create_cart(user)
 
-        # CartItemlarni lock
-        items = (
-            CartItem.objects
-            .select_for_update()
-            # variant.discount OneToOne bo'lgani uchun select_related bilan N+1 ni yo'q qilamiz
-            .select_related("variant", "variant__product", "variant__discount")
-            .filter(cart=cart)
-        )
-
-        if not items.exists():
+        if quote:
+            # Quote: cart quote'dan beri o'zgarmagan bo'lsa (shartli UPDATE)
+            # narxlar quote'dan olinadi — qayta narxlash yo'q
+            data = CheckoutQuote.load(quote, user=user)
+            try:
+                CartService.bump_version(cart, expected_version=data["v"])
+            except CartVersionConflict:
+                raise QuoteInvalid("Cart has changed since the quote was issued.")
+            pricing = CheckoutQuote.pricing(cart, data)
+        else:
+            # Cart tozalanadi -> versiya oshadi. Cart qatori tranzaksiya oxirigacha
+            # lock bo'ladi, shuning uchun CartItem'larni alohida lock qilish shart emas.
+            CartService.bump_version(cart)
+
+            # Narxlarni bitta o'tishda hisoblash
+            pricing = CartPricer.price(cart)
+
+        if pricing.is_empty:
             raise ValueError("Cart is empty")
 
-        # Order yaratamiz
+        # Order yaratamiz (stock ledger qatorlari order_id'ga bog'lanadi)
         order = Order.objects.create(
             user=user,
-            total_price=Decimal("0.00"),
+            total_price=pricing.total_price,
             phone=phone,
             address=address,
             comment=comment,
         )
 
-        total_price = Decimal("0.00")
-        order_items = []
-
-        # Variantlarni ham lock qilish uchun list
-        variant_ids = [i.variant_id for i in items]
-        variants = (
-            ProductVariant.objects
-            .select_for_update()
-            .select_related("product")
-            .filter(id__in=variant_ids, is_active=True)
+        # Stock: bitta shartli UPDATE (variant qatorlari oldindan lock qilinmaydi).
+        # Yetmasa InsufficientStock (har bir qator bo'yicha hisobot) va butun
+        # checkout rollback (order ham).
+        StockService.reserve(
+            {line.variant_id: line.quantity for line in pricing.lines},
+            order_id=order.id,
         )
-        vmap = {v.id: v for v in variants}
-
-        for item in items:
-            variant = vmap.get(item.variant_id)
-            if not variant:
-                raise ValueError("Variant not found or inactive.")
-
-            if variant.stock_quantity < item.quantity:
-                raise ValueError(f"{variant.product.name} uchun yetarli stock yo‘q")
 
-            unit_price = item.get_unit_price()
-            total_price += unit_price * item.quantity
-
-            order_items.append(
+        OrderItem.objects.bulk_create(
+            [
                 OrderItem(
                     order=order,
-                    variant=variant,
-                    sku=variant.sku,
-                    product_name=variant.product.name,
-                    variant_name=variant.name,
-                    unit_price=unit_price,
-                    quantity=item.quantity,
+                    variant=line.variant,
+                    sku=line.variant.sku,
+                    product_name=line.variant.product.name,
+                    variant_name=line.variant.name,
+                    unit_price=line.unit_price,
+                    quantity=line.quantity,
                 )
-            )
-
-            # stock kamaytirish (DBga keyin bulk_update)
-            variant.stock_quantity -= item.quantity
-
-        # DBga yozish
-        OrderItem.objects.bulk_create(order_items)
-        ProductVariant.objects.bulk_update(list(vmap.values()), ["stock_quantity"])
+                for line in pricing.lines
+            ]
+        )
 
-        order.total_price = total_price
-        order.save(update_fields=["total_price", "updated_at"])
+        SalesRollupService.record_created(order.id)
+        UserOrderStatsService.record_created(order)
+        Outbox.order_event(
+            OutboxEvent.TOPIC_ORDER_CREATED,
+            order,
+            items=[{"variant_id": line.variant_id, "quantity": line.quantity} for line in pricing.lines],
+        )
 
         # cart tozalash
         cart.items.all().delete()
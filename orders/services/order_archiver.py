@@ -0,0 +1,134 @@
+# orders/services/order_archiver.py
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from orders.models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+
+
+@dataclass
+class ArchiveResult:
+    orders_archived: int = 0
+    items_archived: int = 0
+    batches: int = 0
+
+
+class OrderArchiver:
+    """
+    Yopilgan (delivered/cancelled) eski order'larni archive jadvallariga
+    ko'chiradi: har bir batch — bitta qisqa tranzaksiya (INSERT arxivga,
+    DELETE hot jadvaldan). Hot jadval va uning indekslari kichik qoladi.
+
+    Sales rollup'lar arxivlashdan ta'sirlanmaydi; backfill_sales_rollups
+    hot va arxiv jadvallarini birga o'qiydi.
+    """
+
+    ARCHIVABLE_STATUSES = (Order.STATUS_DELIVERED, Order.STATUS_CANCELLED)
+
+    @staticmethod
+    def _payment_snapshot(order) -> dict | None:
+        try:
+            payment = order.payment
+        except ObjectDoesNotExist:
+            return None
+
+        return {
+            "id": payment.id,
+            "method": payment.method,
+            "status": payment.status,
+            "amount": str(payment.amount),
+            "provider_ref": payment.provider_ref,
+            "paid_at": payment.paid_at.isoformat() if payment.paid_at else None,
+            "created_at": payment.created_at.isoformat(),
+        }
+
+    @staticmethod
+    @transaction.atomic
+    def archive_batch(*, cutoff, batch_size: int) -> tuple[int, int]:
+        """Bitta batch. Qaytaradi: (orders, items)."""
+        ids = list(
+            Order.objects
+            .select_for_update(skip_locked=True)
+            .filter(status__in=OrderArchiver.ARCHIVABLE_STATUSES, created_at__lt=cutoff)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return 0, 0
+
+        orders = list(
+            Order.objects
+            .filter(id__in=ids)
+            .select_related("payment")
+            .annotate(item_count=Count("items"))
+        )
+        items = list(OrderItem.objects.filter(order_id__in=ids).order_by("id"))
+
+        ArchivedOrder.objects.bulk_create(
+            [
+                ArchivedOrder(
+                    id=o.id,
+                    user_id=o.user_id,
+                    status=o.status,
+                    total_price=o.total_price,
+                    item_count=o.item_count,
+                    phone=o.phone,
+                    address=o.address,
+                    comment=o.comment,
+                    paid=o.paid,
+                    paid_at=o.paid_at,
+                    cancelled_at=o.cancelled_at,
+                    payment=OrderArchiver._payment_snapshot(o),
+                    created_at=o.created_at,
+                    updated_at=o.updated_at,
+                )
+                for o in orders
+            ]
+        )
+        ArchivedOrderItem.objects.bulk_create(
+            [
+                ArchivedOrderItem(
+                    order_id=i.order_id,
+                    variant_id=i.variant_id,
+                    sku=i.sku,
+                    product_name=i.product_name,
+                    variant_name=i.variant_name,
+                    unit_price=i.unit_price,
+                    quantity=i.quantity,
+                )
+                for i in items
+            ]
+        )
+
+        # Payment (CASCADE) va OrderItem'lar ham o'chadi
+        Order.objects.filter(id__in=ids).delete()
+        return len(orders), len(items)
+
+    @staticmethod
+    def archive(
+        *,
+        older_than_days: int | None = None,
+        batch_size: int | None = None,
+        max_batches: int | None = None,
+        now=None,
+    ) -> ArchiveResult:
+        now = now or timezone.now()
+        older_than_days = settings.ORDER_ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+        batch_size = batch_size or settings.ORDER_ARCHIVE_BATCH_SIZE
+        cutoff = now - timedelta(days=older_than_days)
+
+        result = ArchiveResult()
+        while max_batches is None or result.batches < max_batches:
+            orders, items = OrderArchiver.archive_batch(cutoff=cutoff, batch_size=batch_size)
+            if not orders:
+                break
+            result.orders_archived += orders
+            result.items_archived += items
+            result.batches += 1
+
+        return result
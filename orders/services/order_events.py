@@ -0,0 +1,124 @@
+# orders/services/order_events.py
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from orders.models import OrderEventSequence, OrderStatusEvent
+
+
+logger = logging.getLogger(__name__)
+
+
+class OrderEvents:
+    """
+    Realtime order holati: har bir o'zgarish OrderStatusEvent (foydalanuvchi
+    bo'yicha seq) bo'lib yoziladi va commit'dan keyin user_<id> group'iga
+    `order.status` sifatida yuboriladi (ChatGatewayConsumer.order_status).
+
+    Uzilib qolgan klient oxirgi ko'rgan seq'dan keyingilarini so'raydi
+    (WS `order_resume` yoki GET /api/orders/events/?since=); live push va
+    replay ustma-ust tushsa, klient seq <= oxirgi ko'rilgan bo'lganini tashlaydi.
+    """
+
+    REPLAY_LIMIT = 200
+
+    @staticmethod
+    def _allocate(user_id: int, count: int) -> int:
+        """user_id uchun `count` ta seq ajratadi. Qaytaradi: oxirgi seq."""
+        sequences = OrderEventSequence.objects.filter(pk=user_id)
+        if not sequences.update(value=F("value") + count):
+            OrderEventSequence.objects.get_or_create(user_id=user_id)
+            sequences.update(value=F("value") + count)
+        return sequences.values_list("value", flat=True).get()
+
+    @staticmethod
+    def record(order) -> None:
+        OrderEvents.record_many([(order.user_id, order.id, order.status, order.paid)])
+
+    @staticmethod
+    def record_many(rows) -> None:
+        """rows: (user_id, order_id, status, paid). Chaqiruvchi tranzaksiyasi ichida."""
+        by_user = defaultdict(list)
+        for user_id, order_id, status, paid in rows:
+            by_user[user_id].append((order_id, status, paid))
+
+        events = []
+        # user_id tartibida: parallel bulk o'zgarishlar sequence qatorlarida deadlock'ga tushmaydi
+        for user_id in sorted(by_user):
+            items = by_user[user_id]
+            last = OrderEvents._allocate(user_id, len(items))
+            events.extend(
+                OrderStatusEvent(user_id=user_id, seq=seq, order_id=order_id, status=status, paid=paid)
+                for seq, (order_id, status, paid) in zip(range(last - len(items) + 1, last + 1), items)
+            )
+
+        OrderStatusEvent.objects.bulk_create(events)
+        transaction.on_commit(lambda: OrderEvents.push(events), robust=True)
+
+    @staticmethod
+    def payload(event: OrderStatusEvent) -> dict:
+        return {
+            "seq": event.seq,
+            "order_id": event.order_id,
+            "status": event.status,
+            "paid": event.paid,
+            "at": timezone.localtime(event.created_at).isoformat(),
+        }
+
+    @staticmethod
+    def push(events) -> None:
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            return
+        for event in events:
+            try:
+                async_to_sync(channel_layer.group_send)(
+                    f"user_{event.user_id}",
+                    {"type": "order.status", "event": OrderEvents.payload(event)},
+                )
+            except Exception:
+                # Klient resume orqali baribir oladi
+                logger.exception("order status push failed (user %s, seq %s)", event.user_id, event.seq)
+
+    @staticmethod
+    def since(user_id: int, seq: int, limit: int | None = None) -> tuple[list[dict], bool]:
+        """seq'dan keyingi hodisalar (o'sish tartibida). Qaytaradi: (events, has_more)."""
+        limit = limit or OrderEvents.REPLAY_LIMIT
+        rows = list(
+            OrderStatusEvent.objects
+            .filter(user_id=user_id, seq__gt=seq)
+            .order_by("seq")[: limit + 1]
+        )
+        return [OrderEvents.payload(e) for e in rows[:limit]], len(rows) > limit
+
+    @staticmethod
+    def last_seq(user_id: int) -> int:
+        return OrderEventSequence.objects.filter(pk=user_id).values_list("value", flat=True).first() or 0
+
+    @staticmethod
+    def purge(*, older_than_days: int | None = None, batch_size: int = 1000) -> int:
+        """Eski hodisalarni batch'larda o'chiradi (sequence qatorlari qoladi — seq qayta boshlanmaydi)."""
+        days = settings.ORDER_STATUS_EVENT_RETENTION_DAYS if older_than_days is None else older_than_days
+        cutoff = timezone.now() - timedelta(days=days)
+        total = 0
+
+        while True:
+            ids = list(
+                OrderStatusEvent.objects
+                .filter(created_at__lt=cutoff)
+                .order_by("id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            deleted, _ = OrderStatusEvent.objects.filter(id__in=ids).delete()
+            total += deleted
+
+        return total
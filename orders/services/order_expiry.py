@@ -0,0 +1,130 @@
+# orders/services/order_expiry.py
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from orders.models import Order
+from orders.services.order_events import OrderEvents
+from orders.services.order_status_service import OrderStatusService
+from orders.services.user_order_stats import UserOrderStatsService
+from outbox.models import OutboxEvent
+from outbox.services.outbox import Outbox
+from payments.models import Payment, PaymeTransaction
+
+
+@dataclass
+class ExpireResult:
+    orders_expired: int = 0
+    payments_cancelled: int = 0
+    batches: int = 0
+
+
+class OrderExpiry:
+    """
+    Onlayn to'lovi tugamagan pending order'larni muddati o'tgach bekor qiladi:
+    stock qaytariladi, bog'langan Payment 'cancelled' bo'ladi.
+
+    COD order'lar tegilmaydi (ular admin tasdig'ini kutadi). Tanlov
+    order_unpaid_pending_idx partial indeksi bo'yicha; har bir batch — bitta
+    qisqa tranzaksiya, lock'langan order'lar (to'lov callback'i, admin)
+    skip_locked bilan o'tkazib yuboriladi va keyingi ishga tushirishda olinadi.
+    """
+
+    ONLINE_METHODS = (
+        Payment.METHOD_MOCK,
+        Payment.METHOD_STRIPE,
+        Payment.METHOD_PAYME,
+        Payment.METHOD_CLICK,
+    )
+
+    @staticmethod
+    @transaction.atomic
+    def expire_batch(*, cutoff, batch_size: int) -> tuple[int, int]:
+        """Bitta batch. Qaytaradi: (orders, payments)."""
+        orders = {
+            o.id: o
+            for o in Order.objects
+            .select_for_update(skip_locked=True, of=("self",))
+            .filter(
+                status=Order.STATUS_PENDING,
+                paid=False,
+                created_at__lt=cutoff,
+                payment__method__in=OrderExpiry.ONLINE_METHODS,
+            )
+            .order_by("created_at", "id")
+            .only("id", "user_id", "total_price")[:batch_size]
+        }
+        if not orders:
+            return 0, 0
+
+        ids = sorted(orders)
+        now = timezone.now()
+        Order.objects.filter(id__in=ids, status=Order.STATUS_PENDING, paid=False).update(
+            status=Order.STATUS_CANCELLED, cancelled_at=now, updated_at=now
+        )
+        # Payme: ochiq tranzaksiya timeout (reason=4) bilan yopiladi — CheckTransaction mos bo'lsin
+        PaymeTransaction.objects.filter(order_id__in=ids, state=PaymeTransaction.STATE_CREATED).update(
+            state=PaymeTransaction.STATE_CANCELLED,
+            reason=PaymeTransaction.REASON_TIMEOUT,
+            cancelled_at=now,
+        )
+        payments = (
+            Payment.objects
+            .filter(order_id__in=ids)
+            .exclude(status__in=[Payment.STATUS_PAID, Payment.STATUS_CANCELLED])
+            .update(status=Payment.STATUS_CANCELLED, updated_at=now)
+        )
+
+        # Stock: variant bo'yicha bitta UPDATE butun batch uchun
+        OrderStatusService.release_cancelled(ids)
+
+        Outbox.emit_many(
+            OutboxEvent.TOPIC_ORDER_CANCELLED,
+            aggregate_type="order",
+            payloads={
+                order_id: {
+                    "order_id": order_id,
+                    "user_id": orders[order_id].user_id,
+                    "status": Order.STATUS_CANCELLED,
+                    "previous_status": Order.STATUS_PENDING,
+                    "paid": False,
+                    "total_price": str(orders[order_id].total_price),
+                    "reason": "payment_expired",
+                }
+                for order_id in ids
+            },
+        )
+        OrderEvents.record_many(
+            (orders[order_id].user_id, order_id, Order.STATUS_CANCELLED, False) for order_id in ids
+        )
+        UserOrderStatsService.record_transitions(
+            (orders[order_id].user_id, Order.STATUS_PENDING, Order.STATUS_CANCELLED) for order_id in ids
+        )
+        return len(ids), payments
+
+    @staticmethod
+    def expire(
+        *,
+        ttl_minutes: int | None = None,
+        batch_size: int | None = None,
+        max_batches: int | None = None,
+        now=None,
+    ) -> ExpireResult:
+        now = now or timezone.now()
+        ttl_minutes = settings.ORDER_PAYMENT_TTL_MINUTES if ttl_minutes is None else ttl_minutes
+        batch_size = batch_size or settings.ORDER_EXPIRY_BATCH_SIZE
+        cutoff = now - timedelta(minutes=ttl_minutes)
+
+        result = ExpireResult()
+        while max_batches is None or result.batches < max_batches:
+            orders, payments = OrderExpiry.expire_batch(cutoff=cutoff, batch_size=batch_size)
+            if not orders:
+                break
+            result.orders_expired += orders
+            result.payments_cancelled += payments
+            result.batches += 1
+
+        return result
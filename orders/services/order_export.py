@@ -0,0 +1,248 @@
+# orders/services/order_export.py
+import csv
+import json
+import zipfile
+from datetime import datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from orders.models import OrderItem
+
+
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+FORMAT_XLSX = "xlsx"
+
+FORMATS = {
+    FORMAT_CSV: "text/csv; charset=utf-8",
+    FORMAT_JSONL: "application/x-ndjson",
+    FORMAT_XLSX: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+# (sarlavha, OrderItem'dan lookup) — bitta SELECT, Payment LEFT JOIN
+COLUMNS = [
+    ("order_id", "order_id"),
+    ("order_created_at", "order__created_at"),
+    ("user_id", "order__user_id"),
+    ("status", "order__status"),
+    ("paid", "order__paid"),
+    ("paid_at", "order__paid_at"),
+    ("order_total", "order__total_price"),
+    ("payment_method", "order__payment__method"),
+    ("payment_status", "order__payment__status"),
+    ("payment_amount", "order__payment__amount"),
+    ("provider_ref", "order__payment__provider_ref"),
+    ("item_id", "id"),
+    ("sku", "sku"),
+    ("product_name", "product_name"),
+    ("variant_name", "variant_name"),
+    ("unit_price", "unit_price"),
+    ("quantity", "quantity"),
+]
+HEADER = [name for name, _ in COLUMNS]
+
+# Excel varag'i: 1 048 576 qator (sarlavha bilan)
+XLSX_MAX_ROWS = 1_048_576
+
+
+class _Echo:
+    """csv.writer uchun: yozilgan qatorni shunchaki qaytaradi (buffer yo'q)."""
+
+    def write(self, value):
+        return value
+
+
+class _ZipStream:
+    """ZipFile uchun write-only stream: yozilgan baytlar drain() bilan olinadi."""
+
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+        self.buffered = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        self.buffered += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self.buffered = 0
+        return data
+
+
+def _cell(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        value = timezone.localtime(value).isoformat()
+    return str(value)
+
+
+class OrderExport:
+    """
+    Order + OrderItem + Payment eksporti (har bir order qatori uchun bitta qator).
+
+    Bitta SELECT (filtrlar SQL'da), server-side cursor (iterator(chunk_size)):
+    xotira eksport hajmidan qat'i nazar chunk_size qator bilan cheklangan.
+    Writer'lar generator — StreamingHttpResponse yoki faylga yoziladi.
+
+    Arxivlangan order'lar (ORDER_ARCHIVE_AFTER_DAYS) eksportga kirmaydi.
+    """
+
+    @staticmethod
+    def queryset(*, created_after=None, created_before=None, statuses=None, paid=None):
+        qs = OrderItem.objects.all()
+        if created_after is not None:
+            qs = qs.filter(order__created_at__gte=created_after)
+        if created_before is not None:
+            qs = qs.filter(order__created_at__lt=created_before)
+        if statuses:
+            qs = qs.filter(order__status__in=statuses)
+        if paid is not None:
+            qs = qs.filter(order__paid=paid)
+        return qs.order_by("order_id", "id").values_list(*[lookup for _, lookup in COLUMNS])
+
+    @staticmethod
+    def rows(chunk_size: int = 2000, **filters):
+        return OrderExport.queryset(**filters).iterator(chunk_size=chunk_size)
+
+    @staticmethod
+    def stream(fmt: str, rows):
+        if fmt == FORMAT_CSV:
+            return OrderExport.csv(rows)
+        if fmt == FORMAT_JSONL:
+            return OrderExport.jsonl(rows)
+        if fmt == FORMAT_XLSX:
+            return OrderExport.xlsx(rows)
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    @staticmethod
+    def csv(rows):
+        writer = csv.writer(_Echo())
+        yield "\ufeff"  # Excel UTF-8'ni tanishi uchun BOM
+        yield writer.writerow(HEADER)
+        for row in rows:
+            yield writer.writerow([_cell(v) for v in row])
+
+    @staticmethod
+    def jsonl(rows):
+        for row in rows:
+            record = {
+                name: _cell(value) if isinstance(value, datetime) else value
+                for name, value in zip(HEADER, row)
+            }
+            yield json.dumps(record, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+
+    @staticmethod
+    def _xlsx_row(number: int, values) -> str:
+        cells = []
+        for value in values:
+            if isinstance(value, bool) or value is None:
+                cells.append(f'<c t="inlineStr"><is><t>{escape(_cell(value))}</t></is></c>')
+            elif isinstance(value, (int, Decimal)):
+                cells.append(f"<c><v>{value}</v></c>")
+            else:
+                cells.append(f'<c t="inlineStr"><is><t xml:space="preserve">{escape(_cell(value))}</t></is></c>')
+        return f'<row r="{number}">{"".join(cells)}</row>'
+
+    @staticmethod
+    def xlsx(rows):
+        """
+        Minimal SpreadsheetML (inline string'lar, sharedStrings yo'q) streaming
+        zip ichida. Varaq to'lsa (XLSX_MAX_ROWS) — keyingi varaq; workbook.xml
+        oxirida, varaqlar soni ma'lum bo'lganda yoziladi.
+        """
+        out = _ZipStream()
+        zf = zipfile.ZipFile(out, mode="w", compression=zipfile.ZIP_DEFLATED)
+        sheet_head = (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+        )
+        sheet_tail = "</sheetData></worksheet>"
+
+        sheets = 0
+        sheet = None
+        number = 0
+        for row in rows:
+            if sheet is None or number > XLSX_MAX_ROWS:
+                if sheet is not None:
+                    sheet.write(sheet_tail.encode("utf-8"))
+                    sheet.close()
+                sheets += 1
+                sheet = zf.open(f"xl/worksheets/sheet{sheets}.xml", mode="w", force_zip64=True)
+                sheet.write((sheet_head + OrderExport._xlsx_row(1, HEADER)).encode("utf-8"))
+                number = 2
+            sheet.write(OrderExport._xlsx_row(number, row).encode("utf-8"))
+            number += 1
+            if out.buffered >= 64 * 1024:
+                yield out.drain()
+
+        if sheet is None:
+            sheets = 1
+            sheet = zf.open("xl/worksheets/sheet1.xml", mode="w")
+            sheet.write((sheet_head + OrderExport._xlsx_row(1, HEADER)).encode("utf-8"))
+        sheet.write(sheet_tail.encode("utf-8"))
+        sheet.close()
+
+        ids = range(1, sheets + 1)
+        zf.writestr(
+            "[Content_Types].xml",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            + "".join(
+                f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+                'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                for i in ids
+            )
+            + "</Types>",
+        )
+        zf.writestr(
+            "_rels/.rels",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="xl/workbook.xml"/></Relationships>',
+        )
+        zf.writestr(
+            "xl/workbook.xml",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"><sheets>'
+            + "".join(f'<sheet name="Orders {i}" sheetId="{i}" r:id="rId{i}"/>' for i in ids)
+            + "</sheets></workbook>",
+        )
+        zf.writestr(
+            "xl/_rels/workbook.xml.rels",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            + "".join(
+                f'<Relationship Id="rId{i}" '
+                'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+                f'Target="worksheets/sheet{i}.xml"/>'
+                for i in ids
+            )
+            + "</Relationships>",
+        )
+        zf.close()
+        yield out.drain()
+
+    @staticmethod
+    def filename(fmt: str) -> str:
+        return f"orders-{timezone.localtime().strftime('%Y%m%d-%H%M%S')}.{fmt}"
@@ -1,8 +1,17 @@
+from collections import defaultdict
+
 from django.core.exceptions import ValidationError
 from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
 
-from catalog.models import ProductVariant
-from orders.models import Order
+from catalog.services.stock_service import StockService
+from orders.models import Order, OrderItem
+from orders.services.order_events import OrderEvents
+from orders.services.sales_rollup_service import SalesRollupService
+from orders.services.user_order_stats import UserOrderStatsService
+from outbox.models import OutboxEvent
+from outbox.services.outbox import Outbox
 
 
 class OrderStatusService:
@@ -14,15 +23,146 @@ class OrderStatusService:
         Order.STATUS_CANCELLED: set(),
     }
 
+    @staticmethod
+    def _item_quantities(order_ids) -> dict[int, int]:
+        """Order'lar bo'yicha variant -> jami quantity (bitta GROUP BY)."""
+        return dict(
+            OrderItem.objects
+            .filter(order_id__in=order_ids)
+            .values("variant_id")
+            .annotate(qty=Sum("quantity"))
+            .order_by()
+            .values_list("variant_id", "qty")
+        )
+
+    @staticmethod
+    def release_cancelled(order_ids) -> None:
+        """
+        Bekor qilingan order'lar stock'ini qaytaradi: UPDATE variant bo'yicha
+        bitta, ledger qatorlari order bo'yicha. Chaqiruvchi tranzaksiyasi ichida.
+        """
+        per_order = defaultdict(dict)
+        totals = defaultdict(int)
+        for order_id, variant_id, qty in (
+            OrderItem.objects
+            .filter(order_id__in=order_ids)
+            .values_list("order_id", "variant_id", "quantity")
+        ):
+            per_order[order_id][variant_id] = per_order[order_id].get(variant_id, 0) + qty
+            totals[variant_id] += qty
+
+        StockService.release(totals, per_order=per_order)
+        for order_id in order_ids:
+            SalesRollupService.record_cancelled(order_id)
+
+    @staticmethod
+    def _status_topic(new_status: str) -> str:
+        if new_status == Order.STATUS_CANCELLED:
+            return OutboxEvent.TOPIC_ORDER_CANCELLED
+        return OutboxEvent.TOPIC_ORDER_STATUS_CHANGED
+
+    @staticmethod
+    def _transition_error(order: Order, new_status: str) -> str | None:
+        if new_status == Order.STATUS_CANCELLED and order.paid:
+            return "Paid order cannot be cancelled (refund not implemented)."
+        if not order.can_transition_to(new_status):
+            return f"Cannot change status from {order.status} to {new_status}"
+        return None
+
     @staticmethod
     @transaction.atomic
-    def update_status(*, order_id: int, new_status: str) -> Order:
-        order = (
-            Order.objects
+    def bulk_update_status(*, order_ids: list[int], new_status: str) -> list[dict]:
+        """
+        Ko'p order'ni bitta tranzaksiyada o'tkazadi.
+
+        O'tishlar Order.STATUS_TRANSITIONS bo'yicha birdaniga tekshiriladi,
+        yaroqlilari bitta UPDATE bilan o'zgartiriladi; cancel'da stock
+        variant bo'yicha yig'ilib bitta UPDATE bilan qaytariladi (ledger'ga
+        har bir order bo'yicha alohida qator).
+        Yaroqsizlari o'tkazib yuboriladi va natijada sababi bilan qaytadi;
+        allaqachon new_status'dagilar ok, lekin changed=False.
+        """
+        if new_status not in dict(Order.STATUS_CHOICES):
+            raise ValidationError("Invalid status")
+
+        order_ids = list(dict.fromkeys(order_ids))
+
+        # id tartibida lock — parallel bulk so'rovlar deadlock'ga tushmaydi
+        orders = {
+            o.id: o
+            for o in Order.objects
             .select_for_update()
-            .prefetch_related("items")
-            .get(pk=order_id)
+            .filter(id__in=order_ids)
+            .order_by("id")
+            .only("id", "user_id", "status", "paid", "total_price")
+        }
+
+        results = []
+        eligible = []
+        for order_id in order_ids:
+            order = orders.get(order_id)
+            if order is None:
+                results.append(
+                    {"order_id": order_id, "ok": False, "changed": False, "status": None, "detail": "Not found."}
+                )
+                continue
+
+            if order.status == new_status:
+                results.append(
+                    {"order_id": order_id, "ok": True, "changed": False, "status": order.status, "detail": "Unchanged."}
+                )
+                continue
+
+            error = OrderStatusService._transition_error(order, new_status)
+            if error:
+                results.append(
+                    {"order_id": order_id, "ok": False, "changed": False, "status": order.status, "detail": error}
+                )
+                continue
+
+            eligible.append(order_id)
+            results.append({"order_id": order_id, "ok": True, "changed": True, "status": new_status, "detail": ""})
+
+        if not eligible:
+            return results
+
+        now = timezone.now()
+        changes = {"status": new_status, "updated_at": now}
+        if new_status == Order.STATUS_CANCELLED:
+            changes["cancelled_at"] = now
+        Order.objects.filter(id__in=eligible).update(**changes)
+
+        Outbox.emit_many(
+            OrderStatusService._status_topic(new_status),
+            aggregate_type="order",
+            payloads={
+                order_id: {
+                    "order_id": order_id,
+                    "user_id": orders[order_id].user_id,
+                    "status": new_status,
+                    "previous_status": orders[order_id].status,
+                    "paid": orders[order_id].paid,
+                    "total_price": str(orders[order_id].total_price),
+                }
+                for order_id in eligible
+            },
+        )
+        OrderEvents.record_many(
+            (orders[order_id].user_id, order_id, new_status, orders[order_id].paid) for order_id in eligible
         )
+        UserOrderStatsService.record_transitions(
+            (orders[order_id].user_id, orders[order_id].status, new_status) for order_id in eligible
+        )
+
+        if new_status == Order.STATUS_CANCELLED:
+            OrderStatusService.release_cancelled(eligible)
+
+        return results
+
+    @staticmethod
+    @transaction.atomic
+    def update_status(*, order_id: int, new_status: str) -> Order:
+        order = Order.objects.select_for_update().get(pk=order_id)
 
         # Valid status check
         if new_status not in dict(Order.STATUS_CHOICES):
@@ -39,23 +179,22 @@ class OrderStatusService:
         if new_status not in allowed:
             raise ValidationError(f"Cannot change status from {order.status} to {new_status}")
 
-        # ✅ Cancel bo‘lsa stock qaytarish
+        # ✅ Cancel bo‘lsa stock qaytarish (bitta set-based UPDATE)
         if new_status == Order.STATUS_CANCELLED:
-            variant_ids = [i.variant_id for i in order.items.all()]
-            variants = ProductVariant.objects.select_for_update().filter(id__in=variant_ids)
-            vmap = {v.id: v for v in variants}
-
-            for item in order.items.all():
-                v = vmap.get(item.variant_id)
-                if v:
-                    v.stock_quantity += item.quantity
-
-            ProductVariant.objects.bulk_update(variants, ["stock_quantity"])
+            StockService.release(OrderStatusService._item_quantities([order.id]), order_id=order.id)
 
         # IMPORTANT:
         # Order modeldagi set_status() barcha biznes qoidalarni (cancelled_at kabi)
         # bitta joyda saqlaydi. Service to'g'ridan-to'g'ri order.status ni qo'ymasligi kerak.
+        previous_status = order.status
         order.set_status(new_status, save=True)
+        if new_status == Order.STATUS_CANCELLED:
+            SalesRollupService.record_cancelled(order.id)
+        Outbox.order_event(
+            OrderStatusService._status_topic(new_status), order, previous_status=previous_status
+        )
+        OrderEvents.record(order)
+        UserOrderStatsService.record_transition(order.user_id, previous_status, new_status)
         return order
 
     @staticmethod
@@ -69,12 +208,7 @@ class OrderStatusService:
         - When cancelled, stock is returned.
         """
 
-        order = (
-            Order.objects
-            .select_for_update()
-            .prefetch_related("items")
-            .get(pk=order_id)
-        )
+        order = Order.objects.select_for_update().get(pk=order_id)
 
         if not (getattr(user, "is_staff", False) or order.user_id == user.id):
             raise ValidationError("You do not have permission to cancel this order.")
@@ -89,16 +223,13 @@ class OrderStatusService:
             raise ValidationError("Only pending orders can be cancelled.")
 
         # Return stock
-        variant_ids = [i.variant_id for i in order.items.all()]
-        variants = ProductVariant.objects.select_for_update().filter(id__in=variant_ids)
-        vmap = {v.id: v for v in variants}
-
-        for item in order.items.all():
-            v = vmap.get(item.variant_id)
-            if v:
-                v.stock_quantity += item.quantity
-
-        ProductVariant.objects.bulk_update(variants, ["stock_quantity"])
+        StockService.release(OrderStatusService._item_quantities([order.id]), order_id=order.id)
 
         order.set_status(Order.STATUS_CANCELLED, save=True)
+        SalesRollupService.record_cancelled(order.id)
+        Outbox.order_event(
+            OutboxEvent.TOPIC_ORDER_CANCELLED, order, previous_status=Order.STATUS_PENDING
+        )
+        OrderEvents.record(order)
+        UserOrderStatsService.record_transition(order.user_id, Order.STATUS_PENDING, Order.STATUS_CANCELLED)
         return order
@@ -0,0 +1,247 @@
+# orders/services/sales_rollup_service.py
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from orders.models import (
+    ArchivedOrder,
+    ArchivedOrderItem,
+    Order,
+    OrderItem,
+    SalesCategoryRollup,
+    SalesDailyRollup,
+    SalesSkuRollup,
+)
+
+
+EVENT_CREATED = "created"
+EVENT_PAID = "paid"
+EVENT_CANCELLED = "cancelled"
+
+CATEGORY_ID = "variant__product__subcategory__category_id"
+CATEGORY_NAME = "variant__product__subcategory__category__name"
+
+DAILY_FIELDS = (
+    "order_count",
+    "paid_count",
+    "cancelled_count",
+    "item_quantity",
+    "gross_revenue",
+    "paid_revenue",
+    "cancelled_revenue",
+)
+
+
+def _line_revenue():
+    return ExpressionWrapper(
+        F("unit_price") * F("quantity"),
+        output_field=DecimalField(max_digits=14, decimal_places=2),
+    )
+
+
+def _sku_key(sku, variant_id) -> str:
+    return sku or f"variant-{variant_id}"
+
+
+class SalesRollupService:
+    """
+    Sales rollup jadvallarini inkremental yangilaydi.
+
+    Yozuv order tranzaksiyasi commit bo'lgandan keyin (on_commit, alohida
+    qisqa tranzaksiya): kunlik qator checkout'lar davomida lock bo'lib
+    turmaydi. Callback yiqilsa — backfill_sales_rollups o'sha kunlarni
+    qayta hisoblaydi.
+    """
+
+    @staticmethod
+    def record_created(order_id: int) -> None:
+        SalesRollupService._schedule(order_id, EVENT_CREATED)
+
+    @staticmethod
+    def record_paid(order_id: int) -> None:
+        SalesRollupService._schedule(order_id, EVENT_PAID)
+
+    @staticmethod
+    def record_cancelled(order_id: int) -> None:
+        SalesRollupService._schedule(order_id, EVENT_CANCELLED)
+
+    @staticmethod
+    def _schedule(order_id: int, event: str) -> None:
+        transaction.on_commit(lambda: SalesRollupService.apply(order_id, event), robust=True)
+
+    @staticmethod
+    @transaction.atomic
+    def apply(order_id: int, event: str) -> None:
+        order = Order.objects.filter(pk=order_id).values("created_at", "total_price").first()
+        if order is None:
+            return
+        day = timezone.localdate(order["created_at"])
+        total = order["total_price"]
+
+        if event == EVENT_PAID:
+            SalesRollupService._bump_daily(day, paid_count=1, paid_revenue=total)
+            return
+
+        items = list(
+            OrderItem.objects
+            .filter(order_id=order_id)
+            .values("variant_id", "sku", "product_name", "quantity", "unit_price", CATEGORY_ID, CATEGORY_NAME)
+        )
+        sign = 1 if event == EVENT_CREATED else -1
+        quantity = sum(i["quantity"] for i in items)
+
+        if event == EVENT_CREATED:
+            SalesRollupService._bump_daily(day, order_count=1, gross_revenue=total, item_quantity=quantity)
+        else:
+            SalesRollupService._bump_daily(
+                day, cancelled_count=1, cancelled_revenue=total, item_quantity=-quantity
+            )
+
+        categories = defaultdict(lambda: {"quantity": 0, "revenue": Decimal("0.00")})
+        for i in items:
+            c = categories[(i[CATEGORY_ID], i[CATEGORY_NAME])]
+            c["quantity"] += i["quantity"]
+            c["revenue"] += i["unit_price"] * i["quantity"]
+
+        for (category_id, category_name), c in categories.items():
+            row, _ = SalesCategoryRollup.objects.get_or_create(
+                date=day,
+                category_name=category_name,
+                defaults={"category_id": category_id},
+            )
+            SalesCategoryRollup.objects.filter(pk=row.pk).update(
+                order_count=F("order_count") + sign,
+                quantity=F("quantity") + sign * c["quantity"],
+                revenue=F("revenue") + sign * c["revenue"],
+            )
+
+        for i in items:
+            row, _ = SalesSkuRollup.objects.get_or_create(
+                date=day,
+                sku=_sku_key(i["sku"], i["variant_id"]),
+                defaults={"variant_id": i["variant_id"], "product_name": i["product_name"] or ""},
+            )
+            SalesSkuRollup.objects.filter(pk=row.pk).update(
+                quantity=F("quantity") + sign * i["quantity"],
+                revenue=F("revenue") + sign * i["unit_price"] * i["quantity"],
+            )
+
+    @staticmethod
+    def _bump_daily(day: date, **deltas) -> None:
+        row, _ = SalesDailyRollup.objects.get_or_create(date=day)
+        SalesDailyRollup.objects.filter(pk=row.pk).update(
+            **{field: F(field) + delta for field, delta in deltas.items()},
+            updated_at=timezone.now(),
+        )
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild_days(start: date, end: date) -> int:
+        """
+        [start, end] kunlari uchun rollup'larni Order/OrderItem va arxiv
+        (ArchivedOrder/ArchivedOrderItem) jadvallaridan qayta hisoblaydi
+        (eski qatorlar o'chiriladi). Qaytaradi: hisoblangan kunlar soni.
+        """
+        lo = timezone.make_aware(datetime.combine(start, time.min))
+        hi = timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min))
+
+        SalesDailyRollup.objects.filter(date__range=(start, end)).delete()
+        SalesCategoryRollup.objects.filter(date__range=(start, end)).delete()
+        SalesSkuRollup.objects.filter(date__range=(start, end)).delete()
+
+        daily = defaultdict(lambda: dict.fromkeys(DAILY_FIELDS, 0))
+        categories = {}
+        skus = {}
+
+        # Hot va arxiv jadvallarida order'lar kesishmaydi: natijalar qo'shiladi
+        for order_model, item_model in ((Order, OrderItem), (ArchivedOrder, ArchivedOrderItem)):
+            cancelled = Q(status=Order.STATUS_CANCELLED)
+            for r in (
+                order_model.objects
+                .filter(created_at__gte=lo, created_at__lt=hi)
+                .annotate(day=TruncDate("created_at"))
+                .values("day")
+                .annotate(
+                    order_count=Count("id"),
+                    paid_count=Count("id", filter=Q(paid=True)),
+                    cancelled_count=Count("id", filter=cancelled),
+                    gross_revenue=Sum("total_price"),
+                    paid_revenue=Sum("total_price", filter=Q(paid=True)),
+                    cancelled_revenue=Sum("total_price", filter=cancelled),
+                )
+                .order_by()
+            ):
+                row = daily[r["day"]]
+                for name in DAILY_FIELDS:
+                    row[name] += r.get(name) or 0
+
+            items = (
+                item_model.objects
+                .filter(order__created_at__gte=lo, order__created_at__lt=hi)
+                .exclude(order__status=Order.STATUS_CANCELLED)
+                .annotate(day=TruncDate("order__created_at"))
+            )
+
+            for r in items.values("day").annotate(qty=Sum("quantity")).order_by():
+                daily[r["day"]]["item_quantity"] += r["qty"] or 0
+
+            for r in (
+                items
+                .values("day", CATEGORY_ID, CATEGORY_NAME)
+                .annotate(
+                    order_count=Count("order_id", distinct=True),
+                    value=Sum(_line_revenue()),
+                    qty=Sum("quantity"),
+                )
+                .order_by()
+            ):
+                # Arxivda variant o'chirilgan bo'lishi mumkin (SET_NULL)
+                key = (r["day"], r[CATEGORY_NAME] or "")
+                row = categories.get(key)
+                if row is None:
+                    categories[key] = SalesCategoryRollup(
+                        date=r["day"],
+                        category_id=r[CATEGORY_ID],
+                        category_name=key[1],
+                        order_count=r["order_count"],
+                        quantity=r["qty"],
+                        revenue=r["value"],
+                    )
+                else:
+                    row.order_count += r["order_count"]
+                    row.quantity += r["qty"]
+                    row.revenue += r["value"]
+
+            for r in (
+                items
+                .values("day", "sku", "variant_id", "product_name")
+                .annotate(value=Sum(_line_revenue()), qty=Sum("quantity"))
+                .order_by()
+            ):
+                key = (r["day"], _sku_key(r["sku"], r["variant_id"]))
+                row = skus.get(key)
+                if row is None:
+                    skus[key] = SalesSkuRollup(
+                        date=r["day"],
+                        sku=key[1],
+                        variant_id=r["variant_id"],
+                        product_name=r["product_name"] or "",
+                        quantity=r["qty"],
+                        revenue=r["value"],
+                    )
+                else:
+                    row.quantity += r["qty"]
+                    row.revenue += r["value"]
+
+        SalesDailyRollup.objects.bulk_create(
+            [SalesDailyRollup(date=day, **row) for day, row in daily.items()]
+        )
+        SalesCategoryRollup.objects.bulk_create(categories.values())
+        SalesSkuRollup.objects.bulk_create(skus.values())
+
+        return len(daily)
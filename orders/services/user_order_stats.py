@@ -0,0 +1,142 @@
+# orders/services/user_order_stats.py
+from collections import Counter, defaultdict
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F, Max, Q, Sum
+from django.utils import timezone
+
+from orders.models import ArchivedOrder, Order, UserOrderStats
+
+
+OPEN_STATUSES = (Order.STATUS_PENDING, Order.STATUS_CONFIRMED, Order.STATUS_SHIPPED)
+
+STATS_FIELDS = ["order_count", "open_order_count", "paid_order_count", "total_spent", "last_order_at"]
+
+
+class UserOrderStatsService:
+    """
+    UserOrderStats'ni order o'zgarishi bilan bir tranzaksiyada yangilaydi
+    (shartli F() UPDATE, foydalanuvchi qatori tranzaksiya oxirigacha lock).
+
+    Hook'lar order yozilgandan keyin chaqiriladi: qator hali yo'q bo'lsa
+    (eski foydalanuvchi), u Order + ArchivedOrder'dan hisoblanadi — joriy
+    o'zgarish ham shunga kiradi, shuning uchun qayta qo'shilmaydi.
+    """
+
+    @staticmethod
+    def _bump(user_id: int, **changes) -> None:
+        if not UserOrderStats.objects.filter(pk=user_id).update(**changes, updated_at=timezone.now()):
+            UserOrderStatsService.rebuild(user_ids=[user_id])
+
+    @staticmethod
+    def record_created(order: Order) -> None:
+        UserOrderStatsService._bump(
+            order.user_id,
+            order_count=F("order_count") + 1,
+            open_order_count=F("open_order_count") + 1,
+            last_order_at=order.created_at,
+        )
+
+    @staticmethod
+    def record_paid(order: Order) -> None:
+        UserOrderStatsService._bump(
+            order.user_id,
+            paid_order_count=F("paid_order_count") + 1,
+            total_spent=F("total_spent") + order.total_price,
+        )
+
+    @staticmethod
+    def record_transition(user_id: int, previous_status: str, new_status: str) -> None:
+        UserOrderStatsService.record_transitions([(user_id, previous_status, new_status)])
+
+    @staticmethod
+    def record_transitions(rows) -> None:
+        """rows: (user_id, previous_status, new_status). Faqat ochiq -> yopiq o'tishlar hisoblanadi."""
+        closed = Counter(
+            user_id
+            for user_id, previous_status, new_status in rows
+            if previous_status in OPEN_STATUSES and new_status not in OPEN_STATUSES
+        )
+        # user_id tartibida: parallel bulk o'zgarishlar deadlock'ga tushmaydi
+        for user_id in sorted(closed):
+            UserOrderStatsService._bump(user_id, open_order_count=F("open_order_count") - closed[user_id])
+
+    @staticmethod
+    def get(user_id: int) -> UserOrderStats:
+        stats = UserOrderStats.objects.filter(pk=user_id).first()
+        if stats is None:
+            UserOrderStatsService.rebuild(user_ids=[user_id])
+            stats = UserOrderStats.objects.get(pk=user_id)
+        return stats
+
+    @staticmethod
+    def _aggregate(model, user_ids) -> dict[int, dict]:
+        return {
+            row["user_id"]: row
+            for row in (
+                model.objects
+                .filter(user_id__in=user_ids)
+                .values("user_id")
+                .annotate(
+                    order_count=Count("id"),
+                    open_order_count=Count("id", filter=Q(status__in=OPEN_STATUSES)),
+                    paid_order_count=Count("id", filter=Q(paid=True)),
+                    total_spent=Sum("total_price", filter=Q(paid=True)),
+                    last_order_at=Max("created_at"),
+                )
+                .order_by()
+            )
+        }
+
+    @staticmethod
+    @transaction.atomic
+    def _rebuild_batch(user_ids) -> int:
+        totals = defaultdict(
+            lambda: {
+                "order_count": 0,
+                "open_order_count": 0,
+                "paid_order_count": 0,
+                "total_spent": Decimal("0.00"),
+                "last_order_at": None,
+            }
+        )
+        for model in (Order, ArchivedOrder):
+            for user_id, row in UserOrderStatsService._aggregate(model, user_ids).items():
+                t = totals[user_id]
+                t["order_count"] += row["order_count"]
+                t["open_order_count"] += row["open_order_count"]
+                t["paid_order_count"] += row["paid_order_count"]
+                t["total_spent"] += row["total_spent"] or Decimal("0.00")
+                if t["last_order_at"] is None or (row["last_order_at"] and row["last_order_at"] > t["last_order_at"]):
+                    t["last_order_at"] = row["last_order_at"]
+
+        UserOrderStats.objects.bulk_create(
+            [UserOrderStats(user_id=user_id, **totals[user_id]) for user_id in user_ids],
+            update_conflicts=True,
+            unique_fields=["user"],
+            update_fields=STATS_FIELDS + ["updated_at"],
+        )
+        return len(user_ids)
+
+    @staticmethod
+    def rebuild(*, user_ids=None, batch_size: int = 500) -> int:
+        """
+        Order + ArchivedOrder'dan qayta hisoblaydi (manage.py rebuild_user_order_stats).
+        Foydalanuvchilar id bo'yicha batch'larda; har bir batch — bitta tranzaksiya.
+        Qaytaradi: yozilgan qatorlar soni.
+        """
+        users = get_user_model().objects.order_by("id")
+        if user_ids is not None:
+            users = users.filter(id__in=user_ids)
+
+        total = 0
+        last_id = 0
+        while True:
+            ids = list(users.filter(id__gt=last_id).values_list("id", flat=True)[:batch_size])
+            if not ids:
+                break
+            last_id = ids[-1]
+            total += UserOrderStatsService._rebuild_batch(ids)
+        return total
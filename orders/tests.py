@@ -1,3 +1,612 @@
+import csv
+import io
+import json
+import time
+import zipfile
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core import signing
 from django.test import TestCase
+from django.utils import timezone
+
+from cart.models import CartItem
+from cart.services.cart_service import CartService
+from catalog.models import Brand, Category, Product, ProductVariant, StockMovement, SubCategory
+from catalog.services.stock_service import InsufficientStock
+from chat.consumers import ChatGatewayConsumer
+from orders.models import (
+    CheckoutJob,
+    Order,
+    OrderItem,
+    SalesCategoryRollup,
+    SalesDailyRollup,
+    SalesSkuRollup,
+    UserOrderStats,
+)
+from orders.services.checkout_queue import CheckoutQueue
+from orders.services.checkout_quote import CheckoutQuote
+from orders.services.checkout_service import CheckoutService
+from orders.services.order_archiver import OrderArchiver
+from orders.services.order_expiry import OrderExpiry
+from orders.services.order_export import HEADER, OrderExport
+from orders.services.order_status_service import OrderStatusService
+from orders.services.sales_rollup_service import DAILY_FIELDS, SalesRollupService
+from orders.services.user_order_stats import STATS_FIELDS, UserOrderStatsService
+from payments.models import Payment
+from payments.services.payment_service import PaymentService
+
+
+def create_variants(count: int = 2, *, stock: int = 10, price: Decimal = Decimal("10.00")) -> list[ProductVariant]:
+    category = Category.objects.create(name="Food", slug="food")
+    subcategory = SubCategory.objects.create(category=category, name="Dairy", slug="dairy")
+    brand = Brand.objects.create(name="Brand", slug="brand")
+    product = Product.objects.create(subcategory=subcategory, brand=brand, name="Milk", slug="milk")
+    return [
+        ProductVariant.objects.create(
+            product=product,
+            name=f"{i}L",
+            unit="l",
+            value=Decimal("1"),
+            price=price,
+            stock_quantity=stock,
+            sku=f"MILK-{i}",
+        )
+        for i in range(count)
+    ]
+
+
+class CheckoutQueueTests(TestCase):
+    def setUp(self):
+        self.variants = create_variants()
+        self.user = get_user_model().objects.create_user(username="buyer", password="pass")
+        CartService.add_to_cart(self.user, variant_id=self.variants[0].id, quantity=2)
+
+    def _enqueue(self) -> CheckoutJob:
+        return CheckoutQueue.enqueue(self.user, phone="998900000000", address="Tashkent")
+
+    def test_unexpected_error_fails_job_and_unblocks_user(self):
+        job = self._enqueue()
+        claimed = CheckoutQueue.claim_next(job.shard)
+
+        with mock.patch(
+            "orders.services.checkout_queue.CheckoutService.checkout", side_effect=RuntimeError("boom")
+        ), self.assertLogs("orders.services.checkout_queue", level="ERROR"):
+            CheckoutQueue.process(claimed)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, CheckoutJob.STATUS_FAILED)
+        self.assertEqual(job.error["code"], "RuntimeError")
+
+        retry = self._enqueue()
+        self.assertNotEqual(retry.pk, job.pk)
+        self.assertEqual(retry.status, CheckoutJob.STATUS_QUEUED)
+
+        CheckoutQueue.process(CheckoutQueue.claim_next(retry.shard))
+        retry.refresh_from_db()
+        self.assertEqual(retry.status, CheckoutJob.STATUS_SUCCEEDED)
+        self.assertIsNotNone(retry.order_id)
+
+    def test_result_push_matches_gateway_handler(self):
+        job = self._enqueue()
+        CheckoutQueue.process(CheckoutQueue.claim_next(job.shard))
+
+        layer = mock.Mock()
+        layer.group_send = mock.AsyncMock()
+        with mock.patch("orders.services.checkout_queue.get_channel_layer", return_value=layer):
+            CheckoutQueue.push_result(job)
+        group, event = layer.group_send.await_args.args
+        self.assertEqual(group, f"user_{self.user.id}")
+        self.assertEqual(event["type"], "checkout.result")
+
+        # Channels "checkout.result" -> ChatGatewayConsumer.checkout_result
+        consumer = ChatGatewayConsumer()
+        consumer.send = mock.AsyncMock()
+        async_to_sync(getattr(consumer, event["type"].replace(".", "_")))(event)
+        message = json.loads(consumer.send.await_args.kwargs["text_data"])
+        self.assertEqual(message["type"], "checkout.result")
+        self.assertEqual(message["job"]["ticket"], str(job.ticket))
+
+
+class OrderStatusPushTests(TestCase):
+    def setUp(self):
+        self.variants = create_variants()
+        self.user = get_user_model().objects.create_user(username="buyer", password="pass")
+        CartService.add_to_cart(self.user, variant_id=self.variants[0].id, quantity=1)
+        self.order = CheckoutService.checkout(self.user, phone="998900000000", address="Tashkent")
+        self.layer = mock.Mock()
+        self.layer.group_send = mock.AsyncMock()
+
+    def _pushed(self) -> list[tuple[str, dict]]:
+        return [c.args for c in self.layer.group_send.await_args_list]
+
+    def test_changes_are_pushed_after_commit_with_gap_free_seq(self):
+        with mock.patch("orders.services.order_events.get_channel_layer", return_value=self.layer):
+            with self.captureOnCommitCallbacks() as callbacks:
+                PaymentService.mark_mock_paid(order=self.order)
+            # Commit'gacha hech narsa yuborilmaydi
+            self.layer.group_send.assert_not_awaited()
+            for callback in callbacks:
+                callback()
+
+            with self.captureOnCommitCallbacks(execute=True):
+                OrderStatusService.update_status(order_id=self.order.id, new_status=Order.STATUS_CONFIRMED)
+
+        pushed = self._pushed()
+        self.assertEqual([group for group, _ in pushed], [f"user_{self.user.id}"] * 2)
+        self.assertEqual(
+            [(e["type"], e["event"]["seq"], e["event"]["status"], e["event"]["paid"]) for _, e in pushed],
+            [("order.status", 1, Order.STATUS_PENDING, True), ("order.status", 2, Order.STATUS_CONFIRMED, True)],
+        )
+
+        # Channels "order.status" -> ChatGatewayConsumer.order_status
+        consumer = ChatGatewayConsumer()
+        consumer.send = mock.AsyncMock()
+        async_to_sync(consumer.order_status)(pushed[-1][1])
+        message = json.loads(consumer.send.await_args.kwargs["text_data"])
+        self.assertEqual((message["type"], message["order_id"], message["seq"]), ("order.status", self.order.id, 2))
+
+    def test_resume_returns_missed_events(self):
+        PaymentService.mark_mock_paid(order=self.order)
+        OrderStatusService.update_status(order_id=self.order.id, new_status=Order.STATUS_CONFIRMED)
+        OrderStatusService.update_status(order_id=self.order.id, new_status=Order.STATUS_SHIPPED)
+
+        self.client.force_login(self.user)
+        data = self.client.get("/api/orders/events/", {"since": 1, "limit": 1}).json()
+        self.assertEqual(data["last_seq"], 3)
+        self.assertTrue(data["has_more"])
+        self.assertEqual([(e["seq"], e["status"]) for e in data["events"]], [(2, Order.STATUS_CONFIRMED)])
+
+        data = self.client.get("/api/orders/events/", {"since": 2}).json()
+        self.assertFalse(data["has_more"])
+        self.assertEqual([e["seq"] for e in data["events"]], [3])
+
+
+class CheckoutQuoteTests(TestCase):
+    def setUp(self):
+        self.variants = create_variants()
+        self.user = get_user_model().objects.create_user(username="buyer", password="pass")
+        CartService.add_to_cart(self.user, variant_id=self.variants[0].id, quantity=2)
+        self.client.force_login(self.user)
+
+    def _quote(self) -> dict:
+        response = self.client.post("/api/orders/quote/")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def _checkout(self, quote: str):
+        return self.client.post(
+            "/api/orders/checkout/",
+            {"phone": "998900000000", "address": "Tashkent", "quote": quote},
+            content_type="application/json",
+        )
+
+    def _assert_rejected(self, quote: str) -> str:
+        with self.assertLogs("django.request", "WARNING"):
+            response = self._checkout(quote)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["code"], "quote_invalid")
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(ProductVariant.objects.get(pk=self.variants[0].pk).stock_quantity, 10)
+        return response.json()["detail"]
+
+    def test_valid_quote_keeps_quoted_prices(self):
+        quote = self._quote()
+        self.assertTrue(quote["can_checkout"])
+        ProductVariant.objects.filter(pk=self.variants[0].pk).update(price=Decimal("99.00"))
+
+        response = self._checkout(quote["quote"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Decimal(response.json()["total_price"]), Decimal("20.00"))
+        self.assertEqual(ProductVariant.objects.get(pk=self.variants[0].pk).stock_quantity, 8)
+
+    def test_tampered_quote_is_rejected(self):
+        token = self._quote()["quote"]
+        payload, signature = token.rsplit(":", 1)
+        self._assert_rejected(f"{payload}:{signature[::-1]}")
+
+        other = get_user_model().objects.create_user(username="other", password="pass")
+        CartService.add_to_cart(other, variant_id=self.variants[0].id, quantity=1)
+        self.client.force_login(other)
+        foreign = self._quote()["quote"]
+        self.client.force_login(self.user)
+        self._assert_rejected(foreign)
+
+    def test_expired_quote_is_rejected(self):
+        issued = int(time.time()) - CheckoutQuote.ttl() - 1
+        with mock.patch.object(signing.TimestampSigner, "timestamp", return_value=signing.b62_encode(issued)):
+            token = self._quote()["quote"]
+        self.assertEqual(self._assert_rejected(token), "Quote has expired.")
+
+    def test_cart_changed_since_quote_is_rejected(self):
+        token = self._quote()["quote"]
+        CartService.add_to_cart(self.user, variant_id=self.variants[1].id, quantity=1)
+        self._assert_rejected(token)
+
+
+class OrderExpiryTests(TestCase):
+    def setUp(self):
+        self.variants = create_variants()
+        self.online = self._checkout("online", Payment.METHOD_CLICK)
+        self.paid = self._checkout("paid", Payment.METHOD_CLICK)
+        self.cod = self._checkout("cod", Payment.METHOD_COD)
+        PaymentService.mark_mock_paid(order=self.paid)
+
+    def _checkout(self, username: str, method: str) -> Order:
+        user = get_user_model().objects.create_user(username=username, password="pass")
+        for variant in self.variants:
+            CartService.add_to_cart(user, variant_id=variant.id, quantity=2)
+        order = CheckoutService.checkout(user, phone="998900000000", address="Tashkent")
+        Payment.objects.filter(order=order).update(method=method)
+        return order
+
+    def _expire(self):
+        return OrderExpiry.expire(ttl_minutes=0, now=timezone.now() + timedelta(minutes=1))
+
+    def _stock(self) -> list[int]:
+        return list(ProductVariant.objects.order_by("id").values_list("stock_quantity", flat=True))
+
+    def test_expiry_releases_stock_exactly_once(self):
+        self.assertEqual(self._stock(), [4, 4])
+
+        result = self._expire()
+        self.assertEqual((result.orders_expired, result.payments_cancelled), (1, 1))
+        self.assertEqual(self._stock(), [6, 6])
+        statuses = dict(Order.objects.values_list("id", "status"))
+        self.assertEqual(statuses[self.online.id], Order.STATUS_CANCELLED)
+        self.assertNotEqual(statuses[self.paid.id], Order.STATUS_CANCELLED)
+        self.assertEqual(statuses[self.cod.id], Order.STATUS_PENDING)
+
+        # Qayta ishga tushirish va keyingi bekor qilish stock'ni ikkinchi marta qaytarmaydi
+        self.assertEqual(self._expire().orders_expired, 0)
+        OrderStatusService.cancel_by_user(user=self.online.user, order_id=self.online.id)
+        OrderStatusService.update_status(order_id=self.online.id, new_status=Order.STATUS_CANCELLED)
+        self.assertEqual(self._stock(), [6, 6])
+        self.assertEqual(
+            list(
+                StockMovement.objects
+                .filter(order_id=self.online.id, reason=StockMovement.REASON_CANCEL)
+                .values_list("delta", flat=True)
+            ),
+            [2, 2],
+        )
+
+
+class UserOrderStatsTests(TestCase):
+    def setUp(self):
+        self.variants = create_variants()
+        self.user = get_user_model().objects.create_user(username="buyer", password="pass")
+
+    def _checkout(self, quantity: int) -> Order:
+        CartService.add_to_cart(self.user, variant_id=self.variants[0].id, quantity=quantity)
+        return CheckoutService.checkout(self.user, phone="998900000000", address="Tashkent")
+
+    def _stats(self) -> dict:
+        return UserOrderStats.objects.filter(pk=self.user.pk).values(*STATS_FIELDS).get()
+
+    def test_counters_follow_checkout_payment_and_closing(self):
+        first = self._checkout(1)
+        # Qator birinchi checkout'da Order'dan hisoblanadi, joriy order ikki marta sanalmaydi
+        self.assertEqual((self._stats()["order_count"], self._stats()["open_order_count"]), (1, 1))
+
+        second = self._checkout(2)
+        self._checkout(3)
+        PaymentService.mark_mock_paid(order=second)
+        OrderStatusService.cancel_by_user(user=self.user, order_id=first.id)
+        for new_status in (Order.STATUS_CONFIRMED, Order.STATUS_SHIPPED, Order.STATUS_DELIVERED):
+            OrderStatusService.update_status(order_id=second.id, new_status=new_status)
+
+        stats = self._stats()
+        self.assertEqual(
+            (stats["order_count"], stats["open_order_count"], stats["paid_order_count"], stats["total_spent"]),
+            (3, 1, 1, second.total_price),
+        )
+        self.assertEqual(stats["last_order_at"], Order.objects.latest("created_at").created_at)
+
+        UserOrderStats.objects.all().delete()
+        UserOrderStatsService.rebuild()
+        self.assertEqual(self._stats(), stats)
+
+        self.client.force_login(self.user)
+        data = self.client.get("/api/users/me/order-stats/").json()
+        self.assertEqual((data["order_count"], data["open_order_count"]), (3, 1))
+        self.assertEqual(Decimal(data["total_spent"]), second.total_price)
+
+
+class OrderExportTests(TestCase):
+    def setUp(self):
+        self.variants = create_variants()
+        self.admin = get_user_model().objects.create_user(username="admin", password="pass", is_staff=True)
+        self.paid = self._checkout("paid", (2, 1))
+        self.pending = self._checkout("pending", (1,))
+        self.cancelled = self._checkout("cancelled", (1, 3))
+        PaymentService.mark_mock_paid(order=self.paid)
+        OrderStatusService.update_status(order_id=self.cancelled.id, new_status=Order.STATUS_CANCELLED)
+
+    def _checkout(self, username: str, quantities: tuple[int, ...]) -> Order:
+        user = get_user_model().objects.create_user(username=username, password="pass")
+        for variant, quantity in zip(self.variants, quantities):
+            CartService.add_to_cart(user, variant_id=variant.id, quantity=quantity)
+        return CheckoutService.checkout(user, phone="998900000000", address="Tashkent")
+
+    def _export(self, **params) -> bytes:
+        self.client.force_login(self.admin)
+        response = self.client.get("/api/orders/export/", params)
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content)
+
+    def test_csv_has_one_row_per_order_item(self):
+        rows = list(csv.reader(io.StringIO(self._export().decode("utf-8-sig"))))
+        self.assertEqual(rows[0], HEADER)
+        self.assertEqual(len(rows) - 1, OrderItem.objects.count())
+        self.assertEqual(
+            [int(r[0]) for r in rows[1:]],
+            [self.paid.id] * 2 + [self.pending.id] + [self.cancelled.id] * 2,
+        )
+
+    def test_filters_narrow_rows(self):
+        lines = self._export(file_format="jsonl", paid="true").decode("utf-8").splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual([(r["order_id"], r["payment_status"]) for r in records], [(self.paid.id, "paid")] * 2)
+
+        lines = self._export(file_format="jsonl", status=Order.STATUS_CANCELLED).decode("utf-8").splitlines()
+        self.assertEqual({json.loads(line)["order_id"] for line in lines}, {self.cancelled.id})
+        self.assertEqual(len(lines), 2)
+
+    def test_xlsx_rolls_over_to_next_sheet(self):
+        with zipfile.ZipFile(io.BytesIO(self._export(file_format="xlsx"))) as zf:
+            self.assertEqual(zf.read("xl/worksheets/sheet1.xml").count(b"<row "), 1 + 5)
+
+        # Varaq: sarlavha + 2 qator
+        with mock.patch("orders.services.order_export.XLSX_MAX_ROWS", 3):
+            data = b"".join(OrderExport.xlsx(OrderExport.rows()))
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            sheets = sorted(n for n in zf.namelist() if n.startswith("xl/worksheets/"))
+            self.assertEqual(len(sheets), 3)
+            self.assertEqual([zf.read(n).count(b"<row ") - 1 for n in sheets], [2, 2, 1])
+            self.assertEqual(zf.read("xl/workbook.xml").count(b"<sheet "), 3)
+
+
+class SalesRollupIncrementalTests(TestCase):
+    def setUp(self):
+        self.variants = create_variants()
+        self.admin = get_user_model().objects.create_user(username="admin", password="pass", is_staff=True)
+
+    def _checkout(self, username: str, quantities: tuple[int, ...]) -> Order:
+        user = get_user_model().objects.create_user(username=username, password="pass")
+        for variant, quantity in zip(self.variants, quantities):
+            CartService.add_to_cart(user, variant_id=variant.id, quantity=quantity)
+        with self.captureOnCommitCallbacks(execute=True):
+            return CheckoutService.checkout(user, phone="998900000000", address="Tashkent")
+
+    def test_incremental_rollups_match_rebuild_and_endpoint(self):
+        paid = self._checkout("paid", (2, 1))
+        self._checkout("pending", (1,))
+        cancelled = self._checkout("cancelled", (3, 3))
+        with self.captureOnCommitCallbacks(execute=True):
+            PaymentService.mark_mock_paid(order=paid)
+        with self.captureOnCommitCallbacks(execute=True):
+            OrderStatusService.update_status(order_id=cancelled.id, new_status=Order.STATUS_CANCELLED)
+
+        incremental = SalesRollupRebuildTests._snapshot()
+        daily = incremental[0][0]
+        self.assertEqual(
+            (daily["order_count"], daily["paid_count"], daily["cancelled_count"], daily["item_quantity"]),
+            (3, 1, 1, 4),
+        )
+        self.assertEqual(daily["paid_revenue"], paid.total_price)
+
+        today = timezone.localdate()
+        SalesRollupService.rebuild_days(today, today)
+        self.assertEqual(SalesRollupRebuildTests._snapshot(), incremental)
+
+        self.client.force_login(self.admin)
+        response = self.client.get("/api/orders/analytics/sales/", {"top": 1})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["totals"]["order_count"], 3)
+        self.assertEqual([s["sku"] for s in data["top_skus"]], ["MILK-0"])
+
+
+class SalesRollupRebuildTests(TestCase):
+    def setUp(self):
+        self.variants = create_variants()
+        self.user = get_user_model().objects.create_user(username="buyer", password="pass")
+        self._order(Order.STATUS_DELIVERED, paid=True, quantities=(2, 1))
+        self._order(Order.STATUS_CANCELLED, quantities=(3,))
+        self._order(Order.STATUS_PENDING, quantities=(1,))
+
+    def _order(self, status: str, *, paid: bool = False, quantities: tuple[int, ...]) -> Order:
+        order = Order.objects.create(
+            user=self.user,
+            status=status,
+            paid=paid,
+            phone="998900000000",
+            address="Tashkent",
+            total_price=Decimal("10.00") * sum(quantities),
+        )
+        OrderItem.objects.bulk_create(
+            [
+                OrderItem(
+                    order=order,
+                    variant=variant,
+                    sku=variant.sku,
+                    product_name="Milk",
+                    variant_name=variant.name,
+                    unit_price=variant.price,
+                    quantity=quantity,
+                )
+                for variant, quantity in zip(self.variants, quantities)
+            ]
+        )
+        return order
+
+    @staticmethod
+    def _snapshot() -> tuple:
+        return (
+            list(SalesDailyRollup.objects.order_by("date").values(*DAILY_FIELDS)),
+            list(SalesCategoryRollup.objects.values("category_name", "order_count", "quantity", "revenue")),
+            list(SalesSkuRollup.objects.order_by("sku").values("sku", "quantity", "revenue")),
+        )
+
+    def test_rebuild_after_archive_keeps_archived_orders(self):
+        today = timezone.localdate()
+        SalesRollupService.rebuild_days(today, today)
+        before = self._snapshot()
+        self.assertEqual(before[0][0]["order_count"], 3)
+        self.assertEqual(before[0][0]["item_quantity"], 4)
+        self.assertEqual(before[1][0]["order_count"], 2)
+
+        result = OrderArchiver.archive(older_than_days=0, now=timezone.now() + timedelta(minutes=1))
+        self.assertEqual(result.orders_archived, 2)
+        self.assertEqual(Order.objects.count(), 1)
+
+        SalesRollupService.rebuild_days(today, today)
+        self.assertEqual(self._snapshot(), before)
+
+
+class BulkStatusEndpointTests(TestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create_user(username="admin", password="pass", is_staff=True)
+        self.client.force_login(self.admin)
+
+    def _order(self, status: str) -> Order:
+        return Order.objects.create(
+            user=self.admin, status=status, phone="998900000000", address="Tashkent", total_price=Decimal("10.00")
+        )
+
+    def test_counts_separate_updated_unchanged_and_failed(self):
+        pending = self._order(Order.STATUS_PENDING)
+        confirmed = self._order(Order.STATUS_CONFIRMED)
+        delivered = self._order(Order.STATUS_DELIVERED)
+
+        response = self.client.post(
+            "/api/orders/bulk-status/",
+            {"order_ids": [pending.id, confirmed.id, delivered.id], "status": Order.STATUS_CONFIRMED},
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data["updated"], data["unchanged"], data["failed"]), (1, 1, 1))
+        self.assertEqual(
+            [(r["order_id"], r["ok"], r["changed"]) for r in data["results"]],
+            [(pending.id, True, True), (confirmed.id, True, False), (delivered.id, False, False)],
+        )
+        self.assertEqual(
+            dict(Order.objects.values_list("id", "status")),
+            {
+                pending.id: Order.STATUS_CONFIRMED,
+                confirmed.id: Order.STATUS_CONFIRMED,
+                delivered.id: Order.STATUS_DELIVERED,
+            },
+        )
+
+
+class CheckoutStockTests(TestCase):
+    def setUp(self):
+        self.variants = create_variants(stock=5)
+        self.user = get_user_model().objects.create_user(username="buyer", password="pass")
+        for variant in self.variants:
+            CartService.add_to_cart(self.user, variant_id=variant.id, quantity=3)
+
+    def _stock(self) -> list[int]:
+        return list(ProductVariant.objects.order_by("id").values_list("stock_quantity", flat=True))
+
+    def test_checkout_decrements_stock_and_records_ledger(self):
+        order = CheckoutService.checkout(self.user, phone="998900000000", address="Tashkent")
+
+        self.assertEqual(self._stock(), [2, 2])
+        self.assertEqual(
+            sorted(StockMovement.objects.filter(order_id=order.id).values_list("variant_id", "delta")),
+            [(v.id, -3) for v in self.variants],
+        )
+
+    def test_shortage_rolls_back_whole_checkout(self):
+        ProductVariant.objects.filter(pk=self.variants[1].pk).update(stock_quantity=2)
+
+        with self.assertRaises(InsufficientStock) as ctx:
+            CheckoutService.checkout(self.user, phone="998900000000", address="Tashkent")
+
+        self.assertEqual(
+            [(s["variant_id"], s["requested"], s["available"]) for s in ctx.exception.shortages],
+            [(self.variants[1].id, 3, 2)],
+        )
+        self.assertEqual(self._stock(), [5, 2])
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(StockMovement.objects.exists())
+        self.assertEqual(CartItem.objects.filter(cart__user=self.user).count(), 2)
+
+
+class OrderHistoryTests(TestCase):
+    def setUp(self):
+        self.variants = create_variants()
+        self.user = get_user_model().objects.create_user(username="buyer", password="pass")
+        self.client.force_login(self.user)
+        other = get_user_model().objects.create_user(username="other", password="pass")
+        Order.objects.create(user=other, phone="998900000000", address="Tashkent")
+
+        self.orders = [
+            Order.objects.create(
+                user=self.user,
+                status=Order.STATUS_DELIVERED if i == 0 else Order.STATUS_PENDING,
+                phone="998900000000",
+                address="Tashkent",
+            )
+            for i in range(5)
+        ]
+        OrderItem.objects.bulk_create(
+            [
+                OrderItem(order=order, variant=variant, unit_price=variant.price, quantity=1)
+                for order in self.orders[:2]
+                for variant in self.variants
+            ]
+        )
+        # Bir xil created_at: tartib id bo'yicha davom etadi
+        Order.objects.filter(user=self.user).update(created_at=timezone.now())
+
+    def _pages(self, url: str) -> list[list[dict]]:
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.json()["results"])
+            url = response.json()["next"]
+        return pages
+
+    def test_keyset_pages_cover_history_once_in_order(self):
+        pages = self._pages("/api/orders/?page_size=2")
+
+        self.assertEqual([len(p) for p in pages], [2, 2, 1])
+        rows = [row for page in pages for row in page]
+        self.assertEqual([r["id"] for r in rows], [o.id for o in reversed(self.orders)])
+        self.assertEqual({r["id"]: r["item_count"] for r in rows}[self.orders[0].id], 2)
+        self.assertNotIn("items", rows[0])
+
+    def test_archived_orders_continue_the_same_keyset(self):
+        OrderArchiver.archive(older_than_days=0, now=timezone.now() + timedelta(minutes=1))
+
+        rows = [row for page in self._pages("/api/orders/?page_size=2") for row in page]
+
+        self.assertEqual([r["id"] for r in rows], [o.id for o in reversed(self.orders)])
+        self.assertEqual([r["id"] for r in rows if r["archived"]], [self.orders[0].id])
+
+    def test_status_filter_and_invalid_cursor(self):
+        rows = self.client.get("/api/orders/", {"status": Order.STATUS_DELIVERED}).json()["results"]
+        self.assertEqual([r["id"] for r in rows], [self.orders[0].id])
+
+        self.assertEqual(self.client.get("/api/orders/", {"cursor": "bogus"}).status_code, 404)
+
+    def test_retrieve_falls_back_to_archive_and_rejects_non_numeric_id(self):
+        OrderArchiver.archive(older_than_days=0, now=timezone.now() + timedelta(minutes=1))
+        archived, hot = self.orders[0], self.orders[-1]
 
-# Create your tests here.
+        self.assertEqual(self.client.get(f"/api/orders/{hot.id}/").json()["id"], hot.id)
+        self.assertEqual(self.client.get(f"/api/orders/{archived.id}/").json()["id"], archived.id)
+        for lookup in ("abc", "1.5", str(hot.id + 1000)):
+            response = self.client.get(f"/api/orders/{lookup}/")
+            self.assertEqual(response.status_code, 404, lookup)
+            self.assertEqual(response.json()["detail"], "Not found.")
@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from outbox.services.dispatcher import OutboxDispatcher
+from outbox.services.outbox import Outbox
+from outbox.sinks import load_sinks
+
+
+class Command(BaseCommand):
+    help = (
+        "Outbox dispatcher: OutboxEvent navbatini batch'larda settings.OUTBOX_SINKS "
+        "(channel layer / webhook / log fayl) ga yetkazadi. Navbat to'la bo'lsa "
+        "kutmasdan keyingi batch'ni oladi; lag va backlog davriy chiqariladi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Navbat bo'sh bo'lsa kutish (s)")
+        parser.add_argument("--stats-interval", type=float, default=30.0, help="Backpressure statistikasi oralig'i (s)")
+        parser.add_argument("--once", action="store_true", help="Navbatni bo'shatib chiqib ketish")
+
+    def handle(self, *args, **opts):
+        sinks = load_sinks()
+        self.stdout.write(f"sinks: {', '.join(s.name for s in sinks) or '-'}")
+
+        last_stats = 0.0
+        try:
+            while True:
+                result = OutboxDispatcher.dispatch_batch(sinks, batch_size=opts["batch_size"])
+                if result.errors:
+                    self.stderr.write(
+                        f"batch of {result.claimed}: retried={result.retried} dead={result.dead} "
+                        f"errors={'; '.join(result.errors)}"
+                    )
+
+                now = time.monotonic()
+                if now - last_stats >= opts["stats_interval"]:
+                    last_stats = now
+                    self._report()
+
+                if result.claimed < opts["batch_size"]:
+                    if opts["once"]:
+                        break
+                    time.sleep(opts["poll_interval"])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            connection.close()
+
+        self._report()
+
+    def _report(self) -> None:
+        stats = Outbox.stats()
+        line = (
+            f"pending={stats.pending} retrying={stats.retrying} failed={stats.failed} "
+            f"dispatched_1h={stats.dispatched_last_hour} lag={stats.oldest_pending_age:.1f}s"
+        )
+        self.stdout.write(self.style.WARNING(line) if stats.backlogged else line)
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from outbox.services.outbox import Outbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Outbox backpressure ko'rsatkichlari: pending / retrying / dead-letter soni "
+        "va eng eski yetkazilmagan hodisa yoshi. Lag OUTBOX_LAG_WARNING_SECONDS'dan "
+        "oshsa yoki dead-letter bo'lsa exit code 1 (monitoring uchun)."
+    )
+
+    def handle(self, *args, **opts):
+        stats = Outbox.stats()
+        self.stdout.write(
+            f"pending={stats.pending} retrying={stats.retrying} failed={stats.failed} "
+            f"dispatched_1h={stats.dispatched_last_hour} lag={stats.oldest_pending_age:.1f}s"
+        )
+        if stats.backlogged or stats.failed:
+            raise SystemExit(1)
+        self.stdout.write(self.style.SUCCESS("Outbox is healthy"))
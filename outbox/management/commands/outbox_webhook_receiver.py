@@ -0,0 +1,64 @@
+import hashlib
+import hmac
+import json
+import random
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Lokal webhook stand-in: WebhookSink yuborgan batch'larni qabul qiladi, "
+        "imzoni tekshiradi va hodisalarni chiqaradi. --fail-rate bilan xatolarni "
+        "simulyatsiya qilib, retry/backoff'ni sinash mumkin."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--secret", default="", help="WebhookSink secret (imzo tekshiruvi)")
+        parser.add_argument("--fail-rate", type=float, default=0.0, help="0..1: 503 qaytarish ehtimoli")
+
+    def handle(self, *args, **opts):
+        command = self
+        seen = set()
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+                if opts["secret"]:
+                    expected = hmac.new(opts["secret"].encode("utf-8"), body, hashlib.sha256).hexdigest()
+                    if not hmac.compare_digest(expected, self.headers.get("X-Outbox-Signature", "")):
+                        self.send_response(401)
+                        self.end_headers()
+                        return
+
+                if random.random() < opts["fail_rate"]:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+
+                for event in json.loads(body).get("events", []):
+                    duplicate = event["id"] in seen
+                    seen.add(event["id"])
+                    command.stdout.write(
+                        f"#{event['id']} {event['topic']} {event['aggregate_type']}={event['aggregate_id']}"
+                        + (" (duplicate)" if duplicate else "")
+                    )
+
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((opts["host"], opts["port"]), Handler)
+        self.stdout.write(f"Listening on http://{opts['host']}:{opts['port']}/")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from outbox.services.dispatcher import OutboxDispatcher
+from outbox.services.outbox import Outbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Yetkazilgan eski OutboxEvent'larni batch'larda o'chiradi. "
+        "--retry-failed: dead-letter hodisalarni navbatga qaytaradi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than-days", type=int, default=None, help="Default: settings.OUTBOX_RETENTION_DAYS")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--retry-failed", action="store_true")
+
+    def handle(self, *args, **opts):
+        if opts["retry_failed"]:
+            requeued = OutboxDispatcher.retry_failed()
+            self.stdout.write(f"Requeued {requeued} failed outbox events")
+
+        total = Outbox.purge(older_than_days=opts["older_than_days"], batch_size=opts["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Purged {total} outbox events"))
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-19 16:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('topic', models.CharField(choices=[('order.created', 'Order created'), ('order.paid', 'Order paid'), ('order.status_changed', 'Order status changed'), ('order.cancelled', 'Order cancelled'), ('payment.failed', 'Payment failed')], max_length=50)),
+                ('aggregate_type', models.CharField(max_length=30)),
+                ('aggregate_id', models.BigIntegerField()),
+                ('payload', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(auto_now_add=True)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('dispatched_at', models.DateTimeField(blank=True, null=True)),
+                ('failed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('dispatched_at__isnull', True), ('failed_at__isnull', True)), fields=['next_attempt_at', 'id'], name='outbox_pending_idx'), models.Index(condition=models.Q(('dispatched_at__isnull', False)), fields=['dispatched_at'], name='outbox_dispatched_idx'), models.Index(fields=['aggregate_type', 'aggregate_id', 'id'], name='outbox_aggregate_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,67 @@
+from django.db import models
+
+
+class OutboxEvent(models.Model):
+    """
+    Transactional outbox: domen hodisasi holat o'zgarishi bilan bitta
+    tranzaksiyada yoziladi, dispatcher (manage.py dispatch_outbox) esa uni
+    sink'larga yetkazadi (at-least-once: iste'molchi `id` bo'yicha dedup qiladi).
+    """
+    TOPIC_ORDER_CREATED = "order.created"
+    TOPIC_ORDER_PAID = "order.paid"
+    TOPIC_ORDER_STATUS_CHANGED = "order.status_changed"
+    TOPIC_ORDER_CANCELLED = "order.cancelled"
+    TOPIC_PAYMENT_FAILED = "payment.failed"
+
+    TOPIC_CHOICES = [
+        (TOPIC_ORDER_CREATED, "Order created"),
+        (TOPIC_ORDER_PAID, "Order paid"),
+        (TOPIC_ORDER_STATUS_CHANGED, "Order status changed"),
+        (TOPIC_ORDER_CANCELLED, "Order cancelled"),
+        (TOPIC_PAYMENT_FAILED, "Payment failed"),
+    ]
+
+    topic = models.CharField(max_length=50, choices=TOPIC_CHOICES)
+    aggregate_type = models.CharField(max_length=30)
+    aggregate_id = models.BigIntegerField()
+    payload = models.JSONField(default=dict)
+
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    # Yetkazish holati
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(auto_now_add=True)
+    last_error = models.TextField(blank=True, default="")
+    dispatched_at = models.DateTimeField(null=True, blank=True)
+    # OUTBOX_MAX_ATTEMPTS'dan keyin dead-letter: dispatcher qayta olmaydi
+    failed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Dispatcher navbati: faqat yetkazilmaganlar (partial index kichik qoladi)
+            models.Index(
+                fields=["next_attempt_at", "id"],
+                condition=models.Q(dispatched_at__isnull=True, failed_at__isnull=True),
+                name="outbox_pending_idx",
+            ),
+            # Retention purge
+            models.Index(
+                fields=["dispatched_at"],
+                condition=models.Q(dispatched_at__isnull=False),
+                name="outbox_dispatched_idx",
+            ),
+            models.Index(fields=["aggregate_type", "aggregate_id", "id"], name="outbox_aggregate_idx"),
+        ]
+
+    def as_message(self) -> dict:
+        return {
+            "id": self.id,
+            "topic": self.topic,
+            "aggregate_type": self.aggregate_type,
+            "aggregate_id": self.aggregate_id,
+            "payload": self.payload,
+            "created_at": self.created_at.isoformat(),
+        }
+
+    def __str__(self) -> str:
+        return f"#{self.id} {self.topic} {self.aggregate_type}={self.aggregate_id}"
@@ -0,0 +1,90 @@
+import logging
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from outbox.models import OutboxEvent
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DispatchResult:
+    claimed: int = 0
+    dispatched: int = 0
+    retried: int = 0
+    dead: int = 0
+    errors: list[str] = field(default_factory=list)
+
+
+class OutboxDispatcher:
+    """
+    Outbox navbatini batch'larda bo'shatadi (at-least-once).
+
+    Batch skip_locked bilan olinadi (bir nechta dispatcher bir-birini
+    kutmaydi) va har bir sink'ga bitta chaqiruvda yuboriladi. Birorta sink
+    yiqilsa — butun batch exponential backoff bilan qayta rejalashtiriladi
+    (boshqa sink'lar takror olishi mumkin: iste'molchi `id` bo'yicha dedup).
+    OUTBOX_MAX_ATTEMPTS'dan keyin hodisa dead-letter (failed_at).
+    """
+
+    @staticmethod
+    def _backoff(attempts: int) -> timedelta:
+        seconds = settings.OUTBOX_RETRY_BASE_SECONDS * (2 ** (attempts - 1))
+        return timedelta(seconds=min(seconds, settings.OUTBOX_RETRY_MAX_SECONDS))
+
+    @staticmethod
+    @transaction.atomic
+    def dispatch_batch(sinks, *, batch_size: int = 100) -> DispatchResult:
+        result = DispatchResult()
+        now = timezone.now()
+
+        events = list(
+            OutboxEvent.objects
+            .select_for_update(skip_locked=True)
+            .filter(dispatched_at__isnull=True, failed_at__isnull=True, next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+        if not events:
+            return result
+        result.claimed = len(events)
+
+        # Batch ichida yaratilish tartibida
+        events.sort(key=lambda e: e.id)
+        messages = [e.as_message() for e in events]
+        for sink in sinks:
+            try:
+                sink.send(messages)
+            except Exception as e:
+                logger.warning("outbox sink %s failed for %d event(s): %s", sink.name, len(events), e)
+                result.errors.append(f"{sink.name}: {e}")
+
+        if not result.errors:
+            OutboxEvent.objects.filter(id__in=[e.id for e in events]).update(dispatched_at=timezone.now())
+            result.dispatched = len(events)
+            return result
+
+        error = "; ".join(result.errors)[:2000]
+        for event in events:
+            event.attempts += 1
+            event.last_error = error
+            if event.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                event.failed_at = now
+                result.dead += 1
+            else:
+                event.next_attempt_at = now + OutboxDispatcher._backoff(event.attempts)
+                result.retried += 1
+        OutboxEvent.objects.bulk_update(events, ["attempts", "last_error", "failed_at", "next_attempt_at"])
+        return result
+
+    @staticmethod
+    def retry_failed(*, topic: str | None = None) -> int:
+        """Dead-letter hodisalarni navbatga qaytaradi (sink tuzatilgandan keyin)."""
+        qs = OutboxEvent.objects.filter(failed_at__isnull=False, dispatched_at__isnull=True)
+        if topic:
+            qs = qs.filter(topic=topic)
+        return qs.update(failed_at=None, attempts=0, next_attempt_at=timezone.now())
@@ -0,0 +1,105 @@
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+from outbox.models import OutboxEvent
+
+
+@dataclass
+class OutboxStats:
+    pending: int = 0
+    retrying: int = 0
+    failed: int = 0
+    dispatched_last_hour: int = 0
+    oldest_pending_age: float = 0.0  # sekund (dispatcher lag'i)
+
+    @property
+    def backlogged(self) -> bool:
+        return self.oldest_pending_age >= settings.OUTBOX_LAG_WARNING_SECONDS
+
+
+class Outbox:
+    """
+    Domen hodisalarini yozish. Chaqiruvchining tranzaksiyasi ichida
+    chaqiriladi: holat o'zgarishi rollback bo'lsa — hodisa ham yo'q.
+    """
+
+    @staticmethod
+    def emit(topic: str, *, aggregate_type: str, aggregate_id: int, payload: dict) -> OutboxEvent:
+        return OutboxEvent.objects.create(
+            topic=topic,
+            aggregate_type=aggregate_type,
+            aggregate_id=aggregate_id,
+            payload=payload,
+        )
+
+    @staticmethod
+    def emit_many(topic: str, *, aggregate_type: str, payloads: dict[int, dict]) -> None:
+        """{aggregate_id: payload} — bitta bulk INSERT (bulk status o'zgarishlari)."""
+        OutboxEvent.objects.bulk_create(
+            [
+                OutboxEvent(topic=topic, aggregate_type=aggregate_type, aggregate_id=aggregate_id, payload=payload)
+                for aggregate_id, payload in payloads.items()
+            ]
+        )
+
+    @staticmethod
+    def order_event(topic: str, order, **extra) -> OutboxEvent:
+        return Outbox.emit(
+            topic,
+            aggregate_type="order",
+            aggregate_id=order.id,
+            payload={
+                "order_id": order.id,
+                "user_id": order.user_id,
+                "status": order.status,
+                "paid": order.paid,
+                "total_price": str(order.total_price),
+                **extra,
+            },
+        )
+
+    @staticmethod
+    def stats(now=None) -> OutboxStats:
+        """Backpressure ko'rsatkichlari — bitta aggregate query."""
+        now = now or timezone.now()
+        pending = Q(dispatched_at__isnull=True, failed_at__isnull=True)
+        row = OutboxEvent.objects.aggregate(
+            pending=Count("id", filter=pending),
+            retrying=Count("id", filter=pending & Q(attempts__gt=0)),
+            failed=Count("id", filter=Q(failed_at__isnull=False)),
+            dispatched_last_hour=Count("id", filter=Q(dispatched_at__gte=now - timedelta(hours=1))),
+            oldest=Min("created_at", filter=pending),
+        )
+        return OutboxStats(
+            pending=row["pending"],
+            retrying=row["retrying"],
+            failed=row["failed"],
+            dispatched_last_hour=row["dispatched_last_hour"],
+            oldest_pending_age=(now - row["oldest"]).total_seconds() if row["oldest"] else 0.0,
+        )
+
+    @staticmethod
+    def purge(*, older_than_days: int | None = None, batch_size: int = 1000, now=None) -> int:
+        """Yetkazilgan eski hodisalarni batch'larda o'chiradi (dead-letter'lar qoladi)."""
+        now = now or timezone.now()
+        days = settings.OUTBOX_RETENTION_DAYS if older_than_days is None else older_than_days
+        cutoff = now - timedelta(days=days)
+        total = 0
+
+        while True:
+            ids = list(
+                OutboxEvent.objects
+                .filter(dispatched_at__lt=cutoff)
+                .order_by("id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            deleted, _ = OutboxEvent.objects.filter(id__in=ids).delete()
+            total += deleted
+
+        return total
@@ -0,0 +1,90 @@
+import hashlib
+import hmac
+import json
+import threading
+import urllib.request
+from pathlib import Path
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+
+class Sink:
+    """
+    Outbox sink: `send(messages)` batch'ni yetkazadi yoki exception ko'taradi
+    (butun batch keyinroq qayta yuboriladi — at-least-once).
+    """
+
+    name = "sink"
+
+    def send(self, messages: list[dict]) -> None:
+        raise NotImplementedError
+
+
+class ChannelLayerSink(Sink):
+    """Channel layer group'iga (default "outbox") har bir hodisa — "outbox.event"."""
+
+    name = "channel"
+
+    def __init__(self, group: str = "outbox"):
+        self.group = group
+
+    def send(self, messages: list[dict]) -> None:
+        layer = get_channel_layer()
+        if layer is None:
+            raise RuntimeError("Channel layer is not configured.")
+        for message in messages:
+            async_to_sync(layer.group_send)(self.group, {"type": "outbox.event", "event": message})
+
+
+class WebhookSink(Sink):
+    """
+    HTTP POST {"events": [...]} (JSON). `secret` berilsa — X-Outbox-Signature:
+    body'ning HMAC-SHA256 hex'i. 2xx bo'lmasa — xato.
+    """
+
+    name = "webhook"
+
+    def __init__(self, url: str, secret: str = "", timeout: float = 5.0):
+        self.url = url
+        self.secret = secret
+        self.timeout = timeout
+
+    def send(self, messages: list[dict]) -> None:
+        body = json.dumps({"events": messages}, cls=DjangoJSONEncoder).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if self.secret:
+            headers["X-Outbox-Signature"] = hmac.new(
+                self.secret.encode("utf-8"), body, hashlib.sha256
+            ).hexdigest()
+
+        request = urllib.request.Request(self.url, data=body, headers=headers, method="POST")
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            if not 200 <= response.status < 300:
+                raise RuntimeError(f"Webhook responded with {response.status}")
+
+
+class LogFileSink(Sink):
+    """Har bir hodisa — JSON lines faylga bitta qator (append)."""
+
+    name = "log"
+
+    _lock = threading.Lock()
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+
+    def send(self, messages: list[dict]) -> None:
+        lines = "".join(json.dumps(m, cls=DjangoJSONEncoder) + "\n" for m in messages)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, self.path.open("a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+def load_sinks(config: list[dict] | None = None) -> list[Sink]:
+    """settings.OUTBOX_SINKS: [{"class": "outbox.sinks.LogFileSink", "options": {...}}, ...]"""
+    config = settings.OUTBOX_SINKS if config is None else config
+    return [import_string(item["class"])(**item.get("options", {})) for item in config]
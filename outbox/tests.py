@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from outbox.models import OutboxEvent
+from outbox.services.dispatcher import OutboxDispatcher
+from outbox.services.outbox import Outbox
+from outbox.sinks import Sink
+
+
+class RecordingSink(Sink):
+    name = "recording"
+
+    def __init__(self, *, fail: bool = False):
+        self.fail = fail
+        self.batches: list[list[int]] = []
+
+    def send(self, messages: list[dict]) -> None:
+        self.batches.append([m["id"] for m in messages])
+        if self.fail:
+            raise RuntimeError("sink is down")
+
+
+@override_settings(OUTBOX_MAX_ATTEMPTS=2, OUTBOX_RETRY_BASE_SECONDS=5, OUTBOX_RETRY_MAX_SECONDS=600)
+class OutboxDispatcherTests(TestCase):
+    def _emit(self, aggregate_id: int) -> OutboxEvent:
+        return Outbox.emit(
+            OutboxEvent.TOPIC_ORDER_CREATED, aggregate_type="order", aggregate_id=aggregate_id, payload={}
+        )
+
+    def _make_due(self) -> None:
+        OutboxEvent.objects.update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+
+    def test_batch_is_delivered_in_creation_order(self):
+        events = [self._emit(i) for i in (1, 2, 3)]
+        sink = RecordingSink()
+
+        result = OutboxDispatcher.dispatch_batch([sink])
+        self.assertEqual((result.claimed, result.dispatched), (3, 3))
+        self.assertEqual(sink.batches, [[e.id for e in events]])
+        self.assertFalse(OutboxEvent.objects.filter(dispatched_at__isnull=True).exists())
+        self.assertEqual(OutboxDispatcher.dispatch_batch([sink]).claimed, 0)
+
+    def test_failing_sink_moves_event_to_dead_letter_after_max_attempts(self):
+        event = self._emit(1)
+        healthy, broken = RecordingSink(), RecordingSink(fail=True)
+
+        with self.assertLogs("outbox.services.dispatcher", "WARNING"):
+            result = OutboxDispatcher.dispatch_batch([healthy, broken])
+        self.assertEqual((result.retried, result.dead), (1, 0))
+        event.refresh_from_db()
+        self.assertEqual(event.attempts, 1)
+        self.assertIn("sink is down", event.last_error)
+        self.assertGreater(event.next_attempt_at, timezone.now())
+        # Backoff tugamaguncha qayta olinmaydi
+        self.assertEqual(OutboxDispatcher.dispatch_batch([healthy, broken]).claimed, 0)
+
+        self._make_due()
+        with self.assertLogs("outbox.services.dispatcher", "WARNING"):
+            result = OutboxDispatcher.dispatch_batch([healthy, broken])
+        self.assertEqual((result.retried, result.dead), (0, 1))
+        event.refresh_from_db()
+        self.assertEqual(event.attempts, 2)
+        self.assertIsNotNone(event.failed_at)
+        self.assertIsNone(event.dispatched_at)
+
+        self._make_due()
+        self.assertEqual(OutboxDispatcher.dispatch_batch([healthy]).claimed, 0)
+        self.assertEqual(Outbox.stats().failed, 1)
+
+        self.assertEqual(OutboxDispatcher.retry_failed(), 1)
+        self.assertEqual(OutboxDispatcher.dispatch_batch([healthy]).dispatched, 1)
+        self.assertEqual(healthy.batches, [[event.id]] * 3)
@@ -1,3 +1,88 @@
 from django.contrib import admin
 
-# Register your models here.
+from payments.models import (
+    ClickCallbackLog,
+    PaymentAttempt,
+    PaymentWebhook,
+    PaymeTransaction,
+    ReconciliationMismatch,
+    ReconciliationRun,
+)
+from payments.services.payment_attempts import unpack
+
+
+@admin.register(ClickCallbackLog)
+class ClickCallbackLogAdmin(admin.ModelAdmin):
+    list_display = ("click_trans_id", "action", "order_id", "created_at")
+    list_filter = ("action",)
+    search_fields = ("click_trans_id", "order_id")
+    readonly_fields = ("click_trans_id", "action", "order_id", "fingerprint", "response", "created_at")
+
+
+@admin.register(PaymentWebhook)
+class PaymentWebhookAdmin(admin.ModelAdmin):
+    list_display = ("id", "provider", "kind", "order_id", "shard", "status", "attempts", "next_attempt_at", "created_at")
+    list_filter = ("provider", "kind", "status")
+    search_fields = ("order_id",)
+    readonly_fields = ("created_at", "started_at", "processed_at")
+
+
+@admin.register(PaymeTransaction)
+class PaymeTransactionAdmin(admin.ModelAdmin):
+    list_display = ("payme_id", "order_id", "payment_id", "amount", "state", "reason", "created_at")
+    list_filter = ("state",)
+    search_fields = ("payme_id", "order_id")
+
+    def has_change_permission(self, request, obj=None):
+        return False  # PaymeMerchant orqali
+
+
+@admin.register(PaymentAttempt)
+class PaymentAttemptAdmin(admin.ModelAdmin):
+    list_display = ("id", "payment_id", "order_id", "provider", "stage", "status", "created_at")
+    list_filter = ("provider", "stage", "status")
+    search_fields = ("payment_id", "order_id")
+    exclude = ("request", "response")
+    readonly_fields = (
+        "payment_id", "order_id", "provider", "stage", "status", "request_json", "response_json", "created_at",
+    )
+
+    @admin.display(description="request")
+    def request_json(self, obj):
+        return unpack(obj.request)
+
+    @admin.display(description="response")
+    def response_json(self, obj):
+        return unpack(obj.response)
+
+
+class ReconciliationMismatchInline(admin.TabularInline):
+    model = ReconciliationMismatch
+    extra = 0
+    can_delete = False
+    readonly_fields = (
+        "kind", "provider_ref", "payment_id", "order_id",
+        "statement_amount", "payment_amount", "statement_status", "payment_status",
+    )
+
+
+@admin.register(ReconciliationRun)
+class ReconciliationRunAdmin(admin.ModelAdmin):
+    list_display = (
+        "id", "provider", "window_start", "window_end", "statement_rows",
+        "matched", "missing", "extra", "amount_diff", "status_diff", "finished_at",
+    )
+    list_filter = ("provider",)
+    readonly_fields = (
+        "provider", "source", "window_start", "window_end", "statement_rows",
+        "matched", "missing", "extra", "amount_diff", "status_diff", "started_at", "finished_at",
+    )
+    inlines = [ReconciliationMismatchInline]
+
+
+@admin.register(ReconciliationMismatch)
+class ReconciliationMismatchAdmin(admin.ModelAdmin):
+    list_display = ("id", "run", "kind", "provider_ref", "payment_id", "statement_amount", "payment_amount")
+    list_filter = ("kind", "run__provider")
+    search_fields = ("provider_ref", "order_id")
+    list_select_related = ("run",)
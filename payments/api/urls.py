@@ -1,6 +1,7 @@
 # payments/api/urls.py
 from django.urls import path
 from payments.api import views
+from payments.api.payme_rpc import payme_rpc
 
 urlpatterns = [
     path("cod/<int:order_id>/create/", views.cod_create, name="cod-create"),
@@ -13,4 +14,7 @@ urlpatterns = [
     # CLICK (SHOP API) callbacks
     path("click/prepare/", views.click_prepare, name="click-prepare"),
     path("click/complete/", views.click_complete, name="click-complete"),
+
+    # PAYME (Merchant API) JSON-RPC
+    path("payme/", payme_rpc, name="payme-rpc"),
 ]
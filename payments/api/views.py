@@ -6,28 +6,25 @@ from drf_spectacular.utils import extend_schema, OpenApiTypes
 from django.shortcuts import get_object_or_404
 from django.conf import settings
 
+from idempotency.decorators import IDEMPOTENCY_KEY_PARAMETER, idempotent
 from orders.models import Order
-from payments.services.payment_service import PaymentService
+from payments.services.payment_service import OrderNotPayable, PaymentService
 from payments.api.serializers import PaymentSerializer
+from payments.models import ClickCallbackLog, Payment, PaymentWebhook
+from payments.services.click_callbacks import ClickCallbacks, click_response as _click_response
 from payments.services.click_security import validate_signature
-
-
-def _click_response(*, click_trans_id: str, merchant_trans_id: str, merchant_prepare_id: int | None, error: int, error_note: str):
-    """Standard Click response payload (minimal)."""
-    payload = {
-        "click_trans_id": click_trans_id,
-        "merchant_trans_id": merchant_trans_id,
-        "error": int(error),
-        "error_note": str(error_note),
-    }
-    if merchant_prepare_id is not None:
-        payload["merchant_prepare_id"] = int(merchant_prepare_id)
-    return payload
+from payments.services.webhook_inbox import WebhookInbox
 
 
 @api_view(["POST"])
 @permission_classes([permissions.IsAuthenticated])
-@extend_schema(summary="Create COD payment", request=None, responses={200: PaymentSerializer})
+@extend_schema(
+    summary="Create COD payment",
+    request=None,
+    parameters=[IDEMPOTENCY_KEY_PARAMETER],
+    responses={200: PaymentSerializer},
+)
+@idempotent("payments.cod_create")
 def cod_create(request, order_id: int):
     order = get_object_or_404(Order, pk=order_id)
 
@@ -40,7 +37,13 @@ def cod_create(request, order_id: int):
 
 @api_view(["POST"])
 @permission_classes([permissions.IsAdminUser])  # faqat admin/courier paid qiladi
-@extend_schema(summary="Mark COD order paid", request=None, responses={200: OpenApiTypes.OBJECT})
+@extend_schema(
+    summary="Mark COD order paid",
+    request=None,
+    parameters=[IDEMPOTENCY_KEY_PARAMETER],
+    responses={200: OpenApiTypes.OBJECT},
+)
+@idempotent("payments.cod_mark_paid")
 def cod_mark_paid(request, order_id: int):
     order = get_object_or_404(Order, pk=order_id)
     payment = PaymentService.mark_cod_paid(order=order)
@@ -65,7 +68,10 @@ def mock_pay(request, order_id: int):
     if not request.user.is_staff and order.user_id != request.user.id:
         return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
 
-    payment = PaymentService.mark_mock_paid(order=order, raw_request={"by": str(request.user.id)})
+    try:
+        payment = PaymentService.mark_mock_paid(order=order, raw_request={"by": str(request.user.id)})
+    except OrderNotPayable as e:
+        return Response({"detail": str(e)}, status=status.HTTP_409_CONFLICT)
     return Response(PaymentSerializer(payment).data, status=status.HTTP_200_OK)
 
 
@@ -96,6 +102,21 @@ def mock_fail(request, order_id: int):
 # ==============================
 
 
+def _click_prepare_id(order: Order, *, create: bool = False) -> int | None:
+    """
+    merchant_prepare_id — order'ning Payment id'si (sync va inbox rejimida bir xil):
+    rejim almashganda ham complete o'z prepare'iga mos keladi.
+    """
+    payment_id = Payment.objects.filter(order_id=order.id).values_list("id", flat=True).first()
+    if payment_id is None and create:
+        payment, _ = Payment.objects.get_or_create(
+            order=order,
+            defaults={"method": Payment.METHOD_CLICK, "amount": order.total_price, "status": Payment.STATUS_CREATED},
+        )
+        payment_id = payment.id
+    return payment_id
+
+
 @api_view(["POST"])
 @permission_classes([permissions.AllowAny])
 @extend_schema(summary="Click prepare", request=None, responses={200: OpenApiTypes.OBJECT})
@@ -142,6 +163,11 @@ def click_prepare(request):
             status=status.HTTP_200_OK,
         )
 
+    # Takroriy callback: saqlangan javob (order lookup, lock, yozuv yo'q)
+    replayed = ClickCallbacks.replay(data, action=ClickCallbackLog.ACTION_PREPARE)
+    if replayed is not None:
+        return Response(replayed, status=status.HTTP_200_OK)
+
     # We map merchant_trans_id -> Order.id
     try:
         order_id = int(merchant_trans_id)
@@ -170,6 +196,19 @@ def click_prepare(request):
             status=status.HTTP_200_OK,
         )
 
+    # Muddati o'tib bekor qilingan order (manage.py expire_pending_orders)
+    if order.status == Order.STATUS_CANCELLED:
+        return Response(
+            _click_response(
+                click_trans_id=click_trans_id,
+                merchant_trans_id=merchant_trans_id,
+                merchant_prepare_id=None,
+                error=-9,
+                error_note="Transaction cancelled",
+            ),
+            status=status.HTTP_200_OK,
+        )
+
     # Optional: verify amount matches order.total_price
     try:
         req_amount = float(amount)
@@ -189,23 +228,53 @@ def click_prepare(request):
         # If amount parsing fails, we still proceed but record raw_request.
         pass
 
-    payment = PaymentService.mark_click_prepared(
-        order=order,
-        click_trans_id=click_trans_id,
-        amount=amount,
-        raw_request={"provider": "click", "stage": "prepare", **data},
-    )
-
-    return Response(
-        _click_response(
+    if WebhookInbox.enabled():
+        # Inbox: Payment o'tishini worker bajaradi; bu yerda faqat Payment id o'qiladi va INSERT
+        prepare_id = _click_prepare_id(order, create=True)
+        WebhookInbox.append(
+            provider=PaymentWebhook.PROVIDER_CLICK,
+            kind=PaymentWebhook.KIND_PREPARE,
+            order_id=order.id,
+            payload={"click_trans_id": click_trans_id, "amount": amount, "request": data},
+        )
+        payload = _click_response(
             click_trans_id=click_trans_id,
             merchant_trans_id=merchant_trans_id,
-            merchant_prepare_id=payment.id,
+            merchant_prepare_id=prepare_id,
             error=0,
             error_note="Success",
-        ),
-        status=status.HTTP_200_OK,
+        )
+        ClickCallbacks.store(data, action=ClickCallbackLog.ACTION_PREPARE, order_id=order.id, response=payload)
+        return Response(payload, status=status.HTTP_200_OK)
+
+    try:
+        payment = PaymentService.mark_click_prepared(
+            order=order,
+            click_trans_id=click_trans_id,
+            amount=amount,
+            raw_request={"provider": "click", "stage": "prepare", **data},
+        )
+    except OrderNotPayable:
+        # Tekshiruvdan keyin expiry bekor qilgan (order lock ostida qayta tekshiriladi)
+        payload = _click_response(
+            click_trans_id=click_trans_id,
+            merchant_trans_id=merchant_trans_id,
+            merchant_prepare_id=None,
+            error=-9,
+            error_note="Transaction cancelled",
+        )
+        ClickCallbacks.store(data, action=ClickCallbackLog.ACTION_PREPARE, order_id=order.id, response=payload)
+        return Response(payload, status=status.HTTP_200_OK)
+
+    payload = _click_response(
+        click_trans_id=click_trans_id,
+        merchant_trans_id=merchant_trans_id,
+        merchant_prepare_id=payment.id,
+        error=0,
+        error_note="Success",
     )
+    ClickCallbacks.store(data, action=ClickCallbackLog.ACTION_PREPARE, order_id=order.id, response=payload)
+    return Response(payload, status=status.HTTP_200_OK)
 
 
 @api_view(["POST"])
@@ -251,6 +320,10 @@ def click_complete(request):
             status=status.HTTP_200_OK,
         )
 
+    replayed = ClickCallbacks.replay(data, action=ClickCallbackLog.ACTION_COMPLETE)
+    if replayed is not None:
+        return Response(replayed, status=status.HTTP_200_OK)
+
     try:
         order_id = int(merchant_trans_id)
     except ValueError:
@@ -278,12 +351,59 @@ def click_complete(request):
             status=status.HTTP_200_OK,
         )
 
+    if order.status == Order.STATUS_CANCELLED and not order.paid:
+        return Response(
+            _click_response(
+                click_trans_id=click_trans_id,
+                merchant_trans_id=merchant_trans_id,
+                merchant_prepare_id=None,
+                error=-9,
+                error_note="Transaction cancelled",
+            ),
+            status=status.HTTP_200_OK,
+        )
+
+    if merchant_prepare_id != str(_click_prepare_id(order)):
+        return Response(
+            _click_response(
+                click_trans_id=click_trans_id,
+                merchant_trans_id=merchant_trans_id,
+                merchant_prepare_id=None,
+                error=-6,
+                error_note="Transaction does not exist",
+            ),
+            status=status.HTTP_200_OK,
+        )
+
     # Click sends error codes; 0 = success
     try:
         err_code = int(error)
     except ValueError:
         err_code = -8
 
+    if WebhookInbox.enabled():
+        WebhookInbox.append(
+            provider=PaymentWebhook.PROVIDER_CLICK,
+            kind=PaymentWebhook.KIND_COMPLETE,
+            order_id=order.id,
+            payload={
+                "click_trans_id": click_trans_id,
+                "merchant_prepare_id": merchant_prepare_id,
+                "amount": amount,
+                "error": err_code,
+                "request": data,
+            },
+        )
+        payload = _click_response(
+            click_trans_id=click_trans_id,
+            merchant_trans_id=merchant_trans_id,
+            merchant_prepare_id=int(merchant_prepare_id) if merchant_prepare_id.isdigit() else None,
+            error=err_code,
+            error_note="Success" if err_code == 0 else "Payment failed",
+        )
+        ClickCallbacks.store(data, action=ClickCallbackLog.ACTION_COMPLETE, order_id=order.id, response=payload)
+        return Response(payload, status=status.HTTP_200_OK)
+
     if err_code != 0:
         PaymentService.mark_click_failed(
             order=order,
@@ -291,35 +411,44 @@ def click_complete(request):
             amount=amount,
             raw_request={"provider": "click", "stage": "complete", "error": err_code, **data},
         )
-        return Response(
-            _click_response(
-                click_trans_id=click_trans_id,
-                merchant_trans_id=merchant_trans_id,
-                merchant_prepare_id=int(merchant_prepare_id) if merchant_prepare_id.isdigit() else None,
-                error=err_code,
-                error_note="Payment failed",
-            ),
-            status=status.HTTP_200_OK,
+        payload = _click_response(
+            click_trans_id=click_trans_id,
+            merchant_trans_id=merchant_trans_id,
+            merchant_prepare_id=int(merchant_prepare_id) if merchant_prepare_id.isdigit() else None,
+            error=err_code,
+            error_note="Payment failed",
         )
+        ClickCallbacks.store(data, action=ClickCallbackLog.ACTION_COMPLETE, order_id=order.id, response=payload)
+        return Response(payload, status=status.HTTP_200_OK)
 
-    payment = PaymentService.mark_click_completed(
-        order=order,
-        click_trans_id=click_trans_id,
-        merchant_prepare_id=merchant_prepare_id,
-        amount=amount,
-        raw_request={"provider": "click", "stage": "complete", **data},
-    )
-
-    return Response(
-        _click_response(
+    try:
+        payment = PaymentService.mark_click_completed(
+            order=order,
+            click_trans_id=click_trans_id,
+            merchant_prepare_id=merchant_prepare_id,
+            amount=amount,
+            raw_request={"provider": "click", "stage": "complete", **data},
+        )
+    except OrderNotPayable:
+        payload = _click_response(
             click_trans_id=click_trans_id,
             merchant_trans_id=merchant_trans_id,
-            merchant_prepare_id=payment.id,
-            error=0,
-            error_note="Success",
-        ),
-        status=status.HTTP_200_OK,
+            merchant_prepare_id=None,
+            error=-9,
+            error_note="Transaction cancelled",
+        )
+        ClickCallbacks.store(data, action=ClickCallbackLog.ACTION_COMPLETE, order_id=order.id, response=payload)
+        return Response(payload, status=status.HTTP_200_OK)
+
+    payload = _click_response(
+        click_trans_id=click_trans_id,
+        merchant_trans_id=merchant_trans_id,
+        merchant_prepare_id=payment.id,
+        error=0,
+        error_note="Success",
     )
+    ClickCallbacks.store(data, action=ClickCallbackLog.ACTION_COMPLETE, order_id=order.id, response=payload)
+    return Response(payload, status=status.HTTP_200_OK)
 
 
 
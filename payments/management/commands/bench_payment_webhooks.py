@@ -0,0 +1,155 @@
+import threading
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory
+
+from catalog.management.bench import cleanup_bench, create_bench_users, percentile_ms
+from orders.models import Order
+from payments.api.views import click_complete, click_prepare
+from payments.models import ClickCallbackLog, Payment, PaymentAttempt, PaymentWebhook
+from payments.services.webhook_inbox import WebhookInbox
+from payments.simulators.click import (
+    ACTION_COMPLETE,
+    ACTION_PREPARE,
+    COMPLETE_PATH,
+    PREPARE_PATH,
+    ClickSimulator,
+    ClickTransaction,
+)
+
+
+BENCH_PREFIX = "bench-webhook"
+AMOUNT = "1000.00"
+
+
+class Command(BaseCommand):
+    help = (
+        "Click callback yuklama testi: N ta order uchun prepare + complete "
+        "callback'lari parallel yuboriladi (view'lar to'g'ridan-to'g'ri, HTTP "
+        "server'siz). --mode sync: Payment/Order callback ichida; inbox: faqat "
+        "PaymentWebhook INSERT, keyin worker bilan drain. Callback p50/p95/p99, "
+        "throughput va worker throughput chiqariladi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orders", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=16, help="Parallel callback yuboruvchilar")
+        parser.add_argument("--mode", choices=["sync", "inbox", "both"], default="both")
+        parser.add_argument("--keep", action="store_true", help="Bench ma'lumotlarini o'chirmaslik")
+
+    def handle(self, *args, **opts):
+        modes = ["sync", "inbox"] if opts["mode"] == "both" else [opts["mode"]]
+        self.stdout.write(f"backend: {connection.vendor}, signature: {settings.CLICK_REQUIRE_SIGNATURE}")
+
+        for mode in modes:
+            self._cleanup()
+            users = create_bench_users(BENCH_PREFIX, opts["orders"])
+            orders = Order.objects.bulk_create(
+                [
+                    Order(user=user, phone="+998900000000", address="bench", total_price=Decimal(AMOUNT))
+                    for user in users
+                ]
+            )
+            with override_settings(PAYMENT_WEBHOOK_INBOX=(mode == "inbox")):
+                self._run(mode, [o.id for o in orders], opts["concurrency"])
+
+        if not opts["keep"]:
+            self._cleanup()
+        self.stdout.write(self.style.SUCCESS("Done"))
+
+    def _cleanup(self):
+        order_ids = list(
+            Order.objects.filter(user__username__startswith=f"{BENCH_PREFIX}-").values_list("id", flat=True)
+        )
+        PaymentWebhook.objects.filter(order_id__in=order_ids).delete()
+        ClickCallbackLog.objects.filter(order_id__in=order_ids).delete()
+        PaymentAttempt.objects.filter(order_id__in=order_ids).delete()
+        cleanup_bench(BENCH_PREFIX)
+
+    def _run(self, mode: str, order_ids: list[int], concurrency: int):
+        factory = APIRequestFactory()
+        sim = ClickSimulator()
+        latencies: list[float] = []
+        errors: dict[int, int] = {}
+        lock = threading.Lock()
+        barrier = threading.Barrier(concurrency)
+
+        def call(view, path, data):
+            t0 = time.perf_counter()
+            response = view(factory.post(path, data, format="json"))
+            elapsed = time.perf_counter() - t0
+            with lock:
+                latencies.append(elapsed)
+                if response.data["error"] != 0:
+                    errors[response.data["error"]] = errors.get(response.data["error"], 0) + 1
+            return response.data
+
+        def worker(chunk):
+            try:
+                barrier.wait()
+                for order_id in chunk:
+                    txn = ClickTransaction(click_trans_id=f"{BENCH_PREFIX}-{order_id}", order_id=order_id, amount=AMOUNT)
+                    prepared = call(click_prepare, PREPARE_PATH, sim.payload(txn, action=ACTION_PREPARE))
+                    if prepared["error"] != 0:
+                        continue
+                    call(
+                        click_complete,
+                        COMPLETE_PATH,
+                        sim.payload(txn, action=ACTION_COMPLETE, merchant_prepare_id=prepared["merchant_prepare_id"]),
+                    )
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(order_ids[i::concurrency],)) for i in range(concurrency)]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        self.stdout.write(f"[{mode}] orders: {len(order_ids)}, callbacks: {len(latencies)}, errors: {errors or 0}")
+        self.stdout.write(f"[{mode}] elapsed: {elapsed:.3f}s, throughput: {len(latencies) / elapsed:.1f} callbacks/s")
+        self.stdout.write(
+            f"[{mode}] callback latency ms p50={percentile_ms(latencies, 0.50):.1f} "
+            f"p95={percentile_ms(latencies, 0.95):.1f} p99={percentile_ms(latencies, 0.99):.1f}"
+        )
+
+        if mode == "inbox":
+            self._drain()
+
+        paid = Order.objects.filter(id__in=order_ids, paid=True).count()
+        payments = Payment.objects.filter(order_id__in=order_ids, status=Payment.STATUS_PAID).count()
+        style = self.style.SUCCESS if paid == payments == len(order_ids) else self.style.ERROR
+        self.stdout.write(style(f"[{mode}] paid orders: {paid}, paid payments: {payments}"))
+
+    def _drain(self):
+        processed = [0]
+        lock = threading.Lock()
+
+        def run(shard):
+            try:
+                while (webhook := WebhookInbox.claim_next(shard)) is not None:
+                    WebhookInbox.process(webhook)
+                    with lock:
+                        processed[0] += 1
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=run, args=(shard,)) for shard in range(WebhookInbox.shards())]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"[inbox] worker: {processed[0]} callbacks in {elapsed:.3f}s "
+            f"({processed[0] / elapsed if elapsed else 0:.1f}/s, shards={WebhookInbox.shards()})"
+        )
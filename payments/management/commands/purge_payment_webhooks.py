@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from payments.services.webhook_inbox import WebhookInbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Bajarilgan eski PaymentWebhook'larni batch'larda o'chiradi. "
+        "--retry-failed: failed callback'larni navbatga qaytaradi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-days", type=int, default=None, help="Default: settings.PAYMENT_WEBHOOK_RETENTION_DAYS"
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--retry-failed", action="store_true")
+
+    def handle(self, *args, **opts):
+        if opts["retry_failed"]:
+            requeued = WebhookInbox.retry_failed()
+            self.stdout.write(f"Requeued {requeued} failed payment webhooks")
+
+        total = WebhookInbox.purge(older_than_days=opts["older_than_days"], batch_size=opts["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Purged {total} payment webhooks"))
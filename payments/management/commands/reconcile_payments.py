@@ -0,0 +1,68 @@
+import sys
+import time
+from datetime import date, datetime, time as dt_time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from payments.models import Payment
+from payments.services.reconciliation import FORMATS, PARSERS, PaymentReconciliation, StatementError
+
+
+class Command(BaseCommand):
+    help = (
+        "Provayder statement'ini (Click CSV / Payme GetStatement JSON) Payment "
+        "jadvali bilan solishtiradi: missing, extra, amount_diff, status_diff "
+        "ReconciliationRun/ReconciliationMismatch'ga yoziladi. Default oyna — kecha."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("statement", help="Statement fayli ('-' — stdin)")
+        parser.add_argument("--provider", choices=sorted(PARSERS), required=True)
+        parser.add_argument("--format", dest="fmt", choices=FORMATS, default=None, help="Default: fayl kengaytmasidan")
+        parser.add_argument("--from", dest="date_from", type=date.fromisoformat, default=None, help="YYYY-MM-DD (shu kun ham)")
+        parser.add_argument("--to", dest="date_to", type=date.fromisoformat, default=None, help="YYYY-MM-DD (shu kun ham)")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **opts):
+        yesterday = timezone.localdate() - timedelta(days=1)
+        date_from = opts["date_from"] or yesterday
+        date_to = opts["date_to"] or date_from
+        if date_from > date_to:
+            raise CommandError("--from must be <= --to")
+
+        window_start = timezone.make_aware(datetime.combine(date_from, dt_time.min))
+        window_end = timezone.make_aware(datetime.combine(date_to + timedelta(days=1), dt_time.min))
+
+        path = opts["statement"]
+        try:
+            fmt = opts["fmt"] or PaymentReconciliation.detect_format(path)
+        except StatementError as e:
+            raise CommandError(f"{e}; use --format")
+
+        started = time.perf_counter()
+        stream = sys.stdin if path == "-" else open(path, encoding="utf-8-sig", newline="")
+        try:
+            result = PaymentReconciliation.reconcile(
+                stream,
+                provider=opts["provider"],
+                fmt=fmt,
+                window_start=window_start,
+                window_end=window_end,
+                source=path,
+                batch_size=opts["batch_size"],
+            )
+        except StatementError as e:
+            raise CommandError(str(e))
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        counts = result.counts
+        self.stdout.write(
+            f"run #{result.run.id} {dict(Payment.METHOD_CHOICES)[opts['provider']]} {date_from}..{date_to}: "
+            + ", ".join(f"{k}={v}" for k, v in counts.items())
+        )
+        mismatches = counts["missing"] + counts["extra"] + counts["amount_diff"] + counts["status_diff"]
+        style = self.style.SUCCESS if not mismatches else self.style.WARNING
+        self.stdout.write(style(f"Done in {time.perf_counter() - started:.2f}s, mismatches: {mismatches}"))
@@ -0,0 +1,97 @@
+import threading
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from payments.models import PaymentWebhook
+from payments.services.webhook_inbox import WebhookInbox
+
+
+class Command(BaseCommand):
+    help = (
+        "To'lov callback inbox worker'i (PAYMENT_WEBHOOK_INBOX): har bir shard "
+        "uchun bitta thread; bitta order'ning callback'lari kelgan tartibda "
+        "bajariladi, xato bo'lsa backoff bilan qayta urinadi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--shards",
+            type=str,
+            default="",
+            help="Vergul bilan shard raqamlari (default: barchasi, settings.PAYMENT_WEBHOOK_SHARDS)",
+        )
+        parser.add_argument("--poll-interval", type=float, default=0.2, help="Navbat bo'sh bo'lsa kutish (s)")
+        parser.add_argument("--stale-after", type=int, default=60, help="'processing'da qolgan callback'ni qaytarish (s)")
+        parser.add_argument("--once", action="store_true", help="Vaqti kelgan callback'larni bajarib chiqib ketish")
+
+    def handle(self, *args, **opts):
+        if opts["shards"]:
+            shards = sorted({int(s) for s in opts["shards"].split(",") if s.strip()})
+        else:
+            shards = list(range(WebhookInbox.shards()))
+
+        stale_after = timedelta(seconds=opts["stale_after"])
+
+        def requeue(shard):
+            requeued = WebhookInbox.requeue_stale(shard, stale_after)
+            if requeued:
+                self.stdout.write(f"shard {shard}: requeued {requeued} stale callback(s)")
+
+        stop = threading.Event()
+        counts = {shard: {"done": 0, "retry": 0, "failed": 0, "needs_refund": 0} for shard in shards}
+
+        def run(shard):
+            next_requeue = 0.0
+            try:
+                while not stop.is_set():
+                    try:
+                        if time.monotonic() >= next_requeue:
+                            requeue(shard)
+                            next_requeue = time.monotonic() + stale_after.total_seconds() / 2
+                        webhook = WebhookInbox.claim_next(shard)
+                        if webhook is None:
+                            if opts["once"]:
+                                return
+                            stop.wait(opts["poll_interval"])
+                            continue
+                        result = WebhookInbox.process(webhook)
+                        if result.status == PaymentWebhook.STATUS_QUEUED:
+                            counts[shard]["retry"] += 1
+                        else:
+                            counts[shard][result.status] += 1
+                    except Exception as e:
+                        # Callback 'processing'da qoladi; --stale-after'dan keyin requeue() qaytaradi
+                        self.stderr.write(f"shard {shard}: {e!r}")
+                        connection.close()
+                        stop.wait(opts["poll_interval"])
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=run, args=(shard,), daemon=True) for shard in shards]
+        self.stdout.write(f"Payment webhook worker: shards={shards}")
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+
+        try:
+            for t in threads:
+                while t.is_alive():
+                    t.join(timeout=1)
+        except KeyboardInterrupt:
+            stop.set()
+            for t in threads:
+                t.join()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Done in {time.perf_counter() - started:.2f}s: "
+                + ", ".join(
+                    f"shard {s} done={c['done']} retry={c['retry']} failed={c['failed']} "
+                    f"needs_refund={c['needs_refund']}"
+                    for s, c in counts.items()
+                )
+            )
+        )
@@ -0,0 +1,195 @@
+import random
+import threading
+import time
+import urllib.error
+from collections import Counter, defaultdict
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog.management.bench import cleanup_bench, create_bench_users, percentile_ms
+from orders.models import Order
+from payments.models import ClickCallbackLog, Payment, PaymentAttempt, PaymentWebhook
+from payments.simulators.click import (
+    ACTION_COMPLETE,
+    ACTION_PREPARE,
+    COMPLETE_PATH,
+    PREPARE_PATH,
+    ClickSimulator,
+)
+from payments.simulators.payme import PaymeSimulator
+
+
+BENCH_PREFIX = "bench-simulate"
+AMOUNT = Decimal("1000.00")
+
+
+class Command(BaseCommand):
+    help = (
+        "Click/Payme simulyatorlari bilan lokal server'ga yuklama: imzolangan "
+        "Click callback'lari va Payme JSON-RPC chaqiruvlari parallel yuboriladi. "
+        "--duplicates: har bir so'rov darhol qayta yuboriladi; --replay: oxirida "
+        "barcha so'rovlar aralash tartibda qayta yuboriladi (provayder retry'i). "
+        "Throughput, p50/p95/p99 va xato kodlari taqsimoti chiqariladi. "
+        "Server shu DB bilan ishlashi kerak (order'lar shu yerda yaratiladi)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000", help="Lokal server manzili")
+        parser.add_argument("--provider", choices=["click", "payme", "both"], default="both")
+        parser.add_argument("--orders", type=int, default=100, help="Har bir provayder uchun order'lar soni")
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument("--duplicates", type=int, default=0, help="Har bir so'rovning qo'shimcha nusxalari")
+        parser.add_argument("--replay", action="store_true", help="Oxirida barcha so'rovlarni qayta yuborish")
+        parser.add_argument("--seed", type=int, default=None, help="--replay tartibi uchun")
+        parser.add_argument("--keep", action="store_true", help="Bench ma'lumotlarini o'chirmaslik")
+
+    def handle(self, *args, **opts):
+        providers = ["click", "payme"] if opts["provider"] == "both" else [opts["provider"]]
+        if opts["concurrency"] < 1 or opts["duplicates"] < 0:
+            raise CommandError("--concurrency must be >= 1 and --duplicates >= 0")
+
+        self._cleanup()
+        users = create_bench_users(BENCH_PREFIX, opts["orders"] * len(providers))
+        orders = Order.objects.bulk_create(
+            [Order(user=user, phone="+998900000000", address="bench", total_price=AMOUNT) for user in users]
+        )
+        plan = {
+            provider: [o.id for o in orders[i * opts["orders"]:(i + 1) * opts["orders"]]]
+            for i, provider in enumerate(providers)
+        }
+
+        self.latencies = defaultdict(list)
+        self.codes = Counter()
+        self.lock = threading.Lock()
+        self.sent: list = []
+
+        click = ClickSimulator(base_url=opts["base_url"])
+        payme = PaymeSimulator(base_url=opts["base_url"])
+        flows = [(self._click_flow, click, order_id) for order_id in plan.get("click", [])]
+        flows += [(self._payme_flow, payme, order_id) for order_id in plan.get("payme", [])]
+        random.Random(opts["seed"]).shuffle(flows)
+
+        sizes = {provider: len(order_ids) for provider, order_ids in plan.items()}
+        self.stdout.write(
+            f"target: {opts['base_url']}, orders: {sizes}, "
+            f"concurrency: {opts['concurrency']}, duplicates: {opts['duplicates']}, replay: {opts['replay']}"
+        )
+        elapsed = self._run(
+            [lambda flow=flow, sim=sim, order_id=order_id: flow(sim, order_id, opts["duplicates"])
+             for flow, sim, order_id in flows],
+            opts["concurrency"],
+        )
+        self._report("flow", elapsed)
+
+        if opts["replay"]:
+            replays = list(self.sent)
+            random.Random(opts["seed"]).shuffle(replays)
+            self.latencies.clear()
+            self.codes.clear()
+            elapsed = self._run([lambda r=r: self._send(*r, record=False) for r in replays], opts["concurrency"])
+            self._report("replay", elapsed)
+
+        for provider, order_ids in plan.items():
+            paid = Order.objects.filter(id__in=order_ids, paid=True).count()
+            payments = Payment.objects.filter(order_id__in=order_ids, status=Payment.STATUS_PAID).count()
+            style = self.style.SUCCESS if paid == payments == len(order_ids) else self.style.ERROR
+            self.stdout.write(style(f"{provider}: paid orders {paid}/{len(order_ids)}, paid payments {payments}"))
+
+        if not opts["keep"]:
+            self._cleanup()
+        self.stdout.write(self.style.SUCCESS("Done"))
+
+    def _cleanup(self):
+        order_ids = list(
+            Order.objects.filter(user__username__startswith=f"{BENCH_PREFIX}-").values_list("id", flat=True)
+        )
+        PaymentWebhook.objects.filter(order_id__in=order_ids).delete()
+        ClickCallbackLog.objects.filter(order_id__in=order_ids).delete()
+        PaymentAttempt.objects.filter(order_id__in=order_ids).delete()
+        cleanup_bench(BENCH_PREFIX)
+
+    # ---- oqimlar ----
+
+    def _send(self, name: str, request, *, record: bool = True) -> dict | None:
+        """Bitta so'rov: latency va xato kodi (Click: error, Payme: error.code, 0 — muvaffaqiyat)."""
+        t0 = time.perf_counter()
+        response = None
+        try:
+            response = request()
+            if name.startswith("click."):
+                code = response["error"]
+            else:
+                code = (response.get("error") or {}).get("code", 0)
+        except urllib.error.HTTPError as e:
+            code = f"http_{e.code}"
+        except Exception as e:  # yuklama: xatolarni sanaymiz
+            code = type(e).__name__
+        elapsed = time.perf_counter() - t0
+
+        with self.lock:
+            self.latencies[name].append(elapsed)
+            self.codes[(name, code)] += 1
+            if record:
+                self.sent.append((name, request))
+        return response
+
+    def _repeat(self, name: str, request, duplicates: int) -> dict | None:
+        response = self._send(name, request)
+        for _ in range(duplicates):
+            self._send(name, request, record=False)
+        return response
+
+    def _click_flow(self, sim: ClickSimulator, order_id: int, duplicates: int):
+        txn = sim.new_transaction(order_id=order_id, amount=AMOUNT)
+        prepare = sim.payload(txn, action=ACTION_PREPARE)
+        prepared = self._repeat("click.prepare", lambda: sim.send(PREPARE_PATH, prepare), duplicates)
+        if not prepared or prepared["error"] != 0:
+            return
+        complete = sim.payload(txn, action=ACTION_COMPLETE, merchant_prepare_id=prepared["merchant_prepare_id"])
+        self._repeat("click.complete", lambda: sim.send(COMPLETE_PATH, complete), duplicates)
+
+    def _payme_flow(self, sim: PaymeSimulator, order_id: int, duplicates: int):
+        txn = sim.new_transaction(order_id=order_id, amount=AMOUNT)
+        checked = self._repeat("payme.CheckPerformTransaction", lambda: sim.check_perform(txn), duplicates)
+        if not checked or "error" in checked:
+            return
+        created = self._repeat("payme.CreateTransaction", lambda: sim.create(txn), duplicates)
+        if not created or "error" in created:
+            return
+        self._repeat("payme.PerformTransaction", lambda: sim.perform(txn), duplicates)
+
+    # ---- ishga tushirish va hisobot ----
+
+    def _run(self, tasks: list, concurrency: int) -> float:
+        queue = list(reversed(tasks))
+        queue_lock = threading.Lock()
+
+        def worker():
+            while True:
+                with queue_lock:
+                    if not queue:
+                        return
+                    task = queue.pop()
+                task()
+
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return time.perf_counter() - started
+
+    def _report(self, phase: str, elapsed: float):
+        total = sum(len(v) for v in self.latencies.values())
+        self.stdout.write(f"[{phase}] requests: {total}, elapsed: {elapsed:.3f}s, throughput: {total / elapsed:.1f} req/s")
+        for name in sorted(self.latencies):
+            latencies = sorted(self.latencies[name])
+            codes = ", ".join(
+                f"{code}={count}" for (n, code), count in sorted(self.codes.items(), key=lambda kv: str(kv[0])) if n == name
+            )
+            self.stdout.write(
+                f"[{phase}] {name}: n={len(latencies)} ms p50={percentile_ms(latencies, 0.50):.1f} "
+                f"p95={percentile_ms(latencies, 0.95):.1f} p99={percentile_ms(latencies, 0.99):.1f} codes: {codes}"
+            )
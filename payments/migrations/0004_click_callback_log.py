@@ -0,0 +1,28 @@
+# Generated by Django 6.0.2 on 2026-10-19 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0003_alter_payment_method'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClickCallbackLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('click_trans_id', models.CharField(max_length=64)),
+                ('action', models.PositiveSmallIntegerField(choices=[(0, 'Prepare'), (1, 'Complete')])),
+                ('order_id', models.BigIntegerField()),
+                ('fingerprint', models.CharField(max_length=64)),
+                ('response', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('click_trans_id', 'action'), name='unique_click_callback')],
+            },
+        ),
+    ]
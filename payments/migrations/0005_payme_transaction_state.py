@@ -0,0 +1,38 @@
+# Generated by Django 6.0.2 on 2026-10-19 10:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0011_user_order_stats'),
+        ('payments', '0004_click_callback_log'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='cancel_reason',
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='cancelled_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='provider_state',
+            field=models.SmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='provider_time',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['method', 'created_at'], name='payment_method_created_idx'),
+        ),
+    ]
@@ -0,0 +1,106 @@
+# Generated by Django 6.0.2 on 2026-10-19 16:05
+
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import migrations, models, transaction
+
+
+BATCH_SIZE = 1000
+
+
+def _pack(data):
+    if data is None:
+        return None
+    raw = json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(",", ":"))
+    return zlib.compress(raw.encode("utf-8"))
+
+
+def _unpack(blob):
+    if blob is None:
+        return None
+    return json.loads(zlib.decompress(bytes(blob)).decode("utf-8"))
+
+
+def backfill_attempts(apps, schema_editor):
+    """
+    Payment.raw_request/raw_response -> PaymentAttempt (stage="legacy").
+    Har bir batch alohida tranzaksiya; qayta ishga tushirilsa oxirgi
+    ko'chirilgan payment'dan davom etadi.
+    """
+    Payment = apps.get_model("payments", "Payment")
+    PaymentAttempt = apps.get_model("payments", "PaymentAttempt")
+
+    last_id = (
+        PaymentAttempt.objects.filter(stage="legacy").order_by("-payment_id").values_list("payment_id", flat=True).first()
+        or 0
+    )
+    while True:
+        rows = list(
+            Payment.objects
+            .filter(id__gt=last_id)
+            .filter(models.Q(raw_request__isnull=False) | models.Q(raw_response__isnull=False))
+            .order_by("id")
+            .values_list("id", "order_id", "method", "status", "raw_request", "raw_response")[:BATCH_SIZE]
+        )
+        if not rows:
+            break
+        with transaction.atomic():
+            PaymentAttempt.objects.bulk_create(
+                [
+                    PaymentAttempt(
+                        payment_id=payment_id,
+                        order_id=order_id,
+                        provider=method,
+                        stage="legacy",
+                        status=status,
+                        request=_pack(raw_request),
+                        response=_pack(raw_response),
+                    )
+                    for payment_id, order_id, method, status, raw_request, raw_response in rows
+                ]
+            )
+        last_id = rows[-1][0]
+
+
+def restore_payloads(apps, schema_editor):
+    Payment = apps.get_model("payments", "Payment")
+    PaymentAttempt = apps.get_model("payments", "PaymentAttempt")
+
+    for payment_id, request, response in (
+        PaymentAttempt.objects.filter(stage="legacy").values_list("payment_id", "request", "response").iterator(
+            chunk_size=BATCH_SIZE
+        )
+    ):
+        Payment.objects.filter(pk=payment_id).update(raw_request=_unpack(request), raw_response=_unpack(response))
+
+
+class Migration(migrations.Migration):
+    # Katta jadvalda backfill batch'lari alohida commit qilinadi
+    atomic = False
+
+    dependencies = [
+        ('payments', '0006_payment_webhook_inbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentAttempt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('payment_id', models.BigIntegerField()),
+                ('order_id', models.BigIntegerField(db_index=True)),
+                ('provider', models.CharField(max_length=20)),
+                ('stage', models.CharField(max_length=20)),
+                ('status', models.CharField(max_length=20)),
+                ('request', models.BinaryField(blank=True, null=True)),
+                ('response', models.BinaryField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['payment_id', 'id'], name='payment_attempt_payment_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_attempts, restore_payloads),
+    ]
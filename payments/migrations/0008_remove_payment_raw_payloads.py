@@ -0,0 +1,21 @@
+# Generated by Django 6.0.2 on 2026-10-19 16:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0007_payment_attempt'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='payment',
+            name='raw_request',
+        ),
+        migrations.RemoveField(
+            model_name='payment',
+            name='raw_response',
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 6.0.2 on 2026-10-19 17:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0008_remove_payment_raw_payloads'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReconciliationRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider', models.CharField(choices=[('cod', 'Cash on delivery'), ('mock', 'Mock (dev/test)'), ('stripe', 'Stripe'), ('payme', 'Payme (Paycom)'), ('click', 'Click')], max_length=20)),
+                ('source', models.CharField(max_length=255)),
+                ('window_start', models.DateTimeField()),
+                ('window_end', models.DateTimeField()),
+                ('statement_rows', models.PositiveIntegerField(default=0)),
+                ('matched', models.PositiveIntegerField(default=0)),
+                ('missing', models.PositiveIntegerField(default=0)),
+                ('extra', models.PositiveIntegerField(default=0)),
+                ('amount_diff', models.PositiveIntegerField(default=0)),
+                ('status_diff', models.PositiveIntegerField(default=0)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReconciliationMismatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('missing', 'Missing in payments'), ('extra', 'Missing in statement'), ('amount_diff', 'Amount differs'), ('status_diff', 'Status differs')], max_length=20)),
+                ('provider_ref', models.CharField(max_length=128)),
+                ('payment_id', models.BigIntegerField(blank=True, null=True)),
+                ('order_id', models.BigIntegerField(blank=True, null=True)),
+                ('statement_amount', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('payment_amount', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('statement_status', models.CharField(blank=True, default='', max_length=20)),
+                ('payment_status', models.CharField(blank=True, default='', max_length=20)),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mismatches', to='payments.reconciliationrun')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['run', 'kind'], name='recon_mismatch_run_kind_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-20 10:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0009_payment_reconciliation'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='paymentwebhook',
+            name='status',
+            field=models.CharField(choices=[('queued', 'Queued'), ('processing', 'Processing'), ('done', 'Done'), ('failed', 'Failed'), ('needs_refund', 'Needs refund')], default='queued', max_length=20),
+        ),
+    ]
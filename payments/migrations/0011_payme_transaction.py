@@ -0,0 +1,104 @@
+# Generated by Django 6.0.2 on 2026-10-20 09:15
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+BATCH_SIZE = 1000
+
+
+def copy_transactions(apps, schema_editor):
+    """Payment'dagi Payme holat ustunlari -> PaymeTransaction (har bir payment — bitta tranzaksiya)."""
+    Payment = apps.get_model("payments", "Payment")
+    PaymeTransaction = apps.get_model("payments", "PaymeTransaction")
+
+    batch = []
+    rows = (
+        Payment.objects
+        .filter(method="payme", provider_state__isnull=False)
+        .exclude(provider_ref="")
+        .values_list(
+            "id", "order_id", "provider_ref", "amount", "provider_state", "provider_time",
+            "cancel_reason", "created_at", "paid_at", "cancelled_at",
+        )
+        .iterator(chunk_size=BATCH_SIZE)
+    )
+    for payment_id, order_id, ref, amount, state, payme_time, reason, created_at, paid_at, cancelled_at in rows:
+        batch.append(
+            PaymeTransaction(
+                payme_id=ref,
+                payment_id=payment_id,
+                order_id=order_id,
+                amount=amount,
+                state=state,
+                payme_time=payme_time or 0,
+                reason=reason,
+                created_at=created_at,
+                performed_at=paid_at if state == 2 else None,
+                cancelled_at=cancelled_at,
+            )
+        )
+        if len(batch) >= BATCH_SIZE:
+            PaymeTransaction.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    PaymeTransaction.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def restore_transactions(apps, schema_editor):
+    """Orqaga: Payment'ning joriy (provider_ref) tranzaksiyasi ustunlarga qaytadi."""
+    Payment = apps.get_model("payments", "Payment")
+    PaymeTransaction = apps.get_model("payments", "PaymeTransaction")
+
+    for txn in PaymeTransaction.objects.iterator(chunk_size=BATCH_SIZE):
+        Payment.objects.filter(pk=txn.payment_id, provider_ref=txn.payme_id).update(
+            provider_state=txn.state,
+            provider_time=txn.payme_time,
+            cancel_reason=txn.reason,
+            cancelled_at=txn.cancelled_at,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0010_payment_webhook_needs_refund'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymeTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('payme_id', models.CharField(max_length=128, unique=True)),
+                ('payment_id', models.BigIntegerField()),
+                ('order_id', models.BigIntegerField(db_index=True)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('state', models.SmallIntegerField(default=1)),
+                ('payme_time', models.BigIntegerField()),
+                ('reason', models.SmallIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('performed_at', models.DateTimeField(blank=True, null=True)),
+                ('cancelled_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['created_at', 'id'], name='payme_txn_created_idx')],
+            },
+        ),
+        migrations.RunPython(copy_transactions, restore_transactions),
+        migrations.RemoveField(
+            model_name='payment',
+            name='cancel_reason',
+        ),
+        migrations.RemoveField(
+            model_name='payment',
+            name='cancelled_at',
+        ),
+        migrations.RemoveField(
+            model_name='payment',
+            name='provider_state',
+        ),
+        migrations.RemoveField(
+            model_name='payment',
+            name='provider_time',
+        ),
+    ]
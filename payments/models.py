@@ -55,13 +55,19 @@ class Payment(models.Model):
     # online providerlar uchun keyin kerak bo‘ladi:
     provider_ref = models.CharField(max_length=128, blank=True, default="", db_index=True)
 
-    # debug/audit (ixtiyoriy)
-    raw_request = models.JSONField(blank=True, null=True)
-    raw_response = models.JSONField(blank=True, null=True)
+    # Payme tranzaksiyalari (holat, vaqt, bekor qilish) — PaymeTransaction'da
+
+    # Provayder so'rov/javoblari bu yerda emas — PaymentAttempt'da (append-only)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Reconciliation oynasi: method + vaqt oralig'i bo'yicha o'qish
+            models.Index(fields=["method", "created_at"], name="payment_method_created_idx"),
+        ]
+
     def mark_paid(self):
         if self.status == self.STATUS_PAID:
             return
@@ -80,3 +86,225 @@ class Payment(models.Model):
             return
         self.status = self.STATUS_CANCELLED
         self.save(update_fields=["status", "updated_at"])
+
+
+class PaymeTransaction(models.Model):
+    """
+    Payme tranzaksiyasi: har bir Payme id — alohida qator. Order'ning Payment
+    qatori (OneToOne) oxirgi tranzaksiyani aks ettiradi (provider_ref), bekor
+    qilingan oldingilari CheckTransaction/GetStatement uchun shu yerda qoladi.
+    payment_id/order_id FK emas (PaymentAttempt kabi): arxivlashdan keyin ham
+    statement to'liq.
+    """
+    STATE_CREATED = 1
+    STATE_PERFORMED = 2
+    STATE_CANCELLED = -1
+    STATE_CANCELLED_AFTER_PERFORM = -2
+
+    # Payme bekor qilish sababi: 4 — tranzaksiya muddati o'tdi
+    REASON_TIMEOUT = 4
+
+    payme_id = models.CharField(max_length=128, unique=True)
+    payment_id = models.BigIntegerField()
+    order_id = models.BigIntegerField(db_index=True)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+
+    state = models.SmallIntegerField(default=STATE_CREATED)
+    # Payme `time` (ms)
+    payme_time = models.BigIntegerField()
+    reason = models.SmallIntegerField(blank=True, null=True)
+
+    # create_time / perform_time / cancel_time
+    created_at = models.DateTimeField(default=timezone.now)
+    performed_at = models.DateTimeField(blank=True, null=True)
+    cancelled_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            # GetStatement: vaqt oralig'i (create_time tartibida)
+            models.Index(fields=["created_at", "id"], name="payme_txn_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"payme:{self.payme_id} order={self.order_id} state={self.state}"
+
+
+class PaymentAttempt(models.Model):
+    """
+    Provayder bilan har bir o'zaro aloqa (callback, mock to'lov, Payme
+    metodi) — append-only audit. So'rov/javob zlib bilan siqilgan JSON
+    (PaymentAttempts.pack/unpack): Payment qatori faqat holat ustunlaridan
+    iborat bo'lib qoladi. payment_id/order_id FK emas: order arxivlanganda
+    ham audit qoladi.
+    """
+    STAGE_LEGACY = "legacy"
+
+    payment_id = models.BigIntegerField()
+    order_id = models.BigIntegerField(db_index=True)
+    provider = models.CharField(max_length=20)
+    stage = models.CharField(max_length=20)
+    # Shu aloqadan keyingi Payment.status
+    status = models.CharField(max_length=20)
+
+    request = models.BinaryField(blank=True, null=True)
+    response = models.BinaryField(blank=True, null=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["payment_id", "id"], name="payment_attempt_payment_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.provider}:{self.stage} payment={self.payment_id} {self.status}"
+
+
+class ClickCallbackLog(models.Model):
+    """
+    Click callback'iga (click_trans_id, action) bo'yicha berilgan javob.
+    Click retry qilganda shu javob qaytariladi: order lock, get_or_create
+    va JSON yozuvlari yo'q. order_id FK emas: order arxivlanganda ham qoladi.
+    """
+    ACTION_PREPARE = 0
+    ACTION_COMPLETE = 1
+
+    ACTION_CHOICES = [
+        (ACTION_PREPARE, "Prepare"),
+        (ACTION_COMPLETE, "Complete"),
+    ]
+
+    click_trans_id = models.CharField(max_length=64)
+    action = models.PositiveSmallIntegerField(choices=ACTION_CHOICES)
+    order_id = models.BigIntegerField()
+
+    # merchant_trans_id + amount + merchant_prepare_id + error hash'i
+    fingerprint = models.CharField(max_length=64)
+    response = models.JSONField()
+
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["click_trans_id", "action"], name="unique_click_callback"),
+        ]
+
+    def __str__(self):
+        return f"click {self.click_trans_id} action={self.action} order={self.order_id}"
+
+
+class PaymentWebhook(models.Model):
+    """
+    To'lov provayderi callback'lari inbox'i: callback faqat shu yerga
+    yoziladi (bitta INSERT) va provayderga darhol javob beriladi; Payment /
+    Order o'tishlarini worker bajaradi (manage.py run_payment_webhook_worker).
+
+    Shard = order_id % PAYMENT_WEBHOOK_SHARDS: bitta order'ning callback'lari
+    bitta shard'da, id tartibida ketma-ket qo'llanadi.
+    """
+    PROVIDER_CLICK = "click"
+
+    KIND_PREPARE = "prepare"
+    KIND_COMPLETE = "complete"
+
+    STATUS_QUEUED = "queued"
+    STATUS_PROCESSING = "processing"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    # Provayderga "Success" javob berilgan, lekin order worker'gacha bekor qilingan
+    STATUS_NEEDS_REFUND = "needs_refund"
+
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_PROCESSING, "Processing"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+        (STATUS_NEEDS_REFUND, "Needs refund"),
+    ]
+
+    provider = models.CharField(max_length=20)
+    kind = models.CharField(max_length=20)
+    order_id = models.BigIntegerField()
+    shard = models.PositiveSmallIntegerField(default=0)
+    payload = models.JSONField()
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default="")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    processed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            # Worker navbati: faqat queued qatorlar (kichik indeks)
+            models.Index(
+                fields=["shard", "id"],
+                name="payment_webhook_queued_idx",
+                condition=models.Q(status="queued"),
+            ),
+            # Order ichidagi tartib: oldingi tugallanmagan callback bormi
+            models.Index(fields=["order_id", "id"], name="payment_webhook_order_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.provider}:{self.kind} order={self.order_id} [{self.status}]"
+
+
+class ReconciliationRun(models.Model):
+    """Provayder statement'ini Payment jadvali bilan solishtirish (manage.py reconcile_payments)."""
+    provider = models.CharField(max_length=20, choices=Payment.METHOD_CHOICES)
+    source = models.CharField(max_length=255)
+    window_start = models.DateTimeField()
+    window_end = models.DateTimeField()
+
+    statement_rows = models.PositiveIntegerField(default=0)
+    matched = models.PositiveIntegerField(default=0)
+    missing = models.PositiveIntegerField(default=0)
+    extra = models.PositiveIntegerField(default=0)
+    amount_diff = models.PositiveIntegerField(default=0)
+    status_diff = models.PositiveIntegerField(default=0)
+
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ["-id"]
+
+    def __str__(self):
+        return f"{self.provider} {self.window_start:%Y-%m-%d}..{self.window_end:%Y-%m-%d} #{self.id}"
+
+
+class ReconciliationMismatch(models.Model):
+    KIND_MISSING = "missing"        # statement'da bor, bizda yo'q
+    KIND_EXTRA = "extra"            # bizda to'langan, statement'da yo'q
+    KIND_AMOUNT = "amount_diff"
+    KIND_STATUS = "status_diff"
+
+    KIND_CHOICES = [
+        (KIND_MISSING, "Missing in payments"),
+        (KIND_EXTRA, "Missing in statement"),
+        (KIND_AMOUNT, "Amount differs"),
+        (KIND_STATUS, "Status differs"),
+    ]
+
+    run = models.ForeignKey(ReconciliationRun, on_delete=models.CASCADE, related_name="mismatches")
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    provider_ref = models.CharField(max_length=128)
+
+    payment_id = models.BigIntegerField(blank=True, null=True)
+    order_id = models.BigIntegerField(blank=True, null=True)
+    statement_amount = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
+    payment_amount = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
+    statement_status = models.CharField(max_length=20, blank=True, default="")
+    payment_status = models.CharField(max_length=20, blank=True, default="")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["run", "kind"], name="recon_mismatch_run_kind_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.provider_ref}"
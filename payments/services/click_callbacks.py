@@ -0,0 +1,147 @@
+"""Click callback dedup: takroriy (click_trans_id, action) uchun saqlangan javob.
+
+Javob cache (Redis) va DB'ga (ClickCallbackLog) yoziladi. Retry avval
+cache'dan, bo'lmasa unique indeks bo'yicha DB'dan qaytariladi; log yo'q,
+lekin to'lov allaqachon paid bo'lsa (masalan, log'dan oldingi to'lovlar) —
+Payment.provider_ref indeksi bo'yicha. Replay'da yozuv va lock yo'q.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from payments.models import ClickCallbackLog, Payment
+
+
+def click_response(*, click_trans_id: str, merchant_trans_id: str, merchant_prepare_id: int | None, error: int, error_note: str):
+    """Standard Click response payload (minimal)."""
+    payload = {
+        "click_trans_id": click_trans_id,
+        "merchant_trans_id": merchant_trans_id,
+        "error": int(error),
+        "error_note": str(error_note),
+    }
+    if merchant_prepare_id is not None:
+        payload["merchant_prepare_id"] = int(merchant_prepare_id)
+    return payload
+
+
+def _cache_key(click_trans_id: str, action: int) -> str:
+    return f"click:cb:{action}:{click_trans_id}"
+
+
+# Redis vaqtincha ishlamasa ham callback'lar ishlashda davom etadi (DB fallback)
+def _cache_get(key: str):
+    try:
+        return cache.get(key)
+    except Exception:
+        return None
+
+
+def _cache_set(key: str, value) -> None:
+    try:
+        cache.set(key, value, timeout=settings.CLICK_CALLBACK_CACHE_SECONDS)
+    except Exception:
+        pass
+
+
+class ClickCallbacks:
+    @staticmethod
+    def fingerprint(data: dict, action: int) -> str:
+        h = hashlib.sha256()
+        for field in ("merchant_trans_id", "amount", "merchant_prepare_id", "error"):
+            h.update(str(data.get(field, "")).encode("utf-8"))
+            h.update(b"\x00")
+        h.update(str(action).encode("utf-8"))
+        return h.hexdigest()
+
+    @staticmethod
+    def _paid_payment(click_trans_id: str, merchant_trans_id: str) -> int | None:
+        """provider_ref indeksi bo'yicha: shu tranzaksiya bilan to'langan Payment.id."""
+        row = (
+            Payment.objects
+            .filter(provider_ref=click_trans_id, method=Payment.METHOD_CLICK, status=Payment.STATUS_PAID)
+            .values_list("id", "order_id")
+            .first()
+        )
+        if row is None or str(row[1]) != merchant_trans_id:
+            return None
+        return row[0]
+
+    @staticmethod
+    def replay(data: dict, *, action: int) -> dict | None:
+        """Takroriy callback bo'lsa saqlangan javob, aks holda None."""
+        click_trans_id = str(data.get("click_trans_id", ""))
+        key = _cache_key(click_trans_id, action)
+        fingerprint = ClickCallbacks.fingerprint(data, action)
+
+        stored = _cache_get(key)
+        if stored is None:
+            stored = (
+                ClickCallbackLog.objects
+                .filter(click_trans_id=click_trans_id, action=action)
+                .values("fingerprint", "response")
+                .first()
+            )
+            if stored is None and str(data.get("error", "0")) == "0":
+                merchant_trans_id = str(data.get("merchant_trans_id", ""))
+                payment_id = ClickCallbacks._paid_payment(click_trans_id, merchant_trans_id)
+                if payment_id is not None:
+                    stored = {
+                        "fingerprint": fingerprint,
+                        "response": click_response(
+                            click_trans_id=click_trans_id,
+                            merchant_trans_id=merchant_trans_id,
+                            merchant_prepare_id=payment_id,
+                            error=0,
+                            error_note="Success",
+                        ),
+                    }
+            if stored is not None:
+                _cache_set(key, stored)
+
+        if stored is None or stored["fingerprint"] != fingerprint:
+            return None
+        return stored["response"]
+
+    @staticmethod
+    def store(data: dict, *, action: int, order_id: int, response: dict) -> None:
+        click_trans_id = str(data.get("click_trans_id", ""))
+        stored = {"fingerprint": ClickCallbacks.fingerprint(data, action), "response": response}
+
+        try:
+            with transaction.atomic():
+                ClickCallbackLog.objects.create(
+                    click_trans_id=click_trans_id, action=action, order_id=order_id, **stored
+                )
+        except IntegrityError:
+            # Parallel callback allaqachon yozgan — birinchisi qoladi
+            return
+
+        _cache_set(_cache_key(click_trans_id, action), stored)
+
+    @staticmethod
+    def purge(*, older_than_days: int | None = None, batch_size: int = 1000) -> int:
+        days = settings.CLICK_CALLBACK_RETENTION_DAYS if older_than_days is None else older_than_days
+        cutoff = timezone.now() - timedelta(days=days)
+        total = 0
+
+        while True:
+            ids = list(
+                ClickCallbackLog.objects
+                .filter(created_at__lt=cutoff)
+                .order_by("id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            deleted, _ = ClickCallbackLog.objects.filter(id__in=ids).delete()
+            total += deleted
+
+        return total
@@ -0,0 +1,395 @@
+# payments/services/payme_merchant.py
+"""Payme (Paycom) Merchant API: JSON-RPC metodlari.
+
+Har bir Payme tranzaksiyasi — PaymeTransaction qatori (payme_id unique):
+state (1, 2, -1, -2), payme_time (Payme `time`, ms), reason, create/perform/
+cancel vaqtlari. GetStatement created_at indeksi bo'yicha iterator bilan o'qiladi.
+
+Order bitta Payment (OneToOne): u oxirgi tranzaksiyani ko'rsatadi
+(provider_ref); yangi tranzaksiya faqat oldingisi bekor bo'lganda ochiladi,
+bekor qilinganlari o'z qatorida qoladi.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from orders.models import Order
+from orders.services.order_status_service import OrderStatusService
+from payments.models import Payment, PaymeTransaction
+from payments.services.payment_attempts import PaymentAttempts
+from payments.services.payment_service import PaymentService
+
+
+# JSON-RPC / Payme xato kodlari
+ERROR_PARSE = -32700
+ERROR_INVALID_REQUEST = -32600
+ERROR_METHOD_NOT_FOUND = -32601
+ERROR_UNAUTHORIZED = -32504
+ERROR_INVALID_AMOUNT = -31001
+ERROR_TRANSACTION_NOT_FOUND = -31003
+ERROR_CANNOT_CANCEL = -31007
+ERROR_CANNOT_PERFORM = -31008
+ERROR_ORDER_NOT_FOUND = -31050
+ERROR_ORDER_NOT_PAYABLE = -31051
+ERROR_ORDER_BUSY = -31052
+
+# Namuna qiymat (hujjatlardagi misol): faqat DEBUG'da qabul qilinadi
+PLACEHOLDER_BASIC_AUTH = "Paycom:YOUR_KEY"
+
+
+class PaymeError(Exception):
+    def __init__(self, code: int, message: str, data=None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+def basic_auth_credentials() -> str:
+    """
+    Kutilgan "login:parol". PAYME_BASIC_AUTH bo'sh yoki namuna qiymat bo'lsa:
+    DEBUG'da — namuna (lokal simulyator), aks holda "" (hech kim o'tmaydi).
+    """
+    value = (settings.PAYME_BASIC_AUTH or "").strip()
+    if value and value != PLACEHOLDER_BASIC_AUTH:
+        return value
+    return PLACEHOLDER_BASIC_AUTH if settings.DEBUG else ""
+
+
+def to_ms(value: datetime | None) -> int:
+    return int(value.timestamp() * 1000) if value else 0
+
+
+def from_ms(value: int) -> datetime:
+    return datetime.fromtimestamp(value / 1000, tz=dt_timezone.utc)
+
+
+def to_tiyin(amount: Decimal) -> int:
+    return int(amount * 100)
+
+
+def _int_param(params: dict, name: str) -> int:
+    try:
+        return int(params[name])
+    except (KeyError, TypeError, ValueError):
+        raise PaymeError(ERROR_INVALID_REQUEST, "Invalid request", data=name)
+
+
+def _transaction_id(params: dict) -> str:
+    value = params.get("id")
+    if not isinstance(value, str) or not value or len(value) > 128:
+        raise PaymeError(ERROR_INVALID_REQUEST, "Invalid request", data="id")
+    return value
+
+
+STATEMENT_FIELDS = (
+    "id",
+    "payme_id",
+    "payme_time",
+    "amount",
+    "order_id",
+    "created_at",
+    "performed_at",
+    "cancelled_at",
+    "state",
+    "reason",
+)
+
+
+class PaymeMerchant:
+    @staticmethod
+    def _timeout_ms() -> int:
+        return settings.PAYME_TRANSACTION_TIMEOUT_MS
+
+    @staticmethod
+    def _payable_order(params: dict, *, lock: bool = False) -> Order:
+        """CheckPerform/Create tekshiruvi. lock=True — chaqiruvchi tranzaksiyasi ichida."""
+        account = params.get("account") if isinstance(params.get("account"), dict) else {}
+        try:
+            order_id = int(account.get("order_id"))
+        except (TypeError, ValueError):
+            raise PaymeError(ERROR_ORDER_NOT_FOUND, "Order not found", data="order_id")
+
+        orders = Order.objects.select_for_update() if lock else Order.objects
+        order = orders.filter(pk=order_id).first()
+        if order is None:
+            raise PaymeError(ERROR_ORDER_NOT_FOUND, "Order not found", data="order_id")
+        if order.paid or order.status != Order.STATUS_PENDING:
+            raise PaymeError(ERROR_ORDER_NOT_PAYABLE, "Order cannot be paid", data="order_id")
+
+        if _int_param(params, "amount") != to_tiyin(order.total_price):
+            raise PaymeError(ERROR_INVALID_AMOUNT, "Invalid amount")
+        return order
+
+    @staticmethod
+    def _locked_transaction(transaction_id: str) -> PaymeTransaction:
+        """Payme tranzaksiyasi (payme_id indeksi) — order lock'i bilan."""
+        order_id = (
+            PaymeTransaction.objects
+            .filter(payme_id=transaction_id)
+            .values_list("order_id", flat=True)
+            .first()
+        )
+        if order_id is not None:
+            list(Order.objects.select_for_update().filter(pk=order_id).values_list("id", flat=True))
+            txn = PaymeTransaction.objects.filter(payme_id=transaction_id).first()
+            if txn is not None:
+                return txn
+        raise PaymeError(ERROR_TRANSACTION_NOT_FOUND, "Transaction not found")
+
+    @staticmethod
+    def _expired(txn: PaymeTransaction) -> bool:
+        return to_ms(timezone.now()) - to_ms(txn.created_at) > PaymeMerchant._timeout_ms()
+
+    @staticmethod
+    def _current_payment(txn: PaymeTransaction) -> Payment | None:
+        """Tranzaksiya order'ning joriy Payme tranzaksiyasi bo'lsa — uning Payment qatori."""
+        return Payment.objects.filter(
+            pk=txn.payment_id, method=Payment.METHOD_PAYME, provider_ref=txn.payme_id
+        ).first()
+
+    @staticmethod
+    def _cancel(
+        txn: PaymeTransaction,
+        *,
+        reason: int,
+        state: int = PaymeTransaction.STATE_CANCELLED,
+        params: dict | None = None,
+    ) -> None:
+        txn.state = state
+        txn.reason = reason
+        txn.cancelled_at = timezone.now()
+        txn.save(update_fields=["state", "reason", "cancelled_at"])
+
+        payment = PaymeMerchant._current_payment(txn)
+        if payment is not None:
+            if payment.status != Payment.STATUS_PAID:
+                payment.mark_cancelled()
+            PaymentAttempts.record(
+                payment,
+                stage="cancel",
+                request=params,
+                response={"state": state, "reason": reason, "cancel_time": to_ms(txn.cancelled_at)},
+            )
+
+    @staticmethod
+    def _created(txn: PaymeTransaction) -> dict:
+        return {
+            "create_time": to_ms(txn.created_at),
+            "transaction": str(txn.id),
+            "state": txn.state,
+        }
+
+    @staticmethod
+    def _existing(txn: PaymeTransaction, params: dict) -> dict | PaymeError:
+        """Takroriy CreateTransaction (shu id): faqat ochiq tranzaksiya qaytariladi."""
+        if txn.state != PaymeTransaction.STATE_CREATED:
+            raise PaymeError(ERROR_CANNOT_PERFORM, "Transaction is not active")
+        if PaymeMerchant._expired(txn):
+            PaymeMerchant._cancel(txn, reason=PaymeTransaction.REASON_TIMEOUT, params=params)
+            return PaymeError(ERROR_CANNOT_PERFORM, "Transaction timed out")
+        return PaymeMerchant._created(txn)
+
+    # ---- metodlar ----
+
+    @staticmethod
+    def _raise_or_return(result):
+        # Timeout'da bekor qilish commit bo'lishi kerak: xato tranzaksiyadan tashqarida ko'tariladi
+        if isinstance(result, PaymeError):
+            raise result
+        return result
+
+    @staticmethod
+    def check_perform_transaction(params: dict) -> dict:
+        PaymeMerchant._payable_order(params)
+        return {"allow": True}
+
+    @staticmethod
+    def create_transaction(params: dict) -> dict:
+        return PaymeMerchant._raise_or_return(PaymeMerchant._create_transaction(params))
+
+    @staticmethod
+    @transaction.atomic
+    def _create_transaction(params: dict) -> dict | PaymeError:
+        transaction_id = _transaction_id(params)
+        payme_time = _int_param(params, "time")
+
+        if PaymeTransaction.objects.filter(payme_id=transaction_id).exists():
+            return PaymeMerchant._existing(PaymeMerchant._locked_transaction(transaction_id), params)
+
+        order = PaymeMerchant._payable_order(params, lock=True)
+        # Shu id bilan parallel CreateTransaction order lock'ini kutgan bo'lishi mumkin
+        txn = PaymeTransaction.objects.filter(payme_id=transaction_id).first()
+        if txn is not None:
+            return PaymeMerchant._existing(txn, params)
+
+        payment, _ = Payment.objects.get_or_create(
+            order=order,
+            defaults={
+                "method": Payment.METHOD_PAYME,
+                "amount": order.total_price,
+                "status": Payment.STATUS_CREATED,
+            },
+        )
+        if payment.status == Payment.STATUS_PAID:
+            raise PaymeError(ERROR_ORDER_NOT_PAYABLE, "Order cannot be paid", data="order_id")
+
+        active = PaymeTransaction.objects.filter(order_id=order.id, state=PaymeTransaction.STATE_CREATED).first()
+        if active is not None:
+            if not PaymeMerchant._expired(active):
+                raise PaymeError(ERROR_ORDER_BUSY, "Order has another pending transaction", data="order_id")
+            PaymeMerchant._cancel(active, reason=PaymeTransaction.REASON_TIMEOUT, params=params)
+
+        txn = PaymeTransaction.objects.create(
+            payme_id=transaction_id,
+            payment_id=payment.id,
+            order_id=order.id,
+            amount=order.total_price,
+            payme_time=payme_time,
+        )
+        # Payment yangi tranzaksiyani ko'rsatadi; created_at o'zgarmaydi
+        payment.method = Payment.METHOD_PAYME
+        payment.amount = order.total_price
+        payment.status = Payment.STATUS_PENDING
+        payment.provider_ref = transaction_id
+        payment.paid_at = None
+        payment.save(update_fields=["method", "amount", "status", "provider_ref", "paid_at", "updated_at"])
+
+        result = PaymeMerchant._created(txn)
+        PaymentAttempts.record(payment, stage="create", request=params, response=result)
+        return result
+
+    @staticmethod
+    def perform_transaction(params: dict) -> dict:
+        return PaymeMerchant._raise_or_return(PaymeMerchant._perform_transaction(params))
+
+    @staticmethod
+    @transaction.atomic
+    def _perform_transaction(params: dict) -> dict | PaymeError:
+        txn = PaymeMerchant._locked_transaction(_transaction_id(params))
+
+        if txn.state == PaymeTransaction.STATE_CREATED:
+            order = Order.objects.get(pk=txn.order_id)
+            payment = PaymeMerchant._current_payment(txn)
+            if PaymeMerchant._expired(txn) or order.status == Order.STATUS_CANCELLED or payment is None:
+                PaymeMerchant._cancel(txn, reason=PaymeTransaction.REASON_TIMEOUT, params=params)
+                return PaymeError(ERROR_CANNOT_PERFORM, "Transaction timed out")
+
+            txn.state = PaymeTransaction.STATE_PERFORMED
+            txn.performed_at = timezone.now()
+            txn.save(update_fields=["state", "performed_at"])
+
+            payment.status = Payment.STATUS_PAID
+            payment.paid_at = txn.performed_at
+            payment.save(update_fields=["status", "paid_at", "updated_at"])
+            PaymentAttempts.record(
+                payment,
+                stage="perform",
+                request=params,
+                response={"state": txn.state, "perform_time": to_ms(txn.performed_at)},
+            )
+
+            PaymentService._mark_order_paid(order)
+            if order.status == Order.STATUS_PENDING:
+                OrderStatusService.update_status(order_id=order.id, new_status=Order.STATUS_CONFIRMED)
+
+        elif txn.state != PaymeTransaction.STATE_PERFORMED:
+            raise PaymeError(ERROR_CANNOT_PERFORM, "Transaction is cancelled")
+
+        return {
+            "transaction": str(txn.id),
+            "perform_time": to_ms(txn.performed_at),
+            "state": txn.state,
+        }
+
+    @staticmethod
+    @transaction.atomic
+    def cancel_transaction(params: dict) -> dict:
+        txn = PaymeMerchant._locked_transaction(_transaction_id(params))
+        reason = _int_param(params, "reason")
+
+        if txn.state == PaymeTransaction.STATE_CREATED:
+            PaymeMerchant._cancel(txn, reason=reason, params=params)
+        elif txn.state == PaymeTransaction.STATE_PERFORMED:
+            # To'langan order bekor qilinmaydi (refund yo'q)
+            raise PaymeError(ERROR_CANNOT_CANCEL, "Paid order cannot be cancelled")
+
+        return {
+            "transaction": str(txn.id),
+            "cancel_time": to_ms(txn.cancelled_at),
+            "state": txn.state,
+        }
+
+    @staticmethod
+    def check_transaction(params: dict) -> dict:
+        txn = PaymeTransaction.objects.filter(payme_id=_transaction_id(params)).first()
+        if txn is None:
+            raise PaymeError(ERROR_TRANSACTION_NOT_FOUND, "Transaction not found")
+        return {
+            "create_time": to_ms(txn.created_at),
+            "perform_time": to_ms(txn.performed_at),
+            "cancel_time": to_ms(txn.cancelled_at),
+            "transaction": str(txn.id),
+            "state": txn.state,
+            "reason": txn.reason,
+        }
+
+    @staticmethod
+    def statement_range(params: dict) -> tuple[datetime, datetime]:
+        start, end = _int_param(params, "from"), _int_param(params, "to")
+        if start > end:
+            raise PaymeError(ERROR_INVALID_REQUEST, "Invalid request", data="from")
+        return from_ms(start), from_ms(end)
+
+    @staticmethod
+    def statement(params: dict, *, chunk_size: int = 500):
+        """
+        GetStatement: [from, to] oralig'idagi tranzaksiyalar (create_time tartibida).
+        Generator — (created_at, id) indeksi bo'yicha server-side cursor,
+        xotira chunk_size qator bilan cheklangan.
+        """
+        start, end = PaymeMerchant.statement_range(params)
+
+        rows = (
+            PaymeTransaction.objects
+            .filter(created_at__gte=start, created_at__lte=end)
+            .order_by("created_at", "id")
+            .values_list(*STATEMENT_FIELDS)
+            .iterator(chunk_size=chunk_size)
+        )
+        for (txn_id, ref, payme_time, amount, order_id, created_at, performed_at,
+             cancelled_at, state, reason) in rows:
+            yield {
+                "id": ref,
+                "time": payme_time,
+                "amount": to_tiyin(amount),
+                "account": {"order_id": order_id},
+                "create_time": to_ms(created_at),
+                "perform_time": to_ms(performed_at),
+                "cancel_time": to_ms(cancelled_at),
+                "transaction": str(txn_id),
+                "state": state,
+                "reason": reason,
+            }
+
+    METHODS = {
+        "CheckPerformTransaction": "check_perform_transaction",
+        "CreateTransaction": "create_transaction",
+        "PerformTransaction": "perform_transaction",
+        "CancelTransaction": "cancel_transaction",
+        "CheckTransaction": "check_transaction",
+    }
+
+    @staticmethod
+    def call(method: str, params: dict) -> dict:
+        """GetStatement'dan boshqa metodlar (javob bitta dict)."""
+        name = PaymeMerchant.METHODS.get(method)
+        if name is None:
+            raise PaymeError(ERROR_METHOD_NOT_FOUND, "Method not found", data=method)
+        return getattr(PaymeMerchant, name)(params)
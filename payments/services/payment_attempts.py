@@ -0,0 +1,61 @@
+# payments/services/payment_attempts.py
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from payments.models import Payment, PaymentAttempt
+
+
+def pack(data: dict | None) -> bytes | None:
+    if data is None:
+        return None
+    raw = json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(",", ":"))
+    return zlib.compress(raw.encode("utf-8"))
+
+
+def unpack(blob) -> dict | None:
+    if blob is None:
+        return None
+    return json.loads(zlib.decompress(bytes(blob)).decode("utf-8"))
+
+
+class PaymentAttempts:
+    """
+    Provayder so'rov/javoblari audit'i (PaymentAttempt). Faqat INSERT:
+    Payment qatoridagi JSON'ni har o'tishda qayta yozish o'rniga har bir
+    aloqa alohida siqilgan qator bo'ladi.
+    """
+
+    @staticmethod
+    def record(
+        payment: Payment,
+        *,
+        stage: str,
+        request: dict | None = None,
+        response: dict | None = None,
+    ) -> PaymentAttempt:
+        return PaymentAttempt.objects.create(
+            payment_id=payment.id,
+            order_id=payment.order_id,
+            provider=payment.method,
+            stage=stage,
+            status=payment.status,
+            request=pack(request),
+            response=pack(response),
+        )
+
+    @staticmethod
+    def for_payment(payment_id: int) -> list[dict]:
+        return [
+            {
+                "id": attempt.id,
+                "provider": attempt.provider,
+                "stage": attempt.stage,
+                "status": attempt.status,
+                "request": unpack(attempt.request),
+                "response": unpack(attempt.response),
+                "created_at": attempt.created_at,
+            }
+            for attempt in PaymentAttempt.objects.filter(payment_id=payment_id).order_by("id")
+        ]
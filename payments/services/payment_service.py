@@ -6,11 +6,54 @@ from django.utils import timezone
 from django.core.exceptions import ValidationError
 
 from orders.models import Order
+from orders.services.order_events import OrderEvents
 from orders.services.order_status_service import OrderStatusService
+from orders.services.sales_rollup_service import SalesRollupService
+from orders.services.user_order_stats import UserOrderStatsService
+from outbox.models import OutboxEvent
+from outbox.services.outbox import Outbox
 from payments.models import Payment
+from payments.services.payment_attempts import PaymentAttempts
+
+
+class OrderNotPayable(ValueError):
+    """Order bekor qilingan (masalan, expire_pending_orders) — to'lov qabul qilinmaydi."""
 
 
 class PaymentService:
+    @staticmethod
+    def _ensure_payable(order: Order) -> None:
+        # Order lock ostida tekshiriladi: expiry bekor qilib stock'ni qaytargan
+        # order'ni callback to'langan qilib qo'ymasin
+        if order.status == Order.STATUS_CANCELLED and not order.paid:
+            raise OrderNotPayable("Order is cancelled")
+
+    @staticmethod
+    def _mark_order_paid(order: Order) -> None:
+        # Faqat haqiqiy o'tishda (unpaid -> paid) sales rollup yangilanadi
+        if order.paid:
+            return
+        order.mark_paid()
+        SalesRollupService.record_paid(order.id)
+        UserOrderStatsService.record_paid(order)
+        Outbox.order_event(OutboxEvent.TOPIC_ORDER_PAID, order, paid_at=order.paid_at.isoformat())
+        OrderEvents.record(order)
+
+    @staticmethod
+    def _record_payment_failed(payment: Payment) -> None:
+        Outbox.emit(
+            OutboxEvent.TOPIC_PAYMENT_FAILED,
+            aggregate_type="order",
+            aggregate_id=payment.order_id,
+            payload={
+                "order_id": payment.order_id,
+                "payment_id": payment.id,
+                "method": payment.method,
+                "amount": str(payment.amount),
+                "provider_ref": payment.provider_ref,
+            },
+        )
+
     @staticmethod
     @transaction.atomic
     def get_or_create_cod_payment(*, order: Order) -> Payment:
@@ -53,7 +96,7 @@ class PaymentService:
         payment.paid_at = timezone.now()
         payment.save(update_fields=["status", "paid_at", "updated_at"])
 
-        order.mark_paid()
+        PaymentService._mark_order_paid(order)
 
         if order.status == Order.STATUS_PENDING:
             OrderStatusService.update_status(order_id=order.id, new_status=Order.STATUS_CONFIRMED)
@@ -71,6 +114,7 @@ class PaymentService:
         """
 
         order = Order.objects.select_for_update().get(pk=order.pk)
+        PaymentService._ensure_payable(order)
 
         payment, _ = Payment.objects.get_or_create(
             order=order,
@@ -96,9 +140,7 @@ class PaymentService:
             payment.status = Payment.STATUS_PAID
             payment.paid_at = timezone.now()
             payment.provider_ref = payment.provider_ref or f"MOCK-{uuid.uuid4()}"
-            if raw_request is not None:
-                payment.raw_request = raw_request
-            payment.raw_response = {
+            response = {
                 "ok": True,
                 "provider": "mock",
                 "provider_ref": payment.provider_ref,
@@ -111,13 +153,12 @@ class PaymentService:
                     "status",
                     "paid_at",
                     "provider_ref",
-                    "raw_request",
-                    "raw_response",
                     "updated_at",
                 ]
             )
+            PaymentAttempts.record(payment, stage="paid", request=raw_request, response=response)
 
-        order.mark_paid()
+        PaymentService._mark_order_paid(order)
 
         # Optional: auto-confirm when paid
         if order.status == Order.STATUS_PENDING:
@@ -148,11 +189,10 @@ class PaymentService:
             payment.amount = order.total_price
 
         if payment.status != Payment.STATUS_PAID:
+            previous_status = payment.status
             payment.status = Payment.STATUS_FAILED
             payment.provider_ref = payment.provider_ref or f"MOCK-{uuid.uuid4()}"
-            if raw_request is not None:
-                payment.raw_request = raw_request
-            payment.raw_response = {
+            response = {
                 "ok": False,
                 "provider": "mock",
                 "provider_ref": payment.provider_ref,
@@ -163,11 +203,12 @@ class PaymentService:
                     "amount",
                     "status",
                     "provider_ref",
-                    "raw_request",
-                    "raw_response",
                     "updated_at",
                 ]
             )
+            PaymentAttempts.record(payment, stage="failed", request=raw_request, response=response)
+            if previous_status != Payment.STATUS_FAILED:
+                PaymentService._record_payment_failed(payment)
 
         return payment
 
@@ -186,6 +227,7 @@ class PaymentService:
         """Create/update payment record for Click prepare step."""
 
         order = Order.objects.select_for_update().get(pk=order.pk)
+        PaymentService._ensure_payable(order)
 
         payment, _ = Payment.objects.get_or_create(
             order=order,
@@ -207,9 +249,7 @@ class PaymentService:
 
         payment.status = Payment.STATUS_PENDING
         payment.provider_ref = click_trans_id or payment.provider_ref
-        if raw_request is not None:
-            payment.raw_request = raw_request
-        payment.raw_response = {
+        response = {
             "ok": True,
             "provider": "click",
             "stage": "prepare",
@@ -222,11 +262,10 @@ class PaymentService:
                 "amount",
                 "status",
                 "provider_ref",
-                "raw_request",
-                "raw_response",
                 "updated_at",
             ]
         )
+        PaymentAttempts.record(payment, stage="prepare", request=raw_request, response=response)
 
         return payment
 
@@ -243,6 +282,7 @@ class PaymentService:
         """Marks Click payment as PAID and order as paid."""
 
         order = Order.objects.select_for_update().get(pk=order.pk)
+        PaymentService._ensure_payable(order)
 
         payment, _ = Payment.objects.get_or_create(
             order=order,
@@ -261,9 +301,7 @@ class PaymentService:
             payment.status = Payment.STATUS_PAID
             payment.paid_at = timezone.now()
             payment.provider_ref = click_trans_id or payment.provider_ref
-            if raw_request is not None:
-                payment.raw_request = raw_request
-            payment.raw_response = {
+            response = {
                 "ok": True,
                 "provider": "click",
                 "stage": "complete",
@@ -279,14 +317,13 @@ class PaymentService:
                     "status",
                     "paid_at",
                     "provider_ref",
-                    "raw_request",
-                    "raw_response",
                     "updated_at",
                 ]
             )
+            PaymentAttempts.record(payment, stage="complete", request=raw_request, response=response)
 
         # Order paid + optional confirm
-        order.mark_paid()
+        PaymentService._mark_order_paid(order)
         if order.status == Order.STATUS_PENDING:
             OrderStatusService.update_status(order_id=order.id, new_status=Order.STATUS_CONFIRMED)
 
@@ -315,14 +352,13 @@ class PaymentService:
         )
 
         if payment.status != Payment.STATUS_PAID:
+            previous_status = payment.status
             payment.method = Payment.METHOD_CLICK
             if payment.amount != order.total_price:
                 payment.amount = order.total_price
             payment.status = Payment.STATUS_FAILED
             payment.provider_ref = click_trans_id or payment.provider_ref
-            if raw_request is not None:
-                payment.raw_request = raw_request
-            payment.raw_response = {
+            response = {
                 "ok": False,
                 "provider": "click",
                 "stage": "fail",
@@ -335,10 +371,11 @@ class PaymentService:
                     "amount",
                     "status",
                     "provider_ref",
-                    "raw_request",
-                    "raw_response",
                     "updated_at",
                 ]
             )
+            PaymentAttempts.record(payment, stage="fail", request=raw_request, response=response)
+            if previous_status != Payment.STATUS_FAILED:
+                PaymentService._record_payment_failed(payment)
 
         return payment
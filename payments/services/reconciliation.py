@@ -0,0 +1,279 @@
+# payments/services/reconciliation.py
+import csv
+import json
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.utils import timezone
+
+from payments.models import Payment, PaymeTransaction, ReconciliationMismatch, ReconciliationRun
+
+
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+FORMAT_JSON = "json"
+FORMATS = (FORMAT_CSV, FORMAT_JSONL, FORMAT_JSON)
+
+# Provayder holati -> Payment.status
+_PAYME_STATES = {
+    PaymeTransaction.STATE_CREATED: Payment.STATUS_PENDING,
+    PaymeTransaction.STATE_PERFORMED: Payment.STATUS_PAID,
+    PaymeTransaction.STATE_CANCELLED: Payment.STATUS_CANCELLED,
+    PaymeTransaction.STATE_CANCELLED_AFTER_PERFORM: Payment.STATUS_CANCELLED,
+}
+_CLICK_STATUSES = {
+    "success": Payment.STATUS_PAID,
+    "successful": Payment.STATUS_PAID,
+    "paid": Payment.STATUS_PAID,
+    "completed": Payment.STATUS_PAID,
+    "cancelled": Payment.STATUS_CANCELLED,
+    "canceled": Payment.STATUS_CANCELLED,
+    "reversed": Payment.STATUS_CANCELLED,
+    "failed": Payment.STATUS_FAILED,
+    "error": Payment.STATUS_FAILED,
+    "pending": Payment.STATUS_PENDING,
+    "prepared": Payment.STATUS_PENDING,
+}
+
+
+class StatementError(ValueError):
+    """Statement fayli o'qilmaydi yoki qatorda majburiy maydon yo'q."""
+
+
+@dataclass(frozen=True)
+class StatementRow:
+    provider_ref: str
+    amount: int  # tiyin
+    status: str
+
+
+@dataclass
+class _PaymentRow:
+    id: int
+    order_id: int
+    amount: int  # tiyin
+    status: str
+
+
+@dataclass
+class ReconcileResult:
+    run: ReconciliationRun
+    counts: dict = field(default_factory=dict)
+
+
+def _tiyin(value) -> int:
+    return int((Decimal(value) * 100).to_integral_value())
+
+
+def _sum(tiyin: int | None) -> Decimal | None:
+    return None if tiyin is None else Decimal(tiyin) / 100
+
+
+def _click_row(record: dict) -> StatementRow:
+    status = str(record.get("status", "")).strip().lower()
+    return StatementRow(
+        provider_ref=str(record["click_trans_id"]).strip(),
+        amount=_tiyin(record["amount"]),
+        status=_CLICK_STATUSES.get(status, status),
+    )
+
+
+def _payme_row(record: dict) -> StatementRow:
+    # GetStatement formati: id, amount (tiyin), state
+    state = int(record["state"])
+    return StatementRow(
+        provider_ref=str(record["id"]).strip(),
+        amount=int(record["amount"]),
+        status=_PAYME_STATES.get(state, str(state)),
+    )
+
+
+PARSERS = {
+    Payment.METHOD_CLICK: _click_row,
+    Payment.METHOD_PAYME: _payme_row,
+}
+
+
+class PaymentReconciliation:
+    """
+    Provayder statement'i (Click CSV / Payme GetStatement) va bizning yozuvlar
+    (Click — Payment, Payme — PaymeTransaction: bitta order'ning bekor
+    qilingan va qayta ochilgan tranzaksiyalari alohida solishtiriladi).
+
+    - statement oqim bilan o'qiladi (CSV / JSONL qatorma-qator);
+    - bizning yozuvlar oyna uchun bitta so'rov bilan yuklanadi
+      (payment_method_created_idx / payme_txn_created_idx), provider_ref
+      bo'yicha dict — hash join;
+    - oynadan tashqarida yaratilgan tranzaksiyalar ref indeksi bilan
+      chunk'larda qo'shimcha yuklanadi (oyna chegarasida "missing" bo'lmasin);
+    - summalar tiyin (int)da solishtiriladi; natija ReconciliationMismatch'ga
+      bulk_create bilan yoziladi.
+    """
+
+    @staticmethod
+    def detect_format(path: str) -> str:
+        suffix = path.rsplit(".", 1)[-1].lower()
+        if suffix in FORMATS:
+            return suffix
+        if suffix == "ndjson":
+            return FORMAT_JSONL
+        raise StatementError(f"Unknown statement format: {path}")
+
+    @staticmethod
+    def records(stream, fmt: str):
+        if fmt == FORMAT_CSV:
+            yield from csv.DictReader(stream)
+        elif fmt == FORMAT_JSONL:
+            for line in stream:
+                if line.strip():
+                    yield json.loads(line)
+        elif fmt == FORMAT_JSON:
+            # Butun hujjat: ro'yxat yoki Payme GetStatement javobi
+            data = json.load(stream)
+            if isinstance(data, dict):
+                data = (data.get("result") or data).get("transactions", [])
+            yield from data
+        else:
+            raise StatementError(f"Unknown statement format: {fmt}")
+
+    @staticmethod
+    def rows(stream, *, provider: str, fmt: str):
+        parse = PARSERS[provider]
+        for number, record in enumerate(PaymentReconciliation.records(stream, fmt), start=1):
+            try:
+                yield parse(record)
+            except (KeyError, TypeError, ValueError, InvalidOperation) as e:
+                raise StatementError(f"Statement row {number}: {e!r}")
+
+    @staticmethod
+    def _load(provider: str, **filters) -> dict[str, _PaymentRow]:
+        """
+        provider_ref -> bizdagi yozuv. Payme: har bir tranzaksiya alohida
+        (PaymeTransaction — bekor qilingani ham), Click: Payment qatori.
+        """
+        if provider == Payment.METHOD_PAYME:
+            return {
+                ref: _PaymentRow(
+                    id=payment_id,
+                    order_id=order_id,
+                    amount=_tiyin(amount),
+                    status=_PAYME_STATES.get(state, str(state)),
+                )
+                for payment_id, order_id, ref, amount, state in (
+                    PaymeTransaction.objects
+                    .filter(**filters)
+                    .values_list("payment_id", "order_id", "payme_id", "amount", "state")
+                )
+            }
+        return {
+            ref: _PaymentRow(id=payment_id, order_id=order_id, amount=_tiyin(amount), status=status)
+            for payment_id, order_id, ref, amount, status in (
+                Payment.objects
+                .filter(method=provider, **filters)
+                .exclude(provider_ref="")
+                .values_list("id", "order_id", "provider_ref", "amount", "status")
+            )
+        }
+
+    @staticmethod
+    def payments(provider: str, window_start, window_end) -> dict[str, _PaymentRow]:
+        return PaymentReconciliation._load(provider, created_at__gte=window_start, created_at__lt=window_end)
+
+    @staticmethod
+    def by_refs(provider: str, refs: list[str]) -> dict[str, _PaymentRow]:
+        ref_field = "payme_id" if provider == Payment.METHOD_PAYME else "provider_ref"
+        return PaymentReconciliation._load(provider, **{f"{ref_field}__in": refs})
+
+    @staticmethod
+    def reconcile(
+        stream,
+        *,
+        provider: str,
+        fmt: str,
+        window_start,
+        window_end,
+        source: str = "",
+        batch_size: int = 1000,
+    ) -> ReconcileResult:
+        ours = PaymentReconciliation.payments(provider, window_start, window_end)
+        seen: set[str] = set()
+        pairs: list[tuple[StatementRow, _PaymentRow]] = []
+        unmatched: list[StatementRow] = []
+        statement_rows = 0
+
+        for row in PaymentReconciliation.rows(stream, provider=provider, fmt=fmt):
+            statement_rows += 1
+            seen.add(row.provider_ref)
+            payment = ours.get(row.provider_ref)
+            if payment is None:
+                unmatched.append(row)
+            else:
+                pairs.append((row, payment))
+
+        # Oynadan tashqarida yaratilgan payment'lar (provider_ref indeksi)
+        missing: list[StatementRow] = []
+        for start in range(0, len(unmatched), batch_size):
+            chunk = unmatched[start:start + batch_size]
+            found = PaymentReconciliation.by_refs(provider, [r.provider_ref for r in chunk])
+            for row in chunk:
+                payment = found.get(row.provider_ref)
+                if payment is None:
+                    missing.append(row)
+                else:
+                    pairs.append((row, payment))
+
+        amount_diff = [(r, p) for r, p in pairs if r.amount != p.amount]
+        status_diff = [(r, p) for r, p in pairs if r.status != p.status]
+        extra = [
+            (ref, p) for ref, p in ours.items()
+            if ref not in seen and p.status == Payment.STATUS_PAID
+        ]
+
+        def mismatch(kind, ref, row=None, payment=None):
+            return ReconciliationMismatch(
+                run=run,
+                kind=kind,
+                provider_ref=ref,
+                payment_id=payment.id if payment else None,
+                order_id=payment.order_id if payment else None,
+                statement_amount=_sum(row.amount) if row else None,
+                payment_amount=_sum(payment.amount) if payment else None,
+                statement_status=row.status if row else "",
+                payment_status=payment.status if payment else "",
+            )
+
+        with transaction.atomic():
+            run = ReconciliationRun.objects.create(
+                provider=provider,
+                source=source[:255],
+                window_start=window_start,
+                window_end=window_end,
+                statement_rows=statement_rows,
+                matched=len(pairs),
+                missing=len(missing),
+                extra=len(extra),
+                amount_diff=len(amount_diff),
+                status_diff=len(status_diff),
+            )
+            mismatches = (
+                [mismatch(ReconciliationMismatch.KIND_MISSING, r.provider_ref, row=r) for r in missing]
+                + [mismatch(ReconciliationMismatch.KIND_EXTRA, ref, payment=p) for ref, p in extra]
+                + [mismatch(ReconciliationMismatch.KIND_AMOUNT, r.provider_ref, r, p) for r, p in amount_diff]
+                + [mismatch(ReconciliationMismatch.KIND_STATUS, r.provider_ref, r, p) for r, p in status_diff]
+            )
+            ReconciliationMismatch.objects.bulk_create(mismatches, batch_size=batch_size)
+            run.finished_at = timezone.now()
+            run.save(update_fields=["finished_at"])
+
+        return ReconcileResult(
+            run=run,
+            counts={
+                "statement_rows": statement_rows,
+                "matched": len(pairs),
+                "missing": len(missing),
+                "extra": len(extra),
+                "amount_diff": len(amount_diff),
+                "status_diff": len(status_diff),
+            },
+        )
@@ -0,0 +1,224 @@
+# payments/services/webhook_inbox.py
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from orders.models import Order
+from payments.models import PaymentWebhook
+from payments.services.payment_service import OrderNotPayable, PaymentService
+
+
+logger = logging.getLogger(__name__)
+
+
+class PermanentWebhookError(Exception):
+    """Qayta urinish foyda bermaydi (order yo'q, noma'lum callback) — darhol failed."""
+
+
+class RefundRequired(PermanentWebhookError):
+    """Complete'ga "Success" javob berilgan, order esa bekor qilingan — pul qaytarilishi kerak."""
+
+
+@dataclass
+class ProcessResult:
+    status: str
+    error: str = ""
+
+
+class WebhookInbox:
+    """
+    To'lov callback'lari inbox'i (PaymentWebhook).
+
+    - append: callback bitta INSERT bilan yoziladi (lock'lar yo'q);
+    - claim_next: shard navbatidagi eng eski, vaqti kelgan callback —
+      shu order'ning oldingi tugallanmagan callback'i bo'lmasa (order ichida
+      tartib retry'da ham buzilmaydi); skip_locked: worker'lar kutmaydi;
+    - process: Payment/Order o'tishi; xato bo'lsa exponential backoff,
+      PAYMENT_WEBHOOK_MAX_ATTEMPTS'dan keyin failed.
+
+    mark_click_* idempotent: 'processing'da qolgan callback'ni qayta
+    bajarish xavfsiz (requeue_stale).
+    """
+
+    UNFINISHED = (PaymentWebhook.STATUS_QUEUED, PaymentWebhook.STATUS_PROCESSING)
+
+    @staticmethod
+    def enabled() -> bool:
+        return bool(getattr(settings, "PAYMENT_WEBHOOK_INBOX", False))
+
+    @staticmethod
+    def shards() -> int:
+        return max(1, int(getattr(settings, "PAYMENT_WEBHOOK_SHARDS", 1)))
+
+    @staticmethod
+    def shard_for(order_id: int) -> int:
+        return order_id % WebhookInbox.shards()
+
+    @staticmethod
+    def _backoff(attempts: int) -> timedelta:
+        seconds = settings.PAYMENT_WEBHOOK_RETRY_BASE_SECONDS * (2 ** (attempts - 1))
+        return timedelta(seconds=min(seconds, settings.PAYMENT_WEBHOOK_RETRY_MAX_SECONDS))
+
+    @staticmethod
+    def append(*, provider: str, kind: str, order_id: int, payload: dict) -> PaymentWebhook:
+        return PaymentWebhook.objects.create(
+            provider=provider,
+            kind=kind,
+            order_id=order_id,
+            shard=WebhookInbox.shard_for(order_id),
+            payload=payload,
+        )
+
+    @staticmethod
+    def claim_next(shard: int) -> PaymentWebhook | None:
+        earlier_unfinished = PaymentWebhook.objects.filter(
+            order_id=OuterRef("order_id"),
+            id__lt=OuterRef("id"),
+            status__in=WebhookInbox.UNFINISHED,
+        )
+        with transaction.atomic():
+            webhook = (
+                PaymentWebhook.objects
+                .select_for_update(skip_locked=True)
+                .filter(shard=shard, status=PaymentWebhook.STATUS_QUEUED, next_attempt_at__lte=timezone.now())
+                .exclude(Exists(earlier_unfinished))
+                .order_by("id")
+                .first()
+            )
+            if webhook is None:
+                return None
+
+            webhook.status = PaymentWebhook.STATUS_PROCESSING
+            webhook.started_at = timezone.now()
+            webhook.save(update_fields=["status", "started_at"])
+        return webhook
+
+    @staticmethod
+    def requeue_stale(shard: int, older_than: timedelta) -> int:
+        return (
+            PaymentWebhook.objects
+            .filter(
+                shard=shard,
+                status=PaymentWebhook.STATUS_PROCESSING,
+                started_at__lt=timezone.now() - older_than,
+            )
+            .update(status=PaymentWebhook.STATUS_QUEUED, started_at=None)
+        )
+
+    @staticmethod
+    def apply(webhook: PaymentWebhook) -> None:
+        # Order lock ostida: callback va worker orasida expiry bekor qilgan bo'lishi mumkin
+        order = Order.objects.select_for_update().filter(pk=webhook.order_id).first()
+        if order is None:
+            raise PermanentWebhookError("Order not found")
+
+        try:
+            WebhookInbox._apply(webhook, order)
+        except OrderNotPayable:
+            data = webhook.payload
+            if webhook.kind == PaymentWebhook.KIND_COMPLETE and data.get("error") == 0:
+                raise RefundRequired("Order was cancelled before the payment was applied")
+            raise PermanentWebhookError("Order is cancelled")
+
+    @staticmethod
+    def _apply(webhook: PaymentWebhook, order: Order) -> None:
+        data = webhook.payload
+        request = data.get("request") or {}
+        if webhook.provider == PaymentWebhook.PROVIDER_CLICK:
+            if webhook.kind == PaymentWebhook.KIND_PREPARE:
+                PaymentService.mark_click_prepared(
+                    order=order,
+                    click_trans_id=data["click_trans_id"],
+                    amount=data["amount"],
+                    raw_request={"provider": "click", "stage": "prepare", **request},
+                )
+                return
+
+            if webhook.kind == PaymentWebhook.KIND_COMPLETE:
+                if data["error"] != 0:
+                    PaymentService.mark_click_failed(
+                        order=order,
+                        click_trans_id=data["click_trans_id"],
+                        amount=data["amount"],
+                        raw_request={"provider": "click", "stage": "complete", "error": data["error"], **request},
+                    )
+                else:
+                    PaymentService.mark_click_completed(
+                        order=order,
+                        click_trans_id=data["click_trans_id"],
+                        merchant_prepare_id=data["merchant_prepare_id"],
+                        amount=data["amount"],
+                        raw_request={"provider": "click", "stage": "complete", **request},
+                    )
+                return
+
+        raise PermanentWebhookError(f"Unknown webhook {webhook.provider}:{webhook.kind}")
+
+    @staticmethod
+    def process(webhook: PaymentWebhook) -> ProcessResult:
+        now = timezone.now()
+        try:
+            with transaction.atomic():
+                WebhookInbox.apply(webhook)
+                webhook.status = PaymentWebhook.STATUS_DONE
+                webhook.attempts += 1
+                webhook.processed_at = timezone.now()
+                webhook.last_error = ""
+                webhook.save(update_fields=["status", "attempts", "processed_at", "last_error"])
+            return ProcessResult(status=webhook.status)
+        except Exception as e:
+            permanent = isinstance(e, PermanentWebhookError)
+            if not permanent:
+                logger.warning("payment webhook %s failed: %r", webhook.id, e)
+
+            webhook.attempts += 1
+            webhook.last_error = repr(e)[:2000]
+            webhook.started_at = None
+            if isinstance(e, RefundRequired):
+                logger.error("payment webhook %s: order %s cancelled, refund required", webhook.id, webhook.order_id)
+                webhook.status = PaymentWebhook.STATUS_NEEDS_REFUND
+                webhook.processed_at = now
+            elif permanent or webhook.attempts >= settings.PAYMENT_WEBHOOK_MAX_ATTEMPTS:
+                webhook.status = PaymentWebhook.STATUS_FAILED
+                webhook.processed_at = now
+            else:
+                webhook.status = PaymentWebhook.STATUS_QUEUED
+                webhook.next_attempt_at = now + WebhookInbox._backoff(webhook.attempts)
+            webhook.save(
+                update_fields=["status", "attempts", "last_error", "started_at", "processed_at", "next_attempt_at"]
+            )
+            return ProcessResult(status=webhook.status, error=webhook.last_error)
+
+    @staticmethod
+    def retry_failed() -> int:
+        return (
+            PaymentWebhook.objects
+            .filter(status=PaymentWebhook.STATUS_FAILED)
+            .update(status=PaymentWebhook.STATUS_QUEUED, attempts=0, next_attempt_at=timezone.now(), processed_at=None)
+        )
+
+    @staticmethod
+    def purge(*, older_than_days: int | None = None, batch_size: int = 1000) -> int:
+        """Bajarilgan (done) callback'larni batch'larda o'chiradi; failed'lar qoladi."""
+        days = settings.PAYMENT_WEBHOOK_RETENTION_DAYS if older_than_days is None else older_than_days
+        cutoff = timezone.now() - timedelta(days=days)
+        total = 0
+
+        while True:
+            ids = list(
+                PaymentWebhook.objects
+                .filter(status=PaymentWebhook.STATUS_DONE, processed_at__lt=cutoff)
+                .order_by("id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            deleted, _ = PaymentWebhook.objects.filter(id__in=ids).delete()
+            total += deleted
+
+        return total
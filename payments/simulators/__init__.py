@@ -0,0 +1 @@
+"""To'lov provayderlari simulyatorlari (lokal test va yuklama uchun)."""
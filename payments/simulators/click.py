@@ -0,0 +1,127 @@
+# payments/simulators/click.py
+"""Lokal Click simulyatori: SHOP API callback'larini (prepare/complete) Click kabi imzolab yuboradi.
+
+Transport — Django test Client (testlar) yoki HTTP (base_url, urllib):
+
+    sim = ClickSimulator(client=self.client)
+    txn, (prepare, complete) = sim.pay(order_id=order.id, amount=order.total_price)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import urllib.request
+import uuid
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.conf import settings
+from django.utils import timezone
+
+from payments.services.click_security import build_sign_string_complete, build_sign_string_prepare
+
+
+PREPARE_PATH = "/api/payments/click/prepare/"
+COMPLETE_PATH = "/api/payments/click/complete/"
+
+ACTION_PREPARE = 0
+ACTION_COMPLETE = 1
+
+
+@dataclass
+class ClickTransaction:
+    click_trans_id: str
+    order_id: int
+    amount: str  # so'm, "1000.00"
+
+
+class ClickSimulator:
+    def __init__(
+        self,
+        *,
+        client=None,
+        base_url: str = "",
+        service_id: str | None = None,
+        secret_key: str | None = None,
+    ):
+        self.client = client
+        self.base_url = base_url.rstrip("/")
+        self.service_id = settings.CLICK_SERVICE_ID if service_id is None else service_id
+        self.secret_key = settings.CLICK_SECRET_KEY if secret_key is None else secret_key
+
+    @staticmethod
+    def new_transaction(*, order_id: int, amount: Decimal | str) -> ClickTransaction:
+        return ClickTransaction(
+            click_trans_id=str(uuid.uuid4().int)[:18],
+            order_id=order_id,
+            amount=f"{Decimal(amount):.2f}",
+        )
+
+    def payload(
+        self,
+        txn: ClickTransaction,
+        *,
+        action: int,
+        merchant_prepare_id: int | str | None = None,
+        error: int = 0,
+    ) -> dict:
+        """Imzolangan callback (sign_string = md5(build_sign_string_*))."""
+        data = {
+            "click_trans_id": txn.click_trans_id,
+            "service_id": self.service_id,
+            "merchant_trans_id": str(txn.order_id),
+            "amount": txn.amount,
+            "action": str(action),
+            "error": str(error),
+            "error_note": "Success" if error == 0 else "Failed",
+            "sign_time": timezone.localtime().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        fields = {
+            "click_trans_id": data["click_trans_id"],
+            "service_id": self.service_id,
+            "secret_key": self.secret_key,
+            "merchant_trans_id": data["merchant_trans_id"],
+            "amount": data["amount"],
+            "action": data["action"],
+            "sign_time": data["sign_time"],
+        }
+        if action == ACTION_COMPLETE:
+            data["merchant_prepare_id"] = str(merchant_prepare_id)
+            raw = build_sign_string_complete(merchant_prepare_id=data["merchant_prepare_id"], **fields)
+        else:
+            raw = build_sign_string_prepare(**fields)
+        data["sign_string"] = hashlib.md5(raw.encode("utf-8")).hexdigest()
+        return data
+
+    def send(self, path: str, data: dict) -> dict:
+        if self.client is not None:
+            return self.client.post(path, data=data, content_type="application/json").json()
+
+        request = urllib.request.Request(
+            self.base_url + path,
+            data=json.dumps(data).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return json.loads(response.read())
+
+    # ---- callback'lar ----
+
+    def prepare(self, txn: ClickTransaction) -> dict:
+        return self.send(PREPARE_PATH, self.payload(txn, action=ACTION_PREPARE))
+
+    def complete(self, txn: ClickTransaction, merchant_prepare_id: int | str, *, error: int = 0) -> dict:
+        return self.send(
+            COMPLETE_PATH,
+            self.payload(txn, action=ACTION_COMPLETE, merchant_prepare_id=merchant_prepare_id, error=error),
+        )
+
+    def pay(self, *, order_id: int, amount: Decimal | str) -> tuple[ClickTransaction, list[dict]]:
+        """To'liq oqim (Prepare -> Complete). Qaytaradi: (txn, javoblar)."""
+        txn = self.new_transaction(order_id=order_id, amount=amount)
+        prepared = self.prepare(txn)
+        if prepared["error"] != 0:
+            return txn, [prepared]
+        return txn, [prepared, self.complete(txn, prepared["merchant_prepare_id"])]
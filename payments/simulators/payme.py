@@ -0,0 +1,99 @@
+# payments/simulators/payme.py
+"""Lokal Payme simulyatori: Merchant API'ga Payme kabi JSON-RPC so'rov yuboradi.
+
+Transport — Django test Client (testlar) yoki HTTP (base_url, urllib):
+
+    sim = PaymeSimulator(client=self.client)
+    txn = sim.new_transaction(order_id=order.id, amount=order.total_price)
+    sim.create(txn); sim.perform(txn)
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import time
+import urllib.request
+import uuid
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from payments.services.payme_merchant import basic_auth_credentials
+
+
+DEFAULT_PATH = "/api/payments/payme/"
+
+
+@dataclass
+class PaymeTransaction:
+    id: str
+    order_id: int
+    amount: int  # tiyin
+    time: int = field(default_factory=lambda: int(time.time() * 1000))
+
+    @property
+    def account(self) -> dict:
+        return {"order_id": self.order_id}
+
+
+class PaymeSimulator:
+    def __init__(self, *, client=None, base_url: str = "", path: str = DEFAULT_PATH, auth: str | None = None):
+        self.client = client
+        self.url = base_url.rstrip("/") + path
+        self.path = path
+        credentials = basic_auth_credentials() if auth is None else auth
+        self.authorization = "Basic " + base64.b64encode(credentials.encode("utf-8")).decode("ascii")
+        self._request_id = 0
+
+    @staticmethod
+    def new_transaction(*, order_id: int, amount: Decimal | int, tiyin: bool = False) -> PaymeTransaction:
+        amount = int(amount) if tiyin else int(Decimal(amount) * 100)
+        return PaymeTransaction(id=uuid.uuid4().hex[:24], order_id=order_id, amount=amount)
+
+    def call(self, method: str, params: dict) -> dict:
+        self._request_id += 1
+        body = json.dumps({"jsonrpc": "2.0", "id": self._request_id, "method": method, "params": params})
+
+        if self.client is not None:
+            response = self.client.post(
+                self.path, data=body, content_type="application/json", HTTP_AUTHORIZATION=self.authorization
+            )
+            raw = b"".join(response.streaming_content) if response.streaming else response.content
+            return json.loads(raw)
+
+        request = urllib.request.Request(
+            self.url,
+            data=body.encode("utf-8"),
+            headers={"Content-Type": "application/json", "Authorization": self.authorization},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return json.loads(response.read())
+
+    # ---- Payme metodlari ----
+
+    def check_perform(self, txn: PaymeTransaction) -> dict:
+        return self.call("CheckPerformTransaction", {"amount": txn.amount, "account": txn.account})
+
+    def create(self, txn: PaymeTransaction) -> dict:
+        return self.call(
+            "CreateTransaction",
+            {"id": txn.id, "time": txn.time, "amount": txn.amount, "account": txn.account},
+        )
+
+    def perform(self, txn: PaymeTransaction) -> dict:
+        return self.call("PerformTransaction", {"id": txn.id})
+
+    def cancel(self, txn: PaymeTransaction, reason: int = 3) -> dict:
+        return self.call("CancelTransaction", {"id": txn.id, "reason": reason})
+
+    def check(self, txn: PaymeTransaction) -> dict:
+        return self.call("CheckTransaction", {"id": txn.id})
+
+    def statement(self, start_ms: int, end_ms: int) -> dict:
+        return self.call("GetStatement", {"from": start_ms, "to": end_ms})
+
+    def pay(self, *, order_id: int, amount: Decimal | int) -> tuple[PaymeTransaction, list[dict]]:
+        """To'liq oqim (Check -> Create -> Perform). Qaytaradi: (txn, javoblar)."""
+        txn = self.new_transaction(order_id=order_id, amount=amount)
+        return txn, [self.check_perform(txn), self.create(txn), self.perform(txn)]
@@ -1,3 +1,415 @@
-from django.test import TestCase
+import base64
+import io
+import json
+from datetime import timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from orders.models import Order
+from orders.services.order_expiry import OrderExpiry
+from payments.models import Payment, PaymentWebhook, PaymeTransaction, ReconciliationMismatch
+from payments.services.payme_merchant import to_ms
+from payments.services.payment_service import OrderNotPayable, PaymentService
+from payments.services.payment_attempts import PaymentAttempts
+from payments.services.reconciliation import PaymentReconciliation
+from payments.services.webhook_inbox import WebhookInbox
+from payments.simulators.click import ACTION_PREPARE, PREPARE_PATH, ClickSimulator
+from payments.simulators.payme import PaymeSimulator
+
+
+@override_settings(PAYME_BASIC_AUTH="Paycom:test-key", PAYME_TRANSACTION_TIMEOUT_MS=43_200_000)
+class PaymeMerchantApiTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="buyer", password="p")
+        self.order = self._order(Decimal("125.50"))
+        self.sim = PaymeSimulator(client=self.client, auth="Paycom:test-key")
+
+    def _order(self, total: Decimal) -> Order:
+        return Order.objects.create(user=self.user, phone="998900000000", address="Tashkent", total_price=total)
+
+    def _txn(self, order=None):
+        order = order or self.order
+        return self.sim.new_transaction(order_id=order.id, amount=order.total_price)
+
+    def test_full_flow_marks_order_paid(self):
+        txn, (check, create, perform) = self.sim.pay(order_id=self.order.id, amount=self.order.total_price)
+
+        self.assertEqual(check["result"], {"allow": True})
+        self.assertEqual(create["result"]["state"], PaymeTransaction.STATE_CREATED)
+        self.assertEqual(perform["result"]["state"], PaymeTransaction.STATE_PERFORMED)
+
+        payment = Payment.objects.get(order=self.order)
+        self.assertEqual(payment.method, Payment.METHOD_PAYME)
+        self.assertEqual(payment.status, Payment.STATUS_PAID)
+        self.assertEqual(payment.provider_ref, txn.id)
+        self.order.refresh_from_db()
+        self.assertTrue(self.order.paid)
+        self.assertEqual(self.order.status, Order.STATUS_CONFIRMED)
+
+        checked = self.sim.check(txn)["result"]
+        self.assertEqual(checked["state"], PaymeTransaction.STATE_PERFORMED)
+        self.assertEqual(checked["perform_time"], perform["result"]["perform_time"])
+
+    def test_interactions_are_recorded_as_attempts(self):
+        txn, _ = self.sim.pay(order_id=self.order.id, amount=self.order.total_price)
+        self.sim.perform(txn)
+
+        payment = Payment.objects.get(order=self.order)
+        attempts = PaymentAttempts.for_payment(payment.id)
+        self.assertEqual([a["stage"] for a in attempts], ["create", "perform"])
+        self.assertEqual(attempts[0]["request"]["id"], txn.id)
+        self.assertEqual(attempts[1]["status"], Payment.STATUS_PAID)
+        self.assertEqual(attempts[1]["response"]["state"], PaymeTransaction.STATE_PERFORMED)
+
+    def test_create_and_perform_are_idempotent(self):
+        txn = self._txn()
+        first = self.sim.create(txn)["result"]
+        self.assertEqual(self.sim.create(txn)["result"], first)
+
+        performed = self.sim.perform(txn)["result"]
+        self.assertEqual(self.sim.perform(txn)["result"], performed)
+
+    def test_wrong_amount_and_unknown_order(self):
+        txn = self._txn()
+        txn.amount += 1
+        self.assertEqual(self.sim.check_perform(txn)["error"]["code"], -31001)
+
+        missing = self.sim.new_transaction(order_id=self.order.id + 100, amount=1)
+        self.assertEqual(self.sim.create(missing)["error"]["code"], -31050)
+
+    def test_second_transaction_for_busy_order_is_rejected(self):
+        self.sim.create(self._txn())
+        self.assertEqual(self.sim.create(self._txn())["error"]["code"], -31052)
+
+    def test_cancel_created_transaction(self):
+        txn = self._txn()
+        self.sim.create(txn)
+
+        cancelled = self.sim.cancel(txn, reason=3)["result"]
+        self.assertEqual(cancelled["state"], PaymeTransaction.STATE_CANCELLED)
+        self.assertEqual(self.sim.cancel(txn, reason=3)["result"], cancelled)
+        self.assertEqual(self.sim.check(txn)["result"]["reason"], 3)
+        self.assertEqual(self.sim.perform(txn)["error"]["code"], -31008)
+
+        # Bekor qilingandan keyin yangi tranzaksiya qabul qilinadi
+        self.assertEqual(self.sim.create(self._txn())["result"]["state"], PaymeTransaction.STATE_CREATED)
+
+    def test_cancelled_transaction_stays_queryable_after_new_one(self):
+        first = self._txn()
+        created = self.sim.create(first)["result"]
+        self.sim.cancel(first, reason=3)
+        payment = Payment.objects.get(order=self.order)
+
+        second, (_, recreated, performed) = self.sim.pay(order_id=self.order.id, amount=self.order.total_price)
+        self.assertNotEqual(recreated["result"]["transaction"], created["transaction"])
+        self.assertEqual(performed["result"]["state"], PaymeTransaction.STATE_PERFORMED)
+
+        checked = self.sim.check(first)["result"]
+        self.assertEqual((checked["state"], checked["reason"]), (PaymeTransaction.STATE_CANCELLED, 3))
+        self.assertEqual(checked["create_time"], created["create_time"])
+
+        now = to_ms(timezone.now())
+        statement = self.sim.statement(now - 60_000, now + 60_000)["result"]["transactions"]
+        self.assertEqual(
+            [(t["id"], t["state"]) for t in statement],
+            [(first.id, PaymeTransaction.STATE_CANCELLED), (second.id, PaymeTransaction.STATE_PERFORMED)],
+        )
+
+        refreshed = Payment.objects.get(pk=payment.pk)
+        self.assertEqual(refreshed.created_at, payment.created_at)
+        self.assertEqual((refreshed.provider_ref, refreshed.status), (second.id, Payment.STATUS_PAID))
+
+    def test_performed_transaction_cannot_be_cancelled(self):
+        txn, _ = self.sim.pay(order_id=self.order.id, amount=self.order.total_price)
+        self.assertEqual(self.sim.cancel(txn)["error"]["code"], -31007)
+
+    def test_timed_out_transaction_is_cancelled_on_perform(self):
+        txn = self._txn()
+        self.sim.create(txn)
+        PaymeTransaction.objects.filter(payme_id=txn.id).update(created_at=timezone.now() - timedelta(hours=13))
+
+        self.assertEqual(self.sim.perform(txn)["error"]["code"], -31008)
+        checked = self.sim.check(txn)["result"]
+        self.assertEqual(checked["state"], PaymeTransaction.STATE_CANCELLED)
+        self.assertEqual(checked["reason"], PaymeTransaction.REASON_TIMEOUT)
+        self.order.refresh_from_db()
+        self.assertFalse(self.order.paid)
+
+    def test_unknown_transaction_and_method(self):
+        txn = self._txn()
+        self.assertEqual(self.sim.check(txn)["error"]["code"], -31003)
+        self.assertEqual(self.sim.perform(txn)["error"]["code"], -31003)
+        self.assertEqual(self.sim.call("Refund", {})["error"]["code"], -32601)
+
+    def test_wrong_credentials(self):
+        sim = PaymeSimulator(client=self.client, auth="Paycom:wrong")
+        self.assertEqual(sim.check_perform(self._txn())["error"]["code"], -32504)
+        self.assertFalse(Payment.objects.exists())
+
+    def test_malformed_credentials(self):
+        sim = PaymeSimulator(client=self.client, auth="Paycom:kalit-ключ")
+        self.assertEqual(sim.check_perform(self._txn())["error"]["code"], -32504)
+
+        for header in ("Basic " + base64.b64encode(b"Paycom:\xff\xfe").decode(), "Basic not-base64!"):
+            sim.authorization = header
+            self.assertEqual(sim.check_perform(self._txn())["error"]["code"], -32504)
+
+    def test_placeholder_or_missing_key_rejects_everyone(self):
+        for configured in ("Paycom:YOUR_KEY", ""):
+            with self.subTest(configured=configured), override_settings(PAYME_BASIC_AUTH=configured, DEBUG=False):
+                for auth in ("Paycom:YOUR_KEY", configured):
+                    sim = PaymeSimulator(client=self.client, auth=auth)
+                    self.assertEqual(sim.create(self._txn())["error"]["code"], -32504)
+        self.assertFalse(PaymeTransaction.objects.exists())
+
+        # Lokal ishlab chiqish: DEBUG'da namuna kalit qabul qilinadi
+        with override_settings(PAYME_BASIC_AUTH="", DEBUG=True):
+            self.assertIn("result", PaymeSimulator(client=self.client).check_perform(self._txn()))
+
+    def test_get_statement_streams_range(self):
+        other = self._order(Decimal("10.00"))
+        first, _ = self.sim.pay(order_id=self.order.id, amount=self.order.total_price)
+        second = self._txn(other)
+        self.sim.create(second)
+        Payment.objects.create(order=self._order(Decimal("5.00")), method=Payment.METHOD_COD, amount=Decimal("5.00"))
+
+        now = to_ms(timezone.now())
+        statement = self.sim.statement(now - 60_000, now + 60_000)["result"]["transactions"]
+        self.assertEqual([t["id"] for t in statement], [first.id, second.id])
+        self.assertEqual(statement[0]["amount"], 12550)
+        self.assertEqual(statement[0]["account"], {"order_id": self.order.id})
+        self.assertEqual(statement[1]["state"], PaymeTransaction.STATE_CREATED)
+
+        self.assertEqual(self.sim.statement(now + 60_000, now + 120_000)["result"]["transactions"], [])
+        self.assertEqual(self.sim.statement(now, now - 1)["error"]["code"], -32600)
+
+
+@override_settings(CLICK_REQUIRE_SIGNATURE=True, CLICK_SERVICE_ID="111", CLICK_SECRET_KEY="secret")
+class ClickCallbackTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="buyer", password="p")
+        self.order = Order.objects.create(
+            user=self.user, phone="998900000000", address="Tashkent", total_price=Decimal("125.50")
+        )
+        self.sim = ClickSimulator(client=self.client)
+
+    def test_signed_flow_marks_order_paid(self):
+        txn, (prepare, complete) = self.sim.pay(order_id=self.order.id, amount=self.order.total_price)
+
+        self.assertEqual((prepare["error"], complete["error"]), (0, 0))
+        payment = Payment.objects.get(order=self.order)
+        self.assertEqual((payment.method, payment.status), (Payment.METHOD_CLICK, Payment.STATUS_PAID))
+        self.assertEqual(payment.provider_ref, txn.click_trans_id)
+        self.order.refresh_from_db()
+        self.assertTrue(self.order.paid)
+
+    def test_wrong_secret_is_rejected(self):
+        sim = ClickSimulator(client=self.client, secret_key="wrong")
+        _, (prepare,) = sim.pay(order_id=self.order.id, amount=self.order.total_price)
+        self.assertEqual(prepare["error"], -1)
+        self.assertFalse(Payment.objects.exists())
+
+    def test_duplicate_callback_is_replayed(self):
+        txn = self.sim.new_transaction(order_id=self.order.id, amount=self.order.total_price)
+        payload = self.sim.payload(txn, action=ACTION_PREPARE)
+        first = self.sim.send(PREPARE_PATH, payload)
+
+        self.assertEqual(self.sim.send(PREPARE_PATH, payload), first)
+        attempts = PaymentAttempts.for_payment(first["merchant_prepare_id"])
+        self.assertEqual([a["stage"] for a in attempts], ["prepare"])
+
+
+@override_settings(
+    CLICK_REQUIRE_SIGNATURE=False,
+    PAYME_BASIC_AUTH="Paycom:test-key",
+    PAYME_TRANSACTION_TIMEOUT_MS=43_200_000,
+)
+class ExpiredOrderPaymentTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="buyer", password="p")
+        self.order = Order.objects.create(
+            user=self.user, phone="998900000000", address="Tashkent", total_price=Decimal("125.50")
+        )
+
+    def _expire(self):
+        return OrderExpiry.expire(ttl_minutes=0, now=timezone.now() + timedelta(minutes=1))
+
+    def _assert_cancelled_unpaid(self):
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, Order.STATUS_CANCELLED)
+        self.assertFalse(self.order.paid)
+        self.assertNotEqual(Payment.objects.get(order=self.order).status, Payment.STATUS_PAID)
+
+    def test_click_complete_after_expiry_is_cancelled(self):
+        sim = ClickSimulator(client=self.client)
+        txn = sim.new_transaction(order_id=self.order.id, amount=self.order.total_price)
+        prepared = sim.prepare(txn)
+        self.assertEqual(self._expire().orders_expired, 1)
+
+        complete = sim.complete(txn, prepared["merchant_prepare_id"])
+
+        self.assertEqual(complete["error"], -9)
+        self._assert_cancelled_unpaid()
+
+    def test_click_complete_rechecks_order_under_lock(self):
+        # Callback tekshiruvidan keyin, lock'dan oldin expiry ishlagan holat
+        stale = Order.objects.get(pk=self.order.pk)
+        PaymentService.mark_click_prepared(order=stale, click_trans_id="c-1", amount="125.50")
+        self._expire()
+
+        with self.assertRaises(OrderNotPayable):
+            PaymentService.mark_click_completed(
+                order=stale, click_trans_id="c-1", merchant_prepare_id="1", amount="125.50"
+            )
+        self._assert_cancelled_unpaid()
+
+    def test_payme_perform_after_expiry_is_cancelled(self):
+        sim = PaymeSimulator(client=self.client, auth="Paycom:test-key")
+        txn = sim.new_transaction(order_id=self.order.id, amount=self.order.total_price)
+        sim.create(txn)
+        self._expire()
+
+        self.assertEqual(sim.perform(txn)["error"]["code"], -31008)
+        self.assertEqual(sim.check(txn)["result"]["state"], PaymeTransaction.STATE_CANCELLED)
+        self._assert_cancelled_unpaid()
+
+
+@override_settings(CLICK_REQUIRE_SIGNATURE=False, PAYMENT_WEBHOOK_INBOX=True, PAYMENT_WEBHOOK_SHARDS=1)
+class WebhookInboxTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="buyer", password="p")
+        self.order = Order.objects.create(
+            user=self.user, phone="998900000000", address="Tashkent", total_price=Decimal("125.50")
+        )
+        self.sim = ClickSimulator(client=self.client)
+
+    def _drain(self) -> list[str]:
+        statuses = []
+        while (webhook := WebhookInbox.claim_next(0)) is not None:
+            statuses.append(WebhookInbox.process(webhook).status)
+        return statuses
+
+    def test_callbacks_are_queued_and_applied_in_order(self):
+        txn, (prepare, complete) = self.sim.pay(order_id=self.order.id, amount=self.order.total_price)
+
+        self.assertEqual((prepare["error"], complete["error"]), (0, 0))
+        payment = Payment.objects.get(order=self.order)
+        self.assertEqual(prepare["merchant_prepare_id"], payment.id)
+        self.assertEqual(payment.status, Payment.STATUS_CREATED)
+
+        # Complete prepare tugamaguncha olinmaydi
+        first = WebhookInbox.claim_next(0)
+        self.assertEqual(first.kind, PaymentWebhook.KIND_PREPARE)
+        self.assertIsNone(WebhookInbox.claim_next(0))
+        WebhookInbox.process(first)
+
+        self.assertEqual(self._drain(), [PaymentWebhook.STATUS_DONE])
+        self.order.refresh_from_db()
+        self.assertTrue(self.order.paid)
+        self.assertEqual(Payment.objects.get(order=self.order).provider_ref, txn.click_trans_id)
+
+    def test_prepare_id_matches_across_modes(self):
+        txn = self.sim.new_transaction(order_id=self.order.id, amount=self.order.total_price)
+        prepared = self.sim.prepare(txn)
+        self._drain()
+
+        self.assertEqual(self.sim.complete(txn, prepared["merchant_prepare_id"] + 1)["error"], -6)
+        with override_settings(PAYMENT_WEBHOOK_INBOX=False):
+            self.assertEqual(self.sim.complete(txn, prepared["merchant_prepare_id"])["error"], 0)
+        self.order.refresh_from_db()
+        self.assertTrue(self.order.paid)
+
+    def test_order_cancelled_before_worker_needs_refund(self):
+        self.sim.pay(order_id=self.order.id, amount=self.order.total_price)
+        Order.objects.filter(pk=self.order.pk).update(status=Order.STATUS_CANCELLED)
+
+        with self.assertLogs("payments.services.webhook_inbox", level="ERROR"):
+            statuses = self._drain()
+
+        self.assertEqual(statuses, [PaymentWebhook.STATUS_FAILED, PaymentWebhook.STATUS_NEEDS_REFUND])
+        self.order.refresh_from_db()
+        self.assertFalse(self.order.paid)
+        self.assertNotEqual(Payment.objects.get(order=self.order).status, Payment.STATUS_PAID)
+
+
+class PaymentReconciliationTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="buyer", password="p")
+        self.now = timezone.now()
+        self.window = {"window_start": self.now - timedelta(days=1), "window_end": self.now + timedelta(minutes=1)}
+
+    def _payment(self, ref, amount, status=Payment.STATUS_PAID, method=Payment.METHOD_CLICK, created_at=None):
+        order = Order.objects.create(user=self.user, phone="998900000000", address="Tashkent", total_price=amount)
+        payment = Payment.objects.create(order=order, method=method, amount=amount, status=status, provider_ref=ref)
+        if created_at is not None:
+            Payment.objects.filter(pk=payment.pk).update(created_at=created_at)
+        return payment
+
+    def _kinds(self, run):
+        return dict(run.mismatches.values_list("provider_ref", "kind"))
+
+    def test_click_csv_mismatches(self):
+        self._payment("c-ok", Decimal("100.00"))
+        self._payment("c-amount", Decimal("50.00"))
+        self._payment("c-status", Decimal("20.00"), status=Payment.STATUS_PENDING)
+        self._payment("c-extra", Decimal("10.00"))
+        self._payment("c-old", Decimal("5.00"), created_at=self.now - timedelta(days=3))
+        statement = io.StringIO(
+            "click_trans_id,amount,status\n"
+            "c-ok,100.00,success\n"
+            "c-amount,50.01,success\n"
+            "c-status,20,success\n"
+            "c-old,5,success\n"
+            "c-missing,7.50,success\n"
+        )
+
+        result = PaymentReconciliation.reconcile(statement, provider=Payment.METHOD_CLICK, fmt="csv", **self.window)
+
+        self.assertEqual(
+            result.counts,
+            {"statement_rows": 5, "matched": 4, "missing": 1, "extra": 1, "amount_diff": 1, "status_diff": 1},
+        )
+        self.assertEqual(
+            self._kinds(result.run),
+            {
+                "c-missing": ReconciliationMismatch.KIND_MISSING,
+                "c-extra": ReconciliationMismatch.KIND_EXTRA,
+                "c-amount": ReconciliationMismatch.KIND_AMOUNT,
+                "c-status": ReconciliationMismatch.KIND_STATUS,
+            },
+        )
+        amount = result.run.mismatches.get(kind=ReconciliationMismatch.KIND_AMOUNT)
+        self.assertEqual((amount.statement_amount, amount.payment_amount), (Decimal("50.01"), Decimal("50.00")))
+
+    @override_settings(PAYME_BASIC_AUTH="Paycom:test-key")
+    def test_payme_get_statement_json(self):
+        sim = PaymeSimulator(client=self.client)
+        order = Order.objects.create(
+            user=self.user, phone="998900000000", address="Tashkent", total_price=Decimal("125.50")
+        )
+        cancelled = sim.new_transaction(order_id=order.id, amount=order.total_price)
+        sim.create(cancelled)
+        sim.cancel(cancelled, reason=3)
+        recreated, _ = sim.pay(order_id=order.id, amount=order.total_price)
+        other = Order.objects.create(
+            user=self.user, phone="998900000000", address="Tashkent", total_price=Decimal("10.00")
+        )
+        open_txn = sim.new_transaction(order_id=other.id, amount=other.total_price)
+        sim.create(open_txn)
+
+        # Provayder statement'i — GetStatement javobi; ochiq tranzaksiyani Payme "performed" deb biladi
+        now = to_ms(timezone.now())
+        response = sim.statement(now - 60_000, now + 60_000)
+        response["result"]["transactions"][-1]["state"] = PaymeTransaction.STATE_PERFORMED
+        statement = io.StringIO(json.dumps(response))
+
+        result = PaymentReconciliation.reconcile(statement, provider=Payment.METHOD_PAYME, fmt="json", **self.window)
+
+        self.assertEqual(result.counts["statement_rows"], 3)
+        self.assertEqual(result.counts["matched"], 3)
+        self.assertEqual(self._kinds(result.run), {open_txn.id: ReconciliationMismatch.KIND_STATUS})
+        self.assertNotIn(cancelled.id, self._kinds(result.run))
+        self.assertEqual(Payment.objects.get(order=order).provider_ref, recreated.id)
@@ -1,9 +1,14 @@
 from django.urls import path
 from django.http import JsonResponse
 
+from users.api import views
+
+
 def catalog_health(request):
     return JsonResponse({"status": "ok", "service": "catalog"})
 
 urlpatterns = [
     path("health/", catalog_health, name="catalog-health"),
+    path("me/order-stats/", views.my_order_stats, name="user-order-stats-me"),
+    path("<int:user_id>/order-stats/", views.user_order_stats, name="user-order-stats"),
 ]
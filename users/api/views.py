@@ -0,0 +1,48 @@
+from django.contrib.auth import get_user_model
+from django.shortcuts import get_object_or_404
+from drf_spectacular.utils import OpenApiResponse, extend_schema
+from rest_framework import permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from orders.api.serializers import UserOrderStatsSerializer
+from orders.services.user_order_stats import UserOrderStatsService
+
+
+User = get_user_model()
+
+
+@extend_schema(
+    tags=["Users"],
+    summary="Current user's order summary (count, spend, last order, open orders)",
+    responses={
+        200: UserOrderStatsSerializer,
+        401: OpenApiResponse(description="Unauthorized"),
+    },
+)
+@api_view(["GET"])
+@permission_classes([permissions.IsAuthenticated])
+def my_order_stats(request):
+    stats = UserOrderStatsService.get(request.user.id)
+    return Response(UserOrderStatsSerializer(stats).data, status=status.HTTP_200_OK)
+
+
+@extend_schema(
+    tags=["Users"],
+    summary="Operator: a customer's order summary",
+    responses={
+        200: UserOrderStatsSerializer,
+        401: OpenApiResponse(description="Unauthorized"),
+        403: OpenApiResponse(description="Forbidden"),
+        404: OpenApiResponse(description="Not found"),
+    },
+)
+@api_view(["GET"])
+@permission_classes([permissions.IsAuthenticated])
+def user_order_stats(request, user_id: int):
+    if not request.user.is_operator and request.user.id != user_id:
+        return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+
+    user = get_object_or_404(User, pk=user_id)
+    stats = UserOrderStatsService.get(user.id)
+    return Response(UserOrderStatsSerializer(stats).data, status=status.HTTP_200_OK)